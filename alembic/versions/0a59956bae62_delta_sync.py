@@ -0,0 +1,58 @@
+"""delta sync: updated_at index and registration tombstones
+
+Revision ID: 0a59956bae62
+Revises: 8abfbe012342
+Create Date: 2026-10-18 11:02:47.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a59956bae62'
+down_revision: Union[str, Sequence[str], None] = '8abfbe012342'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_interview_registrations_updated_at'), 'interview_registrations', ['updated_at'], unique=False)
+
+    op.create_table('registration_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('registration_id', sa.String(length=255), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_registration_tombstones_deleted_at'), 'registration_tombstones', ['deleted_at'], unique=False)
+
+    # A trigger rather than an ORM hook so bulk and raw-SQL deletes leave tombstones too.
+    # timezone('utc', now()) matches the naive-UTC datetime.utcnow() used for updated_at.
+    op.execute("""
+        CREATE FUNCTION record_registration_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO registration_tombstones (id, registration_id, deleted_at)
+            VALUES (OLD.id, OLD.registration_id, timezone('utc', now()))
+            ON CONFLICT (id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+            RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER interview_registrations_tombstone
+        AFTER DELETE ON interview_registrations
+        FOR EACH ROW EXECUTE FUNCTION record_registration_tombstone()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS interview_registrations_tombstone ON interview_registrations")
+    op.execute("DROP FUNCTION IF EXISTS record_registration_tombstone()")
+    op.drop_index(op.f('ix_registration_tombstones_deleted_at'), table_name='registration_tombstones')
+    op.drop_table('registration_tombstones')
+    op.drop_index(op.f('ix_interview_registrations_updated_at'), table_name='interview_registrations')
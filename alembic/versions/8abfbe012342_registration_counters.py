@@ -0,0 +1,57 @@
+"""registration counters
+
+Revision ID: 8abfbe012342
+Revises: d19a917769e6
+Create Date: 2026-10-18 10:12:31.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8abfbe012342'
+down_revision: Union[str, Sequence[str], None] = 'd19a917769e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('registration_counters',
+    sa.Column('dimension', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.String(length=255), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'value')
+    )
+
+    # Backfill from the existing rows; same normalisation as app.services.registration_counters
+    op.execute("""
+        INSERT INTO registration_counters (dimension, value, count)
+        SELECT 'total', '', count(*) FROM interview_registrations
+        UNION ALL
+        SELECT 'status', coalesce(status, ''), count(*) FROM interview_registrations GROUP BY 1, 2
+        UNION ALL
+        SELECT 'hr_review', coalesce(hr_review, ''), count(*) FROM interview_registrations GROUP BY 1, 2
+        UNION ALL
+        SELECT 'position_type', coalesce(position_type, ''), count(*) FROM interview_registrations GROUP BY 1, 2
+        UNION ALL
+        SELECT 'school_type', coalesce(school_type, ''), count(*) FROM interview_registrations GROUP BY 1, 2
+        UNION ALL
+        SELECT 'upk_eligible', CASE WHEN upk_eligible THEN 'true' ELSE 'false' END, count(*) FROM interview_registrations GROUP BY 1, 2
+        UNION ALL
+        SELECT 'teacher_eligible', CASE WHEN teacher_eligible THEN 'true' ELSE 'false' END, count(*) FROM interview_registrations GROUP BY 1, 2
+        UNION ALL
+        SELECT 'substitute_eligible', CASE WHEN substitute_eligible THEN 'true' ELSE 'false' END, count(*) FROM interview_registrations GROUP BY 1, 2
+        UNION ALL
+        SELECT 'shift_available', CASE WHEN shift_available THEN 'true' ELSE 'false' END, count(*) FROM interview_registrations GROUP BY 1, 2
+        UNION ALL
+        SELECT 'diaper_comfortable', CASE WHEN diaper_comfortable THEN 'true' ELSE 'false' END, count(*) FROM interview_registrations GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('registration_counters')
@@ -0,0 +1,50 @@
+"""query path indexes
+
+Revision ID: d8365a128baa
+Revises: 0a59956bae62
+Create Date: 2026-10-18 19:05:12.410236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8365a128baa'
+down_revision: Union[str, Sequence[str], None] = '0a59956bae62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# question_answers.registration_id alone is not indexed separately: it is the leading
+# column of the (registration_id, question_order) index, which serves the FK lookups too.
+# interview_registrations.updated_at was indexed in 0a59956bae62.
+INDEXES = [
+    ('ix_question_answers_registration_id_question_order', 'question_answers',
+     [sa.text('registration_id'), sa.text('question_order')]),
+    ('ix_interview_registrations_status', 'interview_registrations', [sa.text('status')]),
+    ('ix_interview_registrations_hr_review', 'interview_registrations', [sa.text('hr_review')]),
+    ('ix_interview_registrations_email', 'interview_registrations', [sa.text('email')]),
+    ('ix_interview_registrations_submitted_at_id', 'interview_registrations',
+     [sa.text('submitted_at DESC NULLS LAST'), sa.text('id DESC')]),
+    ('ix_interview_registrations_registration_id_pattern', 'interview_registrations',
+     [sa.text('registration_id text_pattern_ops')]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction, and builds without blocking writers.
+    # A failed concurrent build leaves an INVALID index behind: drop it and rerun.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
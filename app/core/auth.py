@@ -0,0 +1,163 @@
+"""
+JWT verification shared by HTTP dependencies and WebSocket handshakes.
+
+Verified claims are kept in a bounded LRU keyed by the SHA-256 of the token and
+expire with the token's `exp` (capped at VERIFIED_TOKEN_CACHE_TTL), so clients
+that reconnect often skip the signature check. Logout adds the token to a
+revocation set that is consulted before the cache; entries leave the set once
+the token would have expired anyway, which keeps it tiny. Both live in process
+memory; revocations are published through the broker so every worker adds
+them to its own set. Like any broker message, a revocation is missed by a
+worker that is reconnecting to Redis at that moment (its cached claims still
+expire within VERIFIED_TOKEN_CACHE_TTL).
+"""
+import hashlib
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import ExpiredSignatureError, JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.postgres.database import get_async_db
+from app.db.redis.broker import broker
+from app.models.user import User
+from app.utils.lru import TTLCache
+from app.utils.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = "token_revocations"
+
+security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+
+class RevokedTokenError(JWTError):
+    pass
+
+
+class RevocationSet:
+    """Token hashes revoked before their expiry; expired entries are pruned as new ones arrive"""
+
+    def __init__(self):
+        self._expires_at: Dict[bytes, Optional[float]] = {}
+
+    def add(self, key: bytes, expires_at: Optional[float]) -> None:
+        now = time.time()
+        self._expires_at = {k: exp for k, exp in self._expires_at.items() if exp is None or exp > now}
+        self._expires_at[key] = expires_at
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._expires_at
+
+    def __len__(self) -> int:
+        return len(self._expires_at)
+
+
+_verified = TTLCache(settings.verified_token_cache_size)
+_revoked = RevocationSet()
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def verify_access_token(token: str) -> Dict[str, Any]:
+    """
+    Claims of a valid token. Raises jose's ExpiredSignatureError / JWTError (RevokedTokenError
+    after logout). The returned dict is shared between callers and must not be modified.
+    """
+    key = _token_key(token)
+    if key in _revoked:
+        raise RevokedTokenError("Token has been revoked")
+    claims = _verified.get(key)
+    if claims is not None:
+        return claims
+
+    claims = decode_token(token)
+    ttl = settings.verified_token_cache_ttl
+    if "exp" in claims:
+        ttl = min(ttl, claims["exp"] - time.time())
+    if ttl > 0:
+        _verified.set(key, claims, ttl=ttl)
+    return claims
+
+
+def _revoke(key: bytes, expires_at: Optional[float]) -> None:
+    _revoked.add(key, expires_at)
+    _verified.delete(key)
+
+
+def _on_revocation(message: Dict[str, Any]) -> None:
+    _revoke(bytes.fromhex(message["key"]), message.get("exp"))
+
+
+async def start_revocation_sync() -> None:
+    """Apply revocations published by other workers"""
+    await broker.subscribe(REVOCATION_CHANNEL, _on_revocation)
+
+
+async def stop_revocation_sync() -> None:
+    await broker.unsubscribe(REVOCATION_CHANNEL, _on_revocation)
+
+
+async def revoke_token(token: str) -> bool:
+    """Reject `token` from now on, on every worker; returns False when it was not a valid token to begin with"""
+    try:
+        claims = verify_access_token(token)
+    except JWTError:
+        return False
+    key = _token_key(token)
+    _revoke(key, claims.get("exp"))
+    try:
+        await broker.publish(REVOCATION_CHANNEL, {"key": key.hex(), "exp": claims.get("exp")})
+    except Exception as e:
+        # Revoked here regardless; other workers drop the token when their cache entry expires
+        logger.warning("Publishing token revocation failed: %s", e)
+    return True
+
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+    """Dependency returning the bearer token's claims"""
+    try:
+        return verify_access_token(credentials.credentials)
+    except ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired"
+        )
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token"
+        )
+
+
+async def is_admin(db: AsyncSession, claims: Dict[str, Any]) -> bool:
+    """Whether the token's user is an admin (HR); leaves the session's connection released"""
+    try:
+        user_id = int(claims.get("sub"))
+    except (TypeError, ValueError):
+        return False
+    admin = (await db.execute(select(User.isadmin).where(User.userid == user_id))).scalar()
+    # Release the connection; the response may take a while to stream
+    await db.rollback()
+    return bool(admin)
+
+
+async def verify_admin(
+    claims: Dict[str, Any] = Depends(verify_token),
+    db: AsyncSession = Depends(get_async_db)
+) -> Dict[str, Any]:
+    """Dependency for admin (HR) only endpoints: the token's user must be an admin"""
+    if not await is_admin(db, claims):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return claims
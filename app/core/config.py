@@ -1,10 +1,13 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import Optional
 
 
 class Settings(BaseSettings):
     # GENERAL
     debug: bool = Field(False, env="DEBUG")
+    # Per-logger level overrides, e.g. "app.routers=DEBUG,sqlalchemy.engine=INFO"
+    log_levels: str = Field("", env="LOG_LEVELS")
 
     # DATABASE
     database_name: str = Field(env="DATABASE_NAME")
@@ -12,12 +15,75 @@ class Settings(BaseSettings):
     database_password: str = Field(env="DATABASE_PASSWORD")
     database_host: str = Field(env="DATABASE_HOST")
     database_port: str = Field(env="DATABASE_PORT")
+    database_echo: bool = Field(False, env="DATABASE_ECHO")
+    database_pool_size: int = Field(5, env="DATABASE_POOL_SIZE")
+    database_max_overflow: int = Field(10, env="DATABASE_MAX_OVERFLOW")
+    database_pool_timeout: float = Field(30, env="DATABASE_POOL_TIMEOUT")
+    database_pool_recycle: int = Field(1800, env="DATABASE_POOL_RECYCLE")
+    database_pool_pre_ping: bool = Field(True, env="DATABASE_POOL_PRE_PING")
+
+    # QUERY PROFILING
+    slow_query_ms: float = Field(200, env="SLOW_QUERY_MS")
+    n_plus_one_threshold: int = Field(5, env="N_PLUS_ONE_THRESHOLD")
+
+    # REDIS (optional; an in-process cache is used when unset)
+    redis_url: Optional[str] = Field(None, env="REDIS_URL")
+    registration_cache_ttl: int = Field(300, env="REGISTRATION_CACHE_TTL")
+    registration_cache_max_entries: int = Field(10000, env="REGISTRATION_CACHE_MAX_ENTRIES")
+
+    # REGISTRATION LOOKUP
+    registration_resolver_max_entries: int = Field(50000, env="REGISTRATION_RESOLVER_MAX_ENTRIES")
+    registration_resolver_negative_ttl: int = Field(30, env="REGISTRATION_RESOLVER_NEGATIVE_TTL")
+
+    # ADMIN CHANGE FEED
+    change_feed_queue_size: int = Field(100, env="CHANGE_FEED_QUEUE_SIZE")
+
+    # INTERVIEW
+    # Buffered answers are written when this many are pending, or after the interval (seconds)
+    interview_answer_flush_size: int = Field(50, env="INTERVIEW_ANSWER_FLUSH_SIZE")
+    interview_answer_flush_interval: float = Field(2.0, env="INTERVIEW_ANSWER_FLUSH_INTERVAL")
+    # Interim transcripts are written at most once per this many milliseconds per question
+    interview_partial_write_interval_ms: int = Field(1000, env="INTERVIEW_PARTIAL_WRITE_INTERVAL_MS")
+    # A reconnecting candidate waits this long for the worker of their previous connection to let go
+    interview_takeover_timeout: float = Field(3.0, env="INTERVIEW_TAKEOVER_TIMEOUT")
+    # Session claims of a crashed worker expire after this many seconds
+    interview_claim_ttl: int = Field(6 * 3600, env="INTERVIEW_CLAIM_TTL")
+
+    # INTERVIEW AUDIO
+    # Spool files of raw interview audio (<registration pk>.audio plus a .index sidecar)
+    interview_audio_dir: str = Field("storage/interview_audio", env="INTERVIEW_AUDIO_DIR")
+    interview_audio_content_type: str = Field("audio/webm", env="INTERVIEW_AUDIO_CONTENT_TYPE")
+    # Larger binary frames close the socket with 1009; a session stops spooling past the total
+    interview_audio_max_frame_bytes: int = Field(256 * 1024, env="INTERVIEW_AUDIO_MAX_FRAME_BYTES")
+    interview_audio_max_session_bytes: int = Field(200 * 1024 * 1024, env="INTERVIEW_AUDIO_MAX_SESSION_BYTES")
+    # Spools are fsynced once this many bytes are unsynced or after the interval (seconds)
+    interview_audio_fsync_bytes: int = Field(1024 * 1024, env="INTERVIEW_AUDIO_FSYNC_BYTES")
+    interview_audio_fsync_interval: float = Field(5.0, env="INTERVIEW_AUDIO_FSYNC_INTERVAL")
+
+    # WEBSOCKETS
+    # Outbound messages buffered per connection before its overflow policy applies
+    ws_send_queue_size: int = Field(32, env="WS_SEND_QUEUE_SIZE")
+    # A send that cannot complete within this many seconds marks the client as stalled
+    ws_send_timeout: float = Field(10, env="WS_SEND_TIMEOUT")
+    # Idle connections are pinged every interval and closed after the timeout without a message
+    ws_heartbeat_interval: float = Field(15, env="WS_HEARTBEAT_INTERVAL")
+    ws_heartbeat_timeout: float = Field(45, env="WS_HEARTBEAT_TIMEOUT")
+    ws_drain_timeout: float = Field(10, env="WS_DRAIN_TIMEOUT")
+
+    # PASSWORD HASHING
+    bcrypt_rounds: int = Field(12, env="BCRYPT_ROUNDS")
+    # Threads dedicated to bcrypt; logins beyond workers + queue size are rejected with 503
+    password_hash_workers: int = Field(4, env="PASSWORD_HASH_WORKERS")
+    password_hash_queue_size: int = Field(64, env="PASSWORD_HASH_QUEUE_SIZE")
 
     # JWT
     secret_key: str = Field(env="SECRET_KEY")
     algorithm: str = Field(env="ALGORITHM")
     access_token_expiry_time: int = Field(15, env="ACCESS_TOKEN_EXPIRE_TIME")
     refresh_token_expiry_time: int = Field(30, env="REFRESH_TOKEN_EXPIRE_TIME")
+    # Verified claims are reused until the token's exp, but never longer than this (seconds)
+    verified_token_cache_ttl: int = Field(300, env="VERIFIED_TOKEN_CACHE_TTL")
+    verified_token_cache_size: int = Field(10000, env="VERIFIED_TOKEN_CACHE_SIZE")
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,85 @@
+"""
+Structured, non-blocking logging.
+
+Every record is put on an in-memory queue by a QueueHandler (cheap, never
+touches stdout on the caller's thread); a QueueListener thread formats records
+as JSON lines and writes them. Levels are set per logger: Settings.debug turns
+the application loggers up to DEBUG, and LOG_LEVELS ("logger=LEVEL,...")
+overrides individual modules.
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else was passed via extra= and is emitted as a field
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep the original record (extra fields, exc_info) and let the listener thread format
+        # it; QueueHandler.prepare would format here, on the caller's thread
+        return record
+
+
+def logger_levels() -> Dict[str, int]:
+    app_level = logging.DEBUG if settings.debug else logging.INFO
+    levels = {
+        "": logging.INFO,
+        "app": app_level,
+        "sqlalchemy.engine": logging.INFO if settings.database_echo else logging.WARNING,
+        "uvicorn.access": logging.INFO,
+    }
+    for override in filter(None, (part.strip() for part in settings.log_levels.split(","))):
+        name, _, level = override.partition("=")
+        levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+def setup_logging() -> None:
+    """Route all logging through the queue; safe to call more than once"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.handlers = [_QueueHandler(log_queue)]
+    for name, level in logger_levels().items():
+        logging.getLogger(name).setLevel(level)
+    # uvicorn installs its own stream handlers; send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
@@ -0,0 +1,314 @@
+"""
+Prometheus text-format metrics.
+
+A deliberately small implementation instead of prometheus_client: all updates
+happen on the event loop thread (the middleware), so samples are plain dict
+entries bumped without locks, and a scrape renders them in one pass. Worst case
+under the GIL a concurrent update from another thread is lost, which telemetry
+can live with; the request path never waits on a metrics lock.
+"""
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+from app.db.postgres.database import async_engine, sync_engine
+from app.services.connection_manager import interview_connections
+from app.services.interview_engine import partial_transcripts
+from app.utils.histogram import Histogram
+from app.utils.lru import TTLCache
+
+Labels = Tuple[str, ...]
+
+# Request paths whose in-flight route template is remembered; ids in paths make them unbounded
+ROUTE_TEMPLATE_CACHE_SIZE = 4096
+
+HTTP_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.samples()
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+
+class CallbackGauge(Metric):
+    """Gauge whose samples are read at scrape time, e.g. from the connection pools"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], read: Callable[[], Dict[Labels, float]]):
+        super().__init__(name, documentation, labelnames)
+        self.read = read
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.read().items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class CallbackCounter(CallbackGauge):
+    kind = "counter"
+
+
+class HistogramVec(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = HTTP_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._children: Dict[Labels, Histogram] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        child = self._children.get(labels)
+        if child is None:
+            child = self._children[labels] = Histogram(self.buckets)
+        child.observe(value)
+
+    def attach(self, labels: Labels, histogram: Histogram) -> None:
+        """Expose an existing Histogram (e.g. pool checkout latency) under this metric"""
+        self._children[labels] = histogram
+
+    def samples(self) -> Iterable[str]:
+        for labels, child in list(self._children.items()):
+            for bound, count in child.cumulative().items():
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="%s"' % bound)
+                yield f"{self.name}_bucket{bucket_labels} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(child.sum)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {child.count}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by method, route template and status code", ("method", "route", "status")
+))
+HTTP_LATENCY = registry.register(HistogramVec(
+    "http_request_duration_seconds", "HTTP request latency by method and route template", ("method", "route")
+))
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served by method and route template", ("method", "route")
+))
+
+WS_CONNECTIONS = registry.register(Counter(
+    "websocket_connections_total", "Accepted WebSocket connections by route", ("route",)
+))
+WS_ACTIVE = registry.register(Gauge(
+    "websocket_connections_active", "Open WebSocket connections by route", ("route",)
+))
+WS_MESSAGES = registry.register(Counter(
+    "websocket_messages_total", "WebSocket messages by route and direction (received/sent)", ("route", "direction")
+))
+
+
+def _interview_ws(stat: str) -> Callable[[], Dict[Labels, float]]:
+    return lambda: {(): interview_connections.stats()[stat]}
+
+
+registry.register(CallbackGauge(
+    "websocket_send_queue_depth", "Messages queued for /ws/interview clients", (), _interview_ws("queued")
+))
+registry.register(CallbackCounter(
+    "websocket_messages_dropped_total", "Queued /ws/interview messages discarded by the drop_oldest policy", (),
+    _interview_ws("dropped")
+))
+registry.register(CallbackCounter(
+    "websocket_backpressure_closes_total", "/ws/interview connections closed for a full send queue", (),
+    _interview_ws("overflowed")
+))
+registry.register(CallbackCounter(
+    "websocket_send_stalls_total", "/ws/interview sends that exceeded WS_SEND_TIMEOUT", (), _interview_ws("stalled")
+))
+registry.register(CallbackCounter(
+    "websocket_heartbeat_reaped_total", "/ws/interview connections closed for missing heartbeats", (),
+    _interview_ws("reaped")
+))
+registry.register(CallbackCounter(
+    "interview_partial_transcripts_total", "Interim transcripts received on /ws/interview", (),
+    lambda: {(): partial_transcripts.received}
+))
+registry.register(CallbackCounter(
+    "interview_draft_writes_total", "Draft answers written from coalesced interim transcripts", (),
+    lambda: {(): partial_transcripts.written}
+))
+
+ENGINES = {"sync": sync_engine, "async": async_engine.sync_engine}
+
+
+def _pool_values(read: Callable) -> Callable[[], Dict[Labels, float]]:
+    return lambda: {(name,): read(engine.pool) for name, engine in ENGINES.items()}
+
+
+registry.register(CallbackGauge("db_pool_size", "Configured pool size", ("engine",), _pool_values(lambda pool: pool.size())))
+registry.register(CallbackGauge(
+    "db_pool_checked_out", "Connections currently checked out", ("engine",), _pool_values(lambda pool: pool.checkedout())
+))
+registry.register(CallbackGauge(
+    "db_pool_overflow", "Overflow connections in use (negative while the pool is not full)", ("engine",),
+    _pool_values(lambda pool: pool.overflow())
+))
+registry.register(CallbackGauge(
+    "db_pool_waiting", "Callers waiting for a connection", ("engine",), _pool_values(lambda pool: pool.telemetry.waiting)
+))
+registry.register(CallbackCounter(
+    "db_pool_timeouts_total", "Checkouts that gave up after pool_timeout", ("engine",),
+    _pool_values(lambda pool: pool.telemetry.timeouts)
+))
+DB_POOL_CHECKOUT = registry.register(HistogramVec(
+    "db_pool_checkout_seconds", "Time to obtain a pooled connection", ("engine",)
+))
+for _name, _engine in ENGINES.items():
+    DB_POOL_CHECKOUT.attach((_name,), _engine.pool.telemetry.checkout_latency)
+
+
+def _route_template(scope) -> str:
+    # FastAPI stores the matched route in the scope; templates keep label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unrouted>"
+
+
+def _match_route_template(scope) -> str:
+    # The middleware runs before routing, so requests in flight match the app's routes themselves,
+    # the way the router does: the first full match, else the first partial one (wrong method)
+    router = getattr(scope.get("app"), "router", None)
+    partial = None
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "<unrouted>"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording HTTP and WebSocket metrics"""
+
+    def __init__(self, app):
+        self.app = app
+        # (method, path) -> template matched before routing, for the in-flight gauge
+        self._route_templates = TTLCache(ROUTE_TEMPLATE_CACHE_SIZE)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._websocket(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _http(self, scope, receive, send):
+        method = scope["method"]
+        status: Optional[int] = None
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        key = (method, scope["path"])
+        template = self._route_templates.get(key)
+        if template is None:
+            template = _match_route_template(scope)
+            self._route_templates.set(key, template)
+        in_flight = (method, template)
+        HTTP_IN_FLIGHT.inc(in_flight)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec(in_flight)
+            route = _route_template(scope)
+            HTTP_REQUESTS.inc((method, route, str(status or 500)))
+            HTTP_LATENCY.observe((method, route), elapsed)
+
+    async def _websocket(self, scope, receive, send):
+        accepted = False
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "websocket.receive":
+                WS_MESSAGES.inc((_route_template(scope), "received"))
+            return message
+
+        async def counting_send(message):
+            nonlocal accepted
+            if message["type"] == "websocket.accept":
+                accepted = True
+                route = _route_template(scope)
+                WS_CONNECTIONS.inc((route,))
+                WS_ACTIVE.inc((route,))
+            elif message["type"] == "websocket.send":
+                WS_MESSAGES.inc((_route_template(scope), "sent"))
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            if accepted:
+                WS_ACTIVE.dec((_route_template(scope),))
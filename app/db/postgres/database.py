@@ -1,7 +1,11 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
 from app.core.config import settings
+from app.db.postgres.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+from app.db.postgres.profiler import instrument_engine
 from typing import AsyncGenerator, Generator
 
 # PostgreSQL Connection URLs
@@ -16,8 +20,47 @@ ASYNC_DATABASE_URL = (
 )
 
 # Create Engines
-sync_engine = create_engine(SYNC_DATABASE_URL, echo=True)
-async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=True)
+ENGINE_OPTIONS = dict(
+    echo=settings.database_echo,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    pool_timeout=settings.database_pool_timeout,
+    pool_recycle=settings.database_pool_recycle,
+    pool_pre_ping=settings.database_pool_pre_ping,
+)
+sync_engine = create_engine(SYNC_DATABASE_URL, poolclass=InstrumentedQueuePool, **ENGINE_OPTIONS)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncAdaptedQueuePool, **ENGINE_OPTIONS)
+instrument_engine(sync_engine)
+instrument_engine(async_engine.sync_engine)
+
+logger = logging.getLogger(__name__)
+
+
+@event.listens_for(sync_engine, "before_cursor_execute")
+def forbid_sync_execute_on_event_loop(conn, cursor, statement, parameters, context, executemany):
+    """
+    Guard against blocking psycopg2 calls from inside an async def handler.
+    Sync `def` routes run in FastAPI's threadpool where no loop is running, so they pass;
+    anything executing on the event loop thread must use get_async_db() instead.
+    Raises in debug mode so the mistake fails fast, and logs a warning otherwise.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    message = f"Blocking sync DB call on the event loop, use get_async_db() instead: {statement[:200]}"
+    if settings.debug:
+        raise RuntimeError(message)
+    logger.warning(message)
+
+
+def pool_status():
+    """Live pool state and checkout telemetry of both engines"""
+    return {
+        "sync": sync_engine.pool.telemetry_snapshot(),
+        "async": async_engine.sync_engine.pool.telemetry_snapshot(),
+    }
+
 
 # Session Factories
 sync_session = sessionmaker(bind=sync_engine, expire_on_commit=False)
@@ -0,0 +1,82 @@
+"""
+Connection pools that time every checkout.
+
+SQLAlchemy only reports pool exhaustion as a TimeoutError after pool_timeout, so
+the pools used by both engines record how long each checkout took, how many
+callers are waiting for a connection right now and how often they gave up.
+"""
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.utils.histogram import Histogram
+
+
+class PoolTelemetry:
+    __slots__ = ("checkouts", "waits", "waiting", "timeouts", "wait_seconds", "checkout_latency", "wait_latency")
+
+    def __init__(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.waiting = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        # Every checkout, and separately the ones that found the pool exhausted and had to queue
+        self.checkout_latency = Histogram()
+        self.wait_latency = Histogram()
+
+
+class InstrumentedPoolMixin:
+    telemetry: PoolTelemetry
+
+    def _do_get(self):
+        telemetry = self.telemetry
+        # A negative max_overflow means unlimited overflow: a checkout never has to queue
+        exhausted = self._max_overflow >= 0 and self.checkedout() >= self.size() + self._max_overflow
+        if exhausted:
+            telemetry.waits += 1
+            telemetry.waiting += 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            telemetry.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            telemetry.checkouts += 1
+            telemetry.checkout_latency.observe(elapsed)
+            if exhausted:
+                telemetry.waiting -= 1
+                telemetry.wait_seconds += elapsed
+                telemetry.wait_latency.observe(elapsed)
+
+    def telemetry_snapshot(self) -> Dict[str, Any]:
+        telemetry = self.telemetry
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout": self._timeout,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "waiting": telemetry.waiting,
+            "checkouts": telemetry.checkouts,
+            "waits": telemetry.waits,
+            "timeouts": telemetry.timeouts,
+            "wait_seconds_total": telemetry.wait_seconds,
+            "checkout_latency_seconds": telemetry.checkout_latency.snapshot(),
+            "wait_latency_seconds": telemetry.wait_latency.snapshot(),
+        }
+
+
+# One class per engine: pools are rebuilt from their class on dispose(), so the
+# telemetry lives on the class rather than the instance and survives that.
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    telemetry = PoolTelemetry()
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    telemetry = PoolTelemetry()
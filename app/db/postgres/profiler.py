@@ -0,0 +1,142 @@
+"""
+Event-hook query profiler for both engines.
+
+Every statement is timed via before/after_cursor_execute and attributed to the
+HTTP request that issued it (tracked in a contextvar, which follows the request
+into FastAPI's threadpool and SQLAlchemy's async greenlets). Statements slower
+than settings.slow_query_ms are logged; at the end of a request the same
+statement shape repeated settings.n_plus_one_threshold times or more is
+reported as a probable N+1, and the totals are returned to the client as
+X-DB-Queries / X-DB-Time headers.
+"""
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# psycopg2 (%(name)s), asyncpg ($1, with an optional ::TYPE cast) and sqlite (?) placeholders
+_PLACEHOLDER = re.compile(r"(?:%\(\w+\)s|\$\d+|%s|\?)(?:::\w+(?:\[\])?)?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape with literals, placeholders and IN-list lengths normalised away"""
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class StatementStats:
+    __slots__ = ("count", "seconds", "rows")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+
+
+class RequestProfile:
+    __slots__ = ("queries", "seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, StatementStats] = {}
+
+    def record(self, shape: str, seconds: float, rows: int) -> None:
+        self.queries += 1
+        self.seconds += seconds
+        stats = self.statements.get(shape)
+        if stats is None:
+            stats = self.statements[shape] = StatementStats()
+        stats.count += 1
+        stats.seconds += seconds
+        stats.rows += max(rows, 0)
+
+    def repeated_statements(self, threshold: int) -> List[str]:
+        return [shape for shape, stats in self.statements.items() if stats.count >= threshold]
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("db_request_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    rows = getattr(cursor, "rowcount", -1) or 0
+    profile = _current_profile.get()
+    shape = None
+    if profile is not None:
+        shape = fingerprint(statement)
+        profile.record(shape, elapsed, rows)
+    if elapsed * 1000 >= settings.slow_query_ms:
+        logger.warning(
+            "Slow query (%.1f ms, %d rows): %s",
+            elapsed * 1000, rows, (shape or fingerprint(statement))[:1000]
+        )
+
+
+def _handle_error(exception_context):
+    # Keep the start-time stack balanced when a statement fails
+    started = exception_context.connection.info.get("query_started_at") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attach the profiler hooks to a sync engine (pass async_engine.sync_engine for async ones)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class QueryProfilerMiddleware:
+    """ASGI middleware collecting a RequestProfile per HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Queries"] = str(profile.queries)
+                headers["X-DB-Time"] = f"{profile.seconds * 1000:.2f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_profile.reset(token)
+            for shape in profile.repeated_statements(settings.n_plus_one_threshold):
+                stats = profile.statements[shape]
+                logger.warning(
+                    "Possible N+1 on %s %s: %d x (%.1f ms total) %s",
+                    scope["method"], scope["path"], stats.count, stats.seconds * 1000, shape[:500]
+                )
+            logger.debug(
+                "%s %s ran %d queries in %.1f ms",
+                scope["method"], scope["path"], profile.queries, profile.seconds * 1000
+            )
@@ -0,0 +1,175 @@
+"""
+Message broker between the workers of a deployment.
+
+Two primitives: fire-and-forget publish/subscribe of JSON messages on named
+channels, and ownership claims (claim a key, learn who held it before, release
+it only if still held). Handlers are plain callables run on the event loop; they
+must not block and should hand longer work to a task.
+
+Backed by Redis pub/sub and keys when REDIS_URL is set, and by an in-process
+implementation otherwise, which is also what tests and single-worker
+deployments use. Like pub/sub itself, delivery is at-most-once: a message
+published while a worker is reconnecting to Redis is lost for that worker.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+import orjson
+
+from app.db.redis.client import get_redis
+from app.utils import serialization
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], None]
+
+# Identifies this process in claims and worker-addressed channels
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class InProcessBroker:
+    """Single-process stand-in for Redis with the same semantics"""
+
+    def __init__(self):
+        self._handlers: Dict[str, Set[Handler]] = defaultdict(set)
+        # key -> (owner, expires at)
+        self._claims: Dict[str, Tuple[str, float]] = {}
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                handler(message)
+            except Exception:
+                logger.exception("Broker handler for %s failed", channel)
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers[channel].add(handler)
+
+    async def unsubscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers[channel].discard(handler)
+        if not self._handlers[channel]:
+            del self._handlers[channel]
+
+    async def claim(self, key: str, owner: str, ttl: int) -> Optional[str]:
+        """Make `owner` hold `key` for `ttl` seconds; returns the previous, unexpired owner"""
+        previous = self._claims.get(key)
+        self._claims[key] = (owner, time.monotonic() + ttl)
+        if previous is None or previous[1] <= time.monotonic():
+            return None
+        return previous[0]
+
+    async def release(self, key: str, owner: str) -> None:
+        """Drop the claim unless someone else has taken it over"""
+        if self._claims.get(key, (None,))[0] == owner:
+            del self._claims[key]
+
+    async def stop(self) -> None:
+        self._handlers.clear()
+
+
+# Compare-and-delete, so a late release never removes the claim of the next owner
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisBroker:
+    def __init__(self, client, prefix: str = "broker", reconnect_delay: float = 2.0):
+        self._client = client
+        self.prefix = prefix
+        self.reconnect_delay = reconnect_delay
+        self._handlers: Dict[str, Set[Handler]] = defaultdict(set)
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _channel(self, channel: str) -> str:
+        return f"{self.prefix}:{channel}"
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        await self._client.publish(self._channel(channel), serialization.dumps(message))
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        first = channel not in self._handlers
+        self._handlers[channel].add(handler)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        elif first and self._pubsub is not None:
+            await self._pubsub.subscribe(self._channel(channel))
+
+    async def unsubscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers[channel].discard(handler)
+        if not self._handlers[channel]:
+            del self._handlers[channel]
+            if self._pubsub is not None:
+                await self._pubsub.unsubscribe(self._channel(channel))
+
+    async def claim(self, key: str, owner: str, ttl: int) -> Optional[str]:
+        # SET ... GET (Redis >= 6.2) swaps the owner and returns the previous one atomically
+        previous = await self._client.set(f"{self.prefix}:claim:{key}", owner, ex=ttl, get=True)
+        return previous.decode() if isinstance(previous, bytes) else previous
+
+    async def release(self, key: str, owner: str) -> None:
+        await self._client.eval(_RELEASE_SCRIPT, 1, f"{self.prefix}:claim:{key}", owner)
+
+    def _dispatch(self, message) -> None:
+        channel = message["channel"].decode()[len(self.prefix) + 1:]
+        try:
+            payload = orjson.loads(message["data"])
+        except orjson.JSONDecodeError:
+            logger.warning("Ignoring malformed broker message on %s", channel)
+            return
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Broker handler for %s failed", channel)
+
+    async def _listen(self) -> None:
+        # A single pub/sub connection per worker; resubscribes to every channel after a reconnect
+        while True:
+            try:
+                self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                if self._handlers:
+                    await self._pubsub.subscribe(*[self._channel(channel) for channel in self._handlers])
+                logger.info("Broker subscribed to %d channels", len(self._handlers))
+                while True:
+                    message = await self._pubsub.get_message(timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        self._dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Broker subscription failed: %s", e)
+            finally:
+                if self._pubsub is not None:
+                    await self._pubsub.aclose()
+                    self._pubsub = None
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _create_broker():
+    client = get_redis()
+    if client is not None:
+        return RedisBroker(client)
+    return InProcessBroker()
+
+
+broker = _create_broker()
@@ -0,0 +1,150 @@
+"""
+Read-through cache of serialized registration documents.
+
+Entries are stored per (shape, registration pk) together with the row's
+updated_at; a lookup only counts as a hit when the caller's updated_at matches,
+so a write that bumps updated_at can never be served stale even if an
+invalidation was missed. PATCH handlers refresh or drop entries explicitly.
+
+Backed by Redis when REDIS_URL is set (configure the server with
+`maxmemory-policy allkeys-lru` for LRU eviction) and by a bounded in-process
+LRU otherwise, which is also what tests use.
+"""
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.db.redis.client import get_redis
+from app.utils import serialization
+from app.utils.lru import TTLCache
+
+logger = logging.getLogger(__name__)
+
+SHAPES = ("mongo", "list")
+
+
+class InMemoryCacheBackend:
+    """In-process stand-in for Redis with the same TTL + LRU semantics"""
+
+    def __init__(self, max_entries: int):
+        self._entries = TTLCache(max_entries)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self._entries.get(key) for key in keys]
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: int) -> None:
+        for key, value in items.items():
+            self._entries.set(key, value, ttl=ttl)
+
+    async def delete(self, keys: List[str]) -> None:
+        for key in keys:
+            self._entries.delete(key)
+
+
+class RedisCacheBackend:
+    def __init__(self, client):
+        self._client = client
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self._client.mget(keys)
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: int) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, value, ex=ttl)
+            await pipe.execute()
+
+    async def delete(self, keys: List[str]) -> None:
+        await self._client.delete(*keys)
+
+
+class RegistrationCache:
+    def __init__(self, backend, ttl: int, prefix: str = "registration"):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, shape: str, registration_pk: int) -> str:
+        return f"{self.prefix}:{shape}:{registration_pk}"
+
+    @staticmethod
+    def _version(updated_at: Optional[datetime]) -> Optional[str]:
+        return updated_at.isoformat() if updated_at else None
+
+    async def get_many(self, shape: str, versions: Mapping[int, Optional[datetime]]) -> Dict[int, Dict[str, Any]]:
+        """Return cached documents for the pks whose cached updated_at matches `versions`"""
+        if not versions:
+            return {}
+        pks = list(versions)
+        try:
+            raw_values = await self.backend.get_many([self._key(shape, pk) for pk in pks])
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Registration cache read failed: %s", e)
+            raw_values = [None] * len(pks)
+
+        found = {}
+        for pk, raw in zip(pks, raw_values):
+            if raw is not None:
+                entry = orjson.loads(raw)
+                if entry["updated_at"] == self._version(versions[pk]):
+                    found[pk] = entry["doc"]
+        self.hits += len(found)
+        self.misses += len(pks) - len(found)
+        return found
+
+    async def get(self, shape: str, registration_pk: int, updated_at: Optional[datetime]) -> Optional[Dict[str, Any]]:
+        return (await self.get_many(shape, {registration_pk: updated_at})).get(registration_pk)
+
+    async def set_many(self, shape: str, documents: Mapping[int, Tuple[Optional[datetime], Dict[str, Any]]]) -> None:
+        """Store {pk: (updated_at, document)}"""
+        if not documents:
+            return
+        items = {
+            self._key(shape, pk): serialization.dumps({"updated_at": self._version(updated_at), "doc": doc})
+            for pk, (updated_at, doc) in documents.items()
+        }
+        try:
+            await self.backend.set_many(items, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Registration cache write failed: %s", e)
+
+    async def set(self, shape: str, registration_pk: int, updated_at: Optional[datetime], document: Dict[str, Any]) -> None:
+        await self.set_many(shape, {registration_pk: (updated_at, document)})
+
+    async def invalidate(self, registration_pks: Iterable[int]) -> None:
+        keys = [self._key(shape, pk) for pk in registration_pks for shape in SHAPES]
+        if not keys:
+            return
+        try:
+            await self.backend.delete(keys)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Registration cache invalidation failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _create_backend():
+    client = get_redis()
+    if client is not None:
+        return RedisCacheBackend(client)
+    return InMemoryCacheBackend(settings.registration_cache_max_entries)
+
+
+registration_cache = RegistrationCache(_create_backend(), settings.registration_cache_ttl)
@@ -0,0 +1,25 @@
+from app.core.config import settings
+
+_client = None
+
+
+def get_redis():
+    """
+    Shared redis.asyncio client, created on first use.
+    Returns None when REDIS_URL is not configured so callers can fall back to in-process state.
+    """
+    global _client
+    if not settings.redis_url:
+        return None
+    if _client is None:
+        # Imported lazily: redis is only required when REDIS_URL is set
+        import redis.asyncio as redis
+        _client = redis.Redis.from_url(settings.redis_url)
+    return _client
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,78 +1,208 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, status
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
+from jose import ExpiredSignatureError, JWTError
 from app.routers import api_router
+from app.services.change_feed import change_feed
+from app.db.postgres.profiler import QueryProfilerMiddleware
+from app.core.auth import is_admin, start_revocation_sync, stop_revocation_sync, verify_access_token
+from app.db.postgres.database import async_session
+from app.services.interview_engine import InterviewSession, answer_buffer, parse_message, partial_transcripts
+from app.services.audio_spool import AudioSpool
+from app.services.connection_manager import interview_connections
+from app.services.interview_routing import CLOSE_SESSION_TAKEN_OVER, SessionClaim, interview_router
+from app.db.redis.broker import broker
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, registry as metrics_registry
+from app.core.logging import setup_logging
+from contextlib import asynccontextmanager
+from typing import Optional
+import asyncio
+import logging
 
-# Load environment variables
-load_dotenv()
+setup_logging()
+logger = logging.getLogger(__name__)
 
-# JWT Configuration
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
-ALGORITHM = "HS256"
-security = HTTPBearer()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Takeover requests from other workers, admin events and token revocations they publish
+    await interview_router.start()
+    await start_revocation_sync()
+    yield
+    # uvicorn has already dropped open sockets by now; this closes any left and stops the reaper
+    await interview_connections.drain(settings.ws_drain_timeout)
+    # Write drafts and answers still buffered by interview sessions before the worker exits
+    await partial_transcripts.stop()
+    await answer_buffer.stop()
+    await interview_router.stop()
+    await stop_revocation_sync()
+    await broker.stop()
+    await change_feed.stop()
 
-# JWT token verification dependency
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+
+app = FastAPI(lifespan=lifespan)
+
+
+async def finish_interview(interview: InterviewSession, spool: Optional[AudioSpool], claim: SessionClaim):
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired"
-        )
-    except jwt.InvalidTokenError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
-        )
+        await partial_transcripts.flush(interview.registration_pk)
+        await answer_buffer.flush(interview.registration_pk)
+        if spool is not None:
+            await spool.close()
+    finally:
+        # A connection taking the session over waits for this
+        claim.finished.set()
+
+
+async def run_interview(websocket: WebSocket, user_id: str, claim: SessionClaim):
+    interview = await InterviewSession.open(claim.session_token)
+    if interview is None:
+        await websocket.close(code=4005, reason="Interview session not found")
+        return
+
+    connection = await interview_connections.connect(websocket, key=interview.registration_pk)
+    if connection is None:
+        # Draining: the client reconnects to another worker
+        return
+    if not interview_router.attach(claim, connection):
+        # A newer connection of the candidate took the session over while this one was opening
+        await connection.close(code=CLOSE_SESSION_TAKEN_OVER, reason="Session resumed elsewhere", drain=False)
+        await interview_connections.disconnect(connection)
+        return
+
+    logger.info("WebSocket connected for user: %s", user_id, extra={"registration_pk": interview.registration_pk})
+    await interview_router.publish_presence(interview, "connected")
+
+    # Opened on the first binary frame: raw audio of the answers, appended as it arrives
+    spool: Optional[AudioSpool] = None
+    try:
+        if not interview.completed:
+            connection.send(interview.question_message())
+        while not interview.completed:
+            message = await connection.receive()
+            if isinstance(message, bytes):
+                if len(message) > settings.interview_audio_max_frame_bytes:
+                    await connection.close(code=1009, reason="Audio frame too large", drain=False)
+                    break
+                if spool is None:
+                    spool = await AudioSpool.open(interview.registration_pk)
+                await spool.write(interview.index + 1, message)
+                continue
+            # Interim transcripts update the draft; the final one answers and moves on to the next question
+            question_order, text, final = parse_message(message)
+            if interview.transcript(question_order, text, final):
+                connection.send(interview.question_message())
+
+        if interview.completed:
+            await answer_buffer.flush(interview.registration_pk)
+            await connection.close(code=1000, reason="Interview completed")
+
+    except WebSocketDisconnect:
+        logger.info("WebSocket disconnected for user: %s", user_id)
+    finally:
+        await interview_connections.disconnect(connection)
+        # Shielded: a cancelled handler must not abort the write of its last answers and audio
+        await asyncio.shield(finish_interview(interview, spool, claim))
+        await interview_router.publish_presence(interview, "completed" if interview.completed else "disconnected")
+
 
 # WebSocket endpoint for interview
 @app.websocket("/ws/interview")
-async def websocket_endpoint(websocket: WebSocket, token: str = None):
+async def websocket_endpoint(websocket: WebSocket, token: str = None, session_token: str = None):
     if not token:
         await websocket.close(code=4001, reason="Token required")
         return
 
     try:
-        # Verify JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Verify JWT token (cached after the first handshake)
+        payload = verify_access_token(token)
         user_id = payload.get("sub")
         
         if not user_id:
             await websocket.close(code=4002, reason="Invalid token payload")
             return
 
-        await websocket.accept()
-        
-        print(f"✅ WebSocket connected for user: {user_id}")
-        
+        # The registration being interviewed: ?session_token= or the token's session_token claim
+        session_token = session_token or payload.get("session_token")
+        if not session_token:
+            await websocket.close(code=4005, reason="Interview session not found")
+            return
+
+        # Whichever worker the candidate reconnects to, the earlier connection lets go of the
+        # session (and writes its buffered answers) before the progress is loaded
+        claim = await interview_router.claim(session_token)
         try:
-            while True:
-                # Receive message from client
-                data = await websocket.receive_text()
-                
-                # Echo back the message to the client
-                await websocket.send_json({
-                    "type": "interview_data",
-                    "content": data,
-                    "message": "Data received for interview",
-                    "timestamp": datetime.now().isoformat()
-                })
-                
-        except WebSocketDisconnect:
-            print(f"❌ WebSocket disconnected for user: {user_id}")
+            await run_interview(websocket, user_id, claim)
+        finally:
+            await interview_router.release(claim)
                 
-    except jwt.ExpiredSignatureError:
+    except ExpiredSignatureError:
         await websocket.close(code=4003, reason="Token expired")
-    except jwt.InvalidTokenError:
+    except JWTError:
         await websocket.close(code=4004, reason="Invalid token")
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.exception("WebSocket error")
         await websocket.close(code=4000, reason="Internal server error")
 
 
+# WebSocket endpoint pushing registration change events to admin dashboards
+@app.websocket("/ws/admin/changes")
+async def admin_changes_websocket(websocket: WebSocket, token: str = None):
+    if not token:
+        await websocket.close(code=4001, reason="Token required")
+        return
+
+    try:
+        payload = verify_access_token(token)
+    except ExpiredSignatureError:
+        await websocket.close(code=4003, reason="Token expired")
+        return
+    except JWTError:
+        await websocket.close(code=4004, reason="Invalid token")
+        return
+
+    # Change events carry every candidate's data: admins (HR) only
+    async with async_session() as db:
+        admin = await is_admin(db, payload)
+    if not admin:
+        await websocket.close(code=4403, reason="Admin access required")
+        return
+
+    await websocket.accept()
+    subscription = change_feed.subscribe()
+    logger.info("Change feed connected for user: %s", payload.get('sub'))
+
+    async def pump():
+        while True:
+            await websocket.send_json(await subscription.get())
+
+    # Events only flow server -> client; reading is just how a disconnect is noticed
+    sender = asyncio.create_task(pump())
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        try:
+            await sender
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("Sending change events failed")
+        change_feed.unsubscribe(subscription)
+        logger.info("Change feed disconnected for user: %s", payload.get('sub'))
+
+
+# Request/WebSocket counters and latency histograms for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Per-request query counts/time (X-DB-Queries / X-DB-Time), slow-query and N+1 logging
+app.add_middleware(QueryProfilerMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -93,6 +223,11 @@ app.include_router(api_router)
 async def favicon():
     return FileResponse("public/favicon.ico")
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/sample")
 async def root():
     return {"message": "Hello World"}
@@ -1,4 +1,6 @@
 from .interview_registration import InterviewRegistration
 from .question_answer import QuestionAnswer
+from .registration_counter import RegistrationCounter
+from .registration_tombstone import RegistrationTombstone
 
-__all__ = ["InterviewRegistration", "QuestionAnswer"]
+__all__ = ["InterviewRegistration", "QuestionAnswer", "RegistrationCounter", "RegistrationTombstone"]
@@ -1,14 +1,19 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from app.db.postgres.database import Base
 
 class InterviewRegistration(Base):
     __tablename__ = "interview_registrations"
+    __table_args__ = (
+        # Prefix LIKE lookups for registration_id suggestions, independent of the collation
+        Index("ix_interview_registrations_registration_id_pattern", "registration_id",
+              postgresql_ops={"registration_id": "text_pattern_ops"}).ddl_if(dialect="postgresql"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
-    email = Column(String(255), nullable=False)
+    email = Column(String(255), nullable=False, index=True)
     registration_id = Column(String(255), unique=True, nullable=False)
     session_token = Column(String(255), unique=True)
     
@@ -17,7 +22,7 @@ class InterviewRegistration(Base):
     resume_summary = Column(Text, nullable=False)
     
     # Interview status and metadata
-    status = Column(String(50), default='not attempted')
+    status = Column(String(50), default='not attempted', index=True)
     current_question_index = Column(Integer, default=-1)
     is_completed = Column(Boolean, default=False)
     
@@ -39,7 +44,7 @@ class InterviewRegistration(Base):
     school_type = Column(String(100), default='')
     
     # HR Review status
-    hr_review = Column(String(50), default='pending')
+    hr_review = Column(String(50), default='pending', index=True)
     
     # Feedback
     feedback = Column(Text, nullable=True)
@@ -50,10 +55,18 @@ class InterviewRegistration(Base):
     resume_comparison = Column(JSON, default={})
     
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationship to question answers
     question_answers = relationship("QuestionAnswer", back_populates="registration", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<InterviewRegistration {self.registration_id} ({self.status})>"
+
+
+# Matches the listing's keyset order (submitted_at DESC NULLS LAST, id DESC)
+Index(
+    "ix_interview_registrations_submitted_at_id",
+    InterviewRegistration.submitted_at.desc().nulls_last(),
+    InterviewRegistration.id.desc()
+).ddl_if(dialect="postgresql")
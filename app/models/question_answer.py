@@ -1,10 +1,14 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.postgres.database import Base
 
 class QuestionAnswer(Base):
     __tablename__ = "question_answers"
+    __table_args__ = (
+        # Serves the FK lookups of every answers load and returns them already in question order
+        Index("ix_question_answers_registration_id_question_order", "registration_id", "question_order"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     registration_id = Column(Integer, ForeignKey('interview_registrations.id', ondelete='CASCADE'), nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String
+from app.db.postgres.database import Base
+
+class RegistrationCounter(Base):
+    """Rollup of interview_registrations counts per (dimension, value), e.g. ("status", "completed")"""
+    __tablename__ = "registration_counters"
+    
+    dimension = Column(String(50), primary_key=True)
+    value = Column(String(255), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RegistrationCounter {self.dimension}={self.value!r}: {self.count}>"
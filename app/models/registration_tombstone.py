@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.db.postgres.database import Base
+
+class RegistrationTombstone(Base):
+    """
+    Marker left behind when an interview registration is deleted, so delta-sync
+    clients can drop it. Written by the AFTER DELETE trigger on interview_registrations.
+    """
+    __tablename__ = "registration_tombstones"
+    
+    id = Column(Integer, primary_key=True)
+    registration_id = Column(String(255), nullable=False)
+    deleted_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RegistrationTombstone {self.registration_id} ({self.deleted_at})>"
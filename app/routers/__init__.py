@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.routers import interview_registrations_db, auth
+from app.routers import interview_registrations_db, auth, internal
 
 # Create a global API router
 api_router = APIRouter()
@@ -7,6 +7,7 @@ api_router = APIRouter()
 # Register routers
 api_router.include_router(interview_registrations_db.router)
 api_router.include_router(auth.router)
+api_router.include_router(internal.router)
 
 
 __all__ = ["api_router"]
@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pydantic import BaseModel
-import hashlib
-import traceback
-from app.db.postgres.database import get_db
+import logging
+from app.core.auth import optional_security, revoke_token
+from app.db.postgres.database import get_async_db
+from app.utils.security import PasswordHashingBusy, check_password
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
@@ -18,56 +22,60 @@ class LoginResponse(BaseModel):
     message: str
     user: Dict[str, Any] = None
 
-def hash_password(password: str) -> str:
-    """Hash password using SHA256"""
-    return hashlib.sha256(password.encode()).hexdigest()
-
 @router.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate user against USERS table
     Returns user info with isAdmin flag for role-based redirection
     """
     try:
-        # Hash the provided password
-        hashed_password = hash_password(login_data.password)
-        
-        # Query user by email and password
+        # Look the user up by email only; the password is checked against the stored hash
         query = text(
             """
-            SELECT userid, name, emailid, isadmin, islogin
+            SELECT userid, name, emailid, isadmin, password
             FROM users
-            WHERE emailid = :email AND password = :password
+            WHERE emailid = :email
             """
         )
         
-        result = db.execute(query, {
-            "email": login_data.username,
-            "password": hashed_password
-        }).fetchone()
+        result = (await db.execute(query, {"email": login_data.username})).fetchone()
+        
+        # Release the connection before the (slow) hash check
+        await db.rollback()
+        try:
+            valid, new_hash = await check_password(login_data.password, result[4] if result else None)
+        except PasswordHashingBusy:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many concurrent logins, please retry",
+                headers={"Retry-After": "1"}
+            )
         
-        if not result:
+        if not result or not valid:
             raise HTTPException(
                 status_code=401, 
                 detail="Invalid credentials"
             )
         
-        # Update login status
+        # Update login status, upgrading a legacy hash unless the password changed meanwhile
         update_query = text(
             """
             UPDATE users
-            SET islogin = true
+            SET islogin = true,
+                password = CASE WHEN password = :old_hash THEN COALESCE(:new_hash, password) ELSE password END
             WHERE userid = :user_id
             """
         )
         
         try:
-            db.execute(update_query, {"user_id": result[0]})
-            db.commit()
+            await db.execute(update_query, {"user_id": result[0], "old_hash": result[4], "new_hash": new_hash})
+            await db.commit()
+            if new_hash:
+                logger.info("Upgraded password hash to bcrypt", extra={"user_id": result[0]})
         except Exception as e:
             # Best-effort update; do not block successful auth
-            db.rollback()
-            print("Login status update failed:", e)
+            await db.rollback()
+            logger.warning("Login status update failed: %s", e)
         
         # Return user info
         user_info = {
@@ -78,13 +86,7 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
             "isLogin": True,
         }
         
-        # Debug logging
-        print(f"🔍 DEBUG: Database result for {login_data.username}:")
-        print(f"🔍 DEBUG: UserId: {result[0]}")
-        print(f"🔍 DEBUG: Name: {result[1]}")
-        print(f"🔍 DEBUG: Email: {result[2]}")
-        print(f"🔍 DEBUG: IsAdmin: {result[3]} (type: {type(result[3])})")
-        print(f"🔍 DEBUG: Final user_info: {user_info}")
+        logger.debug("Login succeeded for %s", login_data.username, extra={"user_id": result[0], "is_admin": user_info["isAdmin"]})
         
         return LoginResponse(
             success=True,
@@ -96,30 +98,37 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
         raise
     except Exception as e:
         try:
-            db.rollback()
+            await db.rollback()
         except Exception:
             pass
-        print("Login error:")
-        traceback.print_exc()
+        logger.exception("Login error")
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error during login: {str(e)}"
         )
 
 @router.post("/logout")
-async def logout(user_id: int, db: Session = Depends(get_db)):
+async def logout(
+    user_id: int,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Logout user by updating IsLogin status
+    The bearer token, if sent, is revoked immediately
     """
     try:
+        if credentials is not None:
+            await revoke_token(credentials.credentials)
+        
         update_query = text("""
             UPDATE users 
             SET IsLogin = false, UpdatedAt = CURRENT_TIMESTAMP 
             WHERE UserId = :user_id
         """)
         
-        db.execute(update_query, {"user_id": user_id})
-        db.commit()
+        await db.execute(update_query, {"user_id": user_id})
+        await db.commit()
         
         return {
             "success": True,
@@ -127,7 +136,7 @@ async def logout(user_id: int, db: Session = Depends(get_db)):
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500, 
             detail="Error during logout"
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends
+from app.core.auth import verify_admin
+from app.core.config import settings
+from app.db.postgres.database import pool_status
+from app.services.connection_manager import interview_connections
+from app.services.interview_engine import partial_transcripts
+from app.services.interview_routing import interview_router
+
+# Operational controls and internals of this worker: admins only
+router = APIRouter(prefix="/internal", tags=["internal"], dependencies=[Depends(verify_admin)])
+
+
+@router.get("/db/pool")
+async def get_db_pool_status():
+    """Connection pool usage of both engines: checked out, overflow, waiters and checkout latency histograms"""
+    return {
+        "success": True,
+        "data": pool_status()
+    }
+
+
+@router.get("/ws")
+async def get_websocket_status():
+    """Open /ws/interview connections, queued messages, drop/stall/reap, session takeover and draft write counts of this worker"""
+    return {
+        "success": True,
+        "data": {**interview_connections.stats(), **interview_router.stats(), **partial_transcripts.stats()}
+    }
+
+
+@router.post("/ws/drain")
+async def drain_websockets():
+    """Stop accepting interviews on this worker and close open ones with 1012 once their queued messages are sent"""
+    await interview_connections.drain(settings.ws_drain_timeout)
+    return {
+        "success": True,
+        "data": interview_connections.stats()
+    }
+
+
+@router.post("/ws/resume")
+async def resume_websockets():
+    """Accept interviews on this worker again after a drain"""
+    interview_connections.resume()
+    return {
+        "success": True,
+        "data": interview_connections.stats()
+    }
@@ -1,224 +1,489 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import desc, and_, or_, tuple_, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
-from app.db.postgres.database import get_db
+from pydantic import BaseModel, Field
+from app.db.postgres.database import get_db, get_async_db
 from app.models.interview_registration import InterviewRegistration
 from app.models.question_answer import QuestionAnswer
-from datetime import datetime
-import json
+from app.models.registration_tombstone import RegistrationTombstone
+from app.schemas.interview_registration import RegistrationFilters
+from app.core.auth import verify_admin
+from app.core.config import settings
+from app.db.redis.cache import registration_cache
+from app.services.audio_spool import read_index, spool_paths
+from app.services.registration_counters import ELIGIBILITY_FLAGS, TOTAL_DIMENSION, read_counters, read_total
+from app.services.registration_documents import (
+    LIST_SHAPE, MONGO_SHAPE, parse_fieldset, registration_load_options
+)
+from app.services.registration_export import stream_csv, stream_xlsx
+from app.services.registration_resolver import registration_resolver
+from app.services.registration_updates import UPDATABLE_FIELDS, update_registrations
+from app.utils.etag import check_etag
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.serialization import json_response
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/interview-registrations", tags=["interview-registrations"])
 
-def format_registration_for_mongodb_compatibility(registration: InterviewRegistration) -> Dict[str, Any]:
-    """Format PostgreSQL data to match MongoDB structure expected by frontend"""
-    
-    # Build questions array from question_answers relationship
-    questions = []
-    for qa in registration.question_answers:
-        questions.append({
-            "question": qa.question_text,
-            "answer": qa.answer_text if qa.is_answered else "",
-            "isAnswered": qa.is_answered,
-            "timestamp": qa.timestamp.isoformat() if qa.timestamp else None
-        })
-    
-    # Extract resume comparison data
-    resume_comparison = registration.resume_comparison or {}
-    
-    return {
-        "_id": str(registration.id),
-        "name": registration.name,
-        "email": registration.email,
-        "registrationId": registration.registration_id,
-        "status": registration.status,
-        "feedback": registration.feedback,
-        "submittedAt": registration.submitted_at.isoformat() if registration.submitted_at else None,
-        "resumeData": {
-            "summary": registration.resume_summary
-        },
-        "workExperienceSummary": registration.work_experience_summary,
-        "positionType": registration.position_type,
-        "schoolType": registration.school_type,
-        "hrReview": registration.hr_review,
-        "questionByUserToHr": registration.question_by_user_to_hr,
-        "hrAnswerToUser": registration.hr_answer_to_user,
-        "interviewData": {
-            "questions": questions,
-            "currentQuestionIndex": registration.current_question_index,
-            "isCompleted": registration.is_completed,
-            "upkEligible": registration.upk_eligible,
-            "teacherEligible": registration.teacher_eligible,
-            "substituteEligible": registration.substitute_eligible,
-            "shiftAvailable": registration.shift_available,
-            "diaperComfortable": registration.diaper_comfortable,
-            "startedAt": registration.started_at.isoformat() if registration.started_at else None,
-            "completedAt": registration.completed_at.isoformat() if registration.completed_at else None
-        },
-        "resumeComparison": {
-            "similarityScore": resume_comparison.get("similarity_score", 0),
-            "overallAssessment": resume_comparison.get("overall_assessment", ""),
-            "matchingPoints": resume_comparison.get("matching_points", []),
-            "discrepancies": resume_comparison.get("discrepancies", []),
-            "recommendation": resume_comparison.get("recommendation", "pending"),
-            "confidence": resume_comparison.get("confidence", 0.0),
-            "analyzedAt": resume_comparison.get("analyzed_at")
-        }
-    }
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def apply_registration_filters(query, filters: RegistrationFilters):
+    """Narrow a registration query by every filter the client supplied"""
+    for field_name, value in filters.model_dump(exclude_none=True).items():
+        query = query.filter(getattr(InterviewRegistration, field_name) == value)
+    return query
+
+
+def apply_registration_cursor(query, cursor: Optional[str]):
+    """Seek past the last row of the previous page (submitted_at DESC NULLS LAST, id DESC)"""
+    if not cursor:
+        return query
+    submitted_at, last_id = decode_cursor(cursor)
+    if submitted_at is None:
+        return query.filter(and_(
+            InterviewRegistration.submitted_at.is_(None),
+            InterviewRegistration.id < last_id
+        ))
+    return query.filter(or_(
+        tuple_(InterviewRegistration.submitted_at, InterviewRegistration.id) < tuple_(submitted_at, last_id),
+        InterviewRegistration.submitted_at.is_(None)
+    ))
+
+
+async def load_registration_documents(db: AsyncSession, shape: str, versions: Dict[int, Optional[datetime]]) -> Dict[int, Dict[str, Any]]:
+    """
+    Read-through: return full documents of the given shape for {pk: updated_at},
+    serving current cache entries and loading + caching only the misses.
+    """
+    documents = await registration_cache.get_many(shape, versions)
+    missing = [pk for pk in versions if pk not in documents]
+    if missing:
+        result = await db.execute(
+            select(InterviewRegistration)
+            .options(selectinload(InterviewRegistration.question_answers))
+            .where(InterviewRegistration.id.in_(missing))
+        )
+        serialize = (LIST_SHAPE if shape == "list" else MONGO_SHAPE).serializer()
+        loaded = {}
+        for registration in result.scalars():
+            document = serialize(registration)
+            loaded[registration.id] = (registration.updated_at, document)
+            documents[registration.id] = document
+        await registration_cache.set_many(shape, loaded)
+    return documents
+
+
+def apply_changes_cursor(query, cursor: Optional[str]):
+    """Seek past the last row of the previous delta page (updated_at ASC, id ASC)"""
+    if not cursor:
+        return query
+    updated_at, last_id = decode_cursor(cursor)
+    return query.filter(
+        tuple_(InterviewRegistration.updated_at, InterviewRegistration.id) > tuple_(updated_at, last_id)
+    )
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """updated_at is stored as naive UTC (datetime.utcnow), so compare against the same"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def format_registration_page(db: AsyncSession, registrations, keys: List[str], include_answers: bool, projected: bool):
+    if projected:
+        serialize = LIST_SHAPE.serializer(keys, include_answers)
+        return [serialize(registration) for registration in registrations]
+    documents = await load_registration_documents(db, "list", {r.id: r.updated_at for r in registrations})
+    return [documents[r.id] for r in registrations if r.id in documents]
+
+
+DELTA_SYNC_SAFETY_WINDOW = timedelta(seconds=5)
+
+
+async def get_registration_changes(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    changed_since: datetime,
+    limit: int,
+    cursor: Optional[str],
+    keys: List[str],
+    include_answers: bool,
+    projected: bool
+):
+    """
+    Delta-sync page: rows whose updated_at is after `changed_since` (oldest first, keyset-paginated)
+    plus tombstones of rows deleted since then. Page through next_cursor, then poll again with the
+    returned watermark.
+    """
+    if projected:
+        query = select(InterviewRegistration).options(*registration_load_options(
+            LIST_SHAPE.columns(keys) + [InterviewRegistration.updated_at], include_answers
+        ))
+    else:
+        query = select(InterviewRegistration.id, InterviewRegistration.updated_at)
+    query = query.filter(InterviewRegistration.updated_at > changed_since)
+    query = apply_changes_cursor(query, cursor)
+    query = query\
+        .order_by(InterviewRegistration.updated_at, InterviewRegistration.id)\
+        .limit(limit + 1)
+    result = await db.execute(query)
+    registrations = result.scalars().all() if projected else result.all()
+
+    next_cursor = None
+    if len(registrations) > limit:
+        registrations = registrations[:limit]
+        last = registrations[-1]
+        next_cursor = encode_cursor(last.updated_at, last.id)
+
+    # Tombstones are reported once, on the first page of a sync
+    deleted = []
+    if not cursor:
+        tombstones = await db.execute(
+            select(RegistrationTombstone)
+            .where(RegistrationTombstone.deleted_at > changed_since)
+            .order_by(RegistrationTombstone.deleted_at)
+        )
+        deleted = [
+            {"id": t.id, "registration_id": t.registration_id, "deleted_at": t.deleted_at}
+            for t in tombstones.scalars()
+        ]
+
+    # updated_at is assigned before commit, so a slower transaction can still land just behind
+    # the newest row we saw; hold the watermark back by a safety window and accept re-sends
+    newest = max(
+        [r.updated_at for r in registrations if r.updated_at] + [t["deleted_at"] for t in deleted],
+        default=changed_since
+    )
+    watermark = max(changed_since, min(newest, datetime.utcnow() - DELTA_SYNC_SAFETY_WINDOW))
+
+    not_modified = check_etag(
+        request, response, "changes", keys, include_answers, changed_since, next_cursor,
+        [(r.id, r.updated_at) for r in registrations], [t["id"] for t in deleted]
+    )
+    if not_modified:
+        return not_modified
+
+    return json_response({
+        "success": True,
+        "data": await format_registration_page(db, registrations, keys, include_answers, projected),
+        "deleted": deleted,
+        "next_cursor": next_cursor,
+        "watermark": watermark
+    }, response)
+
 
 @router.get("/")
-def get_interview_registrations(db: Session = Depends(get_db)):
-    """Get all interview registrations with their question answers from PostgreSQL"""
+async def get_interview_registrations(
+    request: Request,
+    response: Response,
+    filters: RegistrationFilters = Depends(),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    changed_since: Optional[datetime] = Query(None, description="Only rows changed or deleted after this updated_at watermark"),
+    fields: Optional[str] = Query(None, description="Comma-separated output keys to return"),
+    include: Optional[str] = Query(None, description="Related data to embed, e.g. question_answers"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get one keyset-paginated page of interview registrations with their question answers"""
     try:
-        # Query all registrations with their question answers
-        registrations = db.query(InterviewRegistration)\
-            .options(joinedload(InterviewRegistration.question_answers))\
-            .order_by(desc(InterviewRegistration.submitted_at))\
-            .all()
+        keys, include_answers = parse_fieldset(fields, include, LIST_SHAPE)
+        projected = fields is not None or include is not None
+
+        if changed_since is not None:
+            if filters.model_dump(exclude_none=True):
+                # A row that stops matching a filter could never be reported as removed
+                raise HTTPException(status_code=400, detail="changed_since cannot be combined with filters")
+            return await get_registration_changes(
+                request, response, db, to_naive_utc(changed_since), limit, cursor, keys, include_answers, projected
+            )
+
+        if projected:
+            # submitted_at and updated_at are always needed for the next cursor and the ETag
+            query = select(InterviewRegistration).options(*registration_load_options(
+                LIST_SHAPE.columns(keys) + [InterviewRegistration.submitted_at, InterviewRegistration.updated_at],
+                include_answers
+            ))
+        else:
+            # Full documents come from the cache; only the page keys are read here
+            query = select(InterviewRegistration.id, InterviewRegistration.submitted_at, InterviewRegistration.updated_at)
+        query = apply_registration_filters(query, filters)
+        query = apply_registration_cursor(query, cursor)
+
+        # Fetch one extra row to learn whether another page exists
+        query = query\
+            .order_by(desc(InterviewRegistration.submitted_at).nulls_last(), desc(InterviewRegistration.id))\
+            .limit(limit + 1)
+        result = await db.execute(query)
+        registrations = result.scalars().all() if projected else result.all()
+
+        next_cursor = None
+        if len(registrations) > limit:
+            registrations = registrations[:limit]
+            last = registrations[-1]
+            next_cursor = encode_cursor(last.submitted_at, last.id)
+
+        not_modified = check_etag(
+            request, response, "list", keys, include_answers, next_cursor,
+            [(r.id, r.updated_at) for r in registrations]
+        )
+        if not_modified:
+            return not_modified
         
         # Format data for compatibility with existing frontend
-        formatted_data = []
-        for registration in registrations:
-            # Build question_answers array for the simpler format
-            question_answers = []
-            for qa in registration.question_answers:
-                question_answers.append({
-                    "question_text": qa.question_text,
-                    "answer_text": qa.answer_text if qa.is_answered else "",
-                    "question_order": qa.question_order,
-                    "timestamp": qa.timestamp.isoformat() if qa.timestamp else None
-                })
-            
-            # Extract resume comparison data
-            resume_comparison = registration.resume_comparison or {}
-            
-            formatted_registration = {
-                "id": registration.id,
-                "candidate_name": registration.name,
-                "email": registration.email,
-                "registration_id": registration.registration_id,
-                "status": registration.status,
-                "submitted_at": registration.submitted_at.isoformat() if registration.submitted_at else None,
-                "resume_summary": registration.resume_summary,
-                "work_experience_summary": registration.work_experience_summary,
-                "position_type": registration.position_type,
-                "school_type": registration.school_type,
-                "upk_eligible": registration.upk_eligible,
-                "teacher_eligible": registration.teacher_eligible,
-                "substitute_eligible": registration.substitute_eligible,
-                "shift_available": registration.shift_available,
-                "diaper_comfortable": registration.diaper_comfortable,
-                "interview_started_at": registration.started_at.isoformat() if registration.started_at else None,
-                "interview_completed_at": registration.completed_at.isoformat() if registration.completed_at else None,
-                "interview_completed": registration.is_completed,
-                "similarity_score": resume_comparison.get("similarity_score", 0),
-                "overall_assessment": resume_comparison.get("overall_assessment", ""),
-                "matching_points": resume_comparison.get("matching_points", []),
-                "discrepancies": resume_comparison.get("discrepancies", []),
-                "recommendation": resume_comparison.get("recommendation", "pending"),
-                "confidence_score": resume_comparison.get("confidence", 0.0),
-                "question_answers": question_answers,
-                "questionByUserToHr": registration.question_by_user_to_hr,
-                "hrAnswerToUser": registration.hr_answer_to_user
-            }
-            formatted_data.append(formatted_registration)
+        formatted_data = await format_registration_page(db, registrations, keys, include_answers, projected)
         
-        return formatted_data
+        return json_response({
+            "success": True,
+            "data": formatted_data,
+            "next_cursor": next_cursor
+        }, response)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Error in get_interview_registrations: {error_details}")
+        logger.exception("Error in get_interview_registrations")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+async def registrations_version(db: AsyncSession):
+    """
+    Cheap fingerprint of the whole registrations table for the overview ETag: the counter total,
+    the newest tombstone, and (id, updated_at) of rows written within the safety window of the
+    newest write, so a transaction that commits slightly out of updated_at order still changes it.
+    """
+    newest = select(func.max(InterviewRegistration.updated_at)).scalar_subquery()
+    recent = await db.execute(
+        select(InterviewRegistration.id, InterviewRegistration.updated_at)
+        .where(InterviewRegistration.updated_at >= newest - DELTA_SYNC_SAFETY_WINDOW)
+        .order_by(InterviewRegistration.id)
+    )
+    last_deleted = await db.execute(select(func.max(RegistrationTombstone.deleted_at)))
+    total = await db.run_sync(read_total)
+    return total, last_deleted.scalar(), [tuple(row) for row in recent]
+
+
 @router.get("/stats/overview")
-def get_registration_stats(db: Session = Depends(get_db)):
+async def get_registration_stats(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated top-level keys to return"),
+    include: Optional[str] = Query(None, description="Related data to embed, e.g. question_answers"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get overview stats for interview registrations from PostgreSQL - MongoDB format compatible"""
     try:
-        # Query all registrations with their question answers
-        registrations = db.query(InterviewRegistration)\
-            .options(joinedload(InterviewRegistration.question_answers))\
-            .order_by(desc(InterviewRegistration.submitted_at))\
-            .all()
-        
-        print(f"Found {len(registrations)} registrations in database")
-        for reg in registrations:
-            print(f"Registration ID: {reg.id}, Name: {reg.name}")
-        
-        # Format data to match MongoDB structure exactly
-        formatted_data = []
-        for registration in registrations:
-            formatted_registration = format_registration_for_mongodb_compatibility(registration)
-            print(f"Formatted registration _id: {formatted_registration['_id']}, name: {formatted_registration['name']}")
-            formatted_data.append(formatted_registration)
-        
-        return {
+        keys, include_answers = parse_fieldset(fields, include, MONGO_SHAPE)
+
+        total, last_deleted, recent = await registrations_version(db)
+        not_modified = check_etag(request, response, "overview", keys, include_answers, total, last_deleted, recent)
+        if not_modified:
+            return not_modified
+
+        if fields is not None or include is not None:
+            # Query all registrations, loading only the requested columns
+            result = await db.execute(
+                select(InterviewRegistration)
+                .options(*registration_load_options(MONGO_SHAPE.columns(keys), include_answers))
+                .order_by(desc(InterviewRegistration.submitted_at))
+            )
+            serialize = MONGO_SHAPE.serializer(keys, include_answers)
+            formatted_data = [serialize(registration) for registration in result.scalars()]
+        else:
+            result = await db.execute(
+                select(InterviewRegistration.id, InterviewRegistration.updated_at)
+                .order_by(desc(InterviewRegistration.submitted_at))
+            )
+            versions = {row.id: row.updated_at for row in result}
+            documents = await load_registration_documents(db, "mongo", versions)
+            formatted_data = [documents[pk] for pk in versions if pk in documents]
+        
+        logger.debug("Found %d registrations in database", len(formatted_data))
+        
+        return json_response({
             "success": True,
+            "total": total,
             "data": formatted_data
-        }
+        }, response)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Error in get_registration_stats: {error_details}")
+        logger.exception("Error in get_registration_stats")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@router.get("/stats/cache")
+async def get_registration_cache_stats():
+    """Hit/miss counters of the registration document cache"""
+    return {
+        "success": True,
+        "data": registration_cache.stats()
+    }
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv; charset=utf-8"),
+    "xlsx": (stream_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+@router.get("/export", dependencies=[Depends(verify_admin)])
+async def export_registrations(
+    format: str = Query("csv", description="csv or xlsx"),
+    filters: RegistrationFilters = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream every registration matching the filters as a spreadsheet, one column per question/answer"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format '{format}', expected csv or xlsx")
+    stream, media_type = EXPORT_FORMATS[format]
+
+    # Number of question/answer column pairs, known up front so the header can be written first
+    question_count_query = apply_registration_filters(
+        select(func.max(QuestionAnswer.question_order)).join(
+            InterviewRegistration, QuestionAnswer.registration_id == InterviewRegistration.id
+        ),
+        filters
+    )
+    question_count = (await db.execute(question_count_query)).scalar() or 0
+
+    query = apply_registration_filters(
+        select(InterviewRegistration).options(selectinload(InterviewRegistration.question_answers)),
+        filters
+    ).order_by(InterviewRegistration.id)
+
+    filename = f"interview_registrations_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{format}"
+    return StreamingResponse(
+        stream(query, question_count),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/{registration_id}")
-def get_registration_by_id(registration_id: int, db: Session = Depends(get_db)):
+async def get_registration_by_id(
+    registration_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated top-level keys to return"),
+    include: Optional[str] = Query(None, description="Related data to embed, e.g. question_answers"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get a specific registration by ID from PostgreSQL"""
     try:
-        registration = db.query(InterviewRegistration)\
-            .options(joinedload(InterviewRegistration.question_answers))\
-            .filter(InterviewRegistration.id == registration_id)\
-            .first()
-        
-        if not registration:
+        keys, include_answers = parse_fieldset(fields, include, MONGO_SHAPE)
+
+        result = await db.execute(
+            select(InterviewRegistration.updated_at).where(InterviewRegistration.id == registration_id)
+        )
+        version = result.first()
+        if not version:
             raise HTTPException(status_code=404, detail="Registration not found")
-        
-        # Format for MongoDB compatibility
-        formatted_registration = format_registration_for_mongodb_compatibility(registration)
-        
-        return {
+
+        not_modified = check_etag(request, response, "registration", registration_id, version.updated_at, keys, include_answers)
+        if not_modified:
+            return not_modified
+
+        if fields is not None or include is not None:
+            result = await db.execute(
+                select(InterviewRegistration)
+                .options(*registration_load_options(MONGO_SHAPE.columns(keys), include_answers))
+                .where(InterviewRegistration.id == registration_id)
+            )
+            registration = result.scalars().first()
+            if not registration:
+                raise HTTPException(status_code=404, detail="Registration not found")
+            formatted_registration = MONGO_SHAPE.serialize(registration, keys, include_answers)
+        else:
+            # Format for MongoDB compatibility, served from the cache when current
+            documents = await load_registration_documents(db, "mongo", {registration_id: version.updated_at})
+            if registration_id not in documents:
+                raise HTTPException(status_code=404, detail="Registration not found")
+            formatted_registration = documents[registration_id]
+        
+        return json_response({
             "success": True,
             "data": formatted_registration
-        }
+        }, response)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@router.get("/{registration_id}/audio", dependencies=[Depends(verify_admin)])
+async def get_registration_audio(registration_id: int):
+    """Raw interview audio of a registration; honours Range requests (byte ranges per question: /audio/index)"""
+    audio_path, _ = spool_paths(registration_id)
+    if not os.path.exists(audio_path):
+        raise HTTPException(status_code=404, detail="No audio recorded for this registration")
+    return FileResponse(audio_path, media_type=settings.interview_audio_content_type)
+
+
+@router.get("/{registration_id}/audio/index", dependencies=[Depends(verify_admin)])
+async def get_registration_audio_index(registration_id: int):
+    """
+    Byte ranges of the recorded audio by question order, oldest first. The segment being recorded
+    right now is listed once its question is answered or the connection closes.
+    """
+    audio_path, _ = spool_paths(registration_id)
+    if not os.path.exists(audio_path):
+        raise HTTPException(status_code=404, detail="No audio recorded for this registration")
+    segments = await asyncio.to_thread(read_index, registration_id)
+    return {
+        "success": True,
+        "data": {
+            "contentType": settings.interview_audio_content_type,
+            "size": os.path.getsize(audio_path),
+            "segments": [
+                {
+                    "questionOrder": segment["question"],
+                    "start": segment["start"],
+                    "end": segment["end"],
+                    "range": f"bytes={segment['start']}-{segment['end'] - 1}"
+                }
+                for segment in segments
+            ]
+        }
+    }
+
+
+LEGACY_STATUSES = ("pending", "in_progress", "completed", "rejected")
+
+
 @router.get("/stats/summary")
 def get_registration_summary_stats(db: Session = Depends(get_db)):
-    """Get summary statistics for registrations from PostgreSQL"""
+    """Get summary statistics for registrations from the registration_counters rollup"""
     try:
-        # Get total counts by status
-        total_registrations = db.query(InterviewRegistration).count()
-        pending_count = db.query(InterviewRegistration).filter(InterviewRegistration.status == "pending").count()
-        in_progress_count = db.query(InterviewRegistration).filter(InterviewRegistration.status == "in_progress").count()
-        completed_count = db.query(InterviewRegistration).filter(InterviewRegistration.status == "completed").count()
-        rejected_count = db.query(InterviewRegistration).filter(InterviewRegistration.status == "rejected").count()
-        
-        # Get eligibility stats
-        upk_eligible_count = db.query(InterviewRegistration).filter(InterviewRegistration.upk_eligible == True).count()
-        teacher_eligible_count = db.query(InterviewRegistration).filter(InterviewRegistration.teacher_eligible == True).count()
-        substitute_eligible_count = db.query(InterviewRegistration).filter(InterviewRegistration.substitute_eligible == True).count()
+        counters = read_counters(db)
+
+        status_breakdown = {status: 0 for status in LEGACY_STATUSES}
+        for value, count in counters.get("status", {}).items():
+            if count:
+                status_breakdown[value or "unknown"] = count
+
+        hr_review_breakdown = {
+            value or "unknown": count
+            for value, count in counters.get("hr_review", {}).items()
+            if count
+        }
         
         return {
             "success": True,
             "data": {
-                "total_registrations": total_registrations,
-                "status_breakdown": {
-                    "pending": pending_count,
-                    "in_progress": in_progress_count,
-                    "completed": completed_count,
-                    "rejected": rejected_count
-                },
+                "total_registrations": counters.get(TOTAL_DIMENSION, {}).get("", 0),
+                "status_breakdown": status_breakdown,
+                "hr_review_breakdown": hr_review_breakdown,
                 "eligibility_stats": {
-                    "upk_eligible": upk_eligible_count,
-                    "teacher_eligible": teacher_eligible_count,
-                    "substitute_eligible": substitute_eligible_count
+                    flag: counters.get(flag, {}).get("true", 0)
+                    for flag in ELIGIBILITY_FLAGS
                 }
             }
         }
@@ -248,53 +513,152 @@ class HrAnswerUpdate(BaseModel):
     hrAnswerToUser: Optional[str] = None
 
 
+BULK_UPDATE_LIMIT = 500
+
+
+class BulkRegistrationUpdate(BaseModel):
+    registrationIds: List[str] = Field(..., min_length=1, max_length=BULK_UPDATE_LIMIT)
+    status: Optional[str] = None
+    hrReview: Optional[str] = None
+    positionType: Optional[str] = None
+    schoolType: Optional[str] = None
+
+
+@router.patch("/bulk", response_model=Dict[str, Any])
+async def bulk_update_registrations(
+    bulk_data: BulkRegistrationUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Apply the same status / HR review / role changes to many registrations (by registrationId)
+    in one transaction and one UPDATE. Returns a result per requested id.
+    """
+    changes = bulk_data.model_dump(exclude_none=True, exclude={"registrationIds"})
+    if not changes:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    try:
+        resolved = await registration_resolver.resolve_many(db, bulk_data.registrationIds)
+        updated = await update_registrations(db, resolved.values(), changes, "bulk_update")
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.exception("Error applying bulk update")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    await registration_cache.invalidate([row.id for row in updated.values()])
+    logger.info("Bulk updated %d of %d registrations", len(updated), len(bulk_data.registrationIds))
+
+    results = []
+    for registration_id in dict.fromkeys(bulk_data.registrationIds):
+        row = updated.get(registration_id)
+        if row is None:
+            registration_resolver.forget(registration_id)
+            results.append({"registrationId": registration_id, "success": False, "error": "Registration not found"})
+        else:
+            results.append({"registrationId": registration_id, "success": True, "updatedAt": _isoformat(row.updated_at)})
+
+    return {
+        "success": True,
+        "message": f"Updated {len(updated)} registrations",
+        "updated": len(updated),
+        "data": results
+    }
+
+
+def patch_returns_full_document(
+    request: Request,
+    return_mode: Optional[str] = Query(None, alias="return", description="minimal / fields (default) or full / representation")
+) -> bool:
+    """
+    Whether a PATCH should answer with the whole registration document. By default only the
+    touched fields and updatedAt come back; ?return=full or Prefer: return=representation opts in.
+    """
+    if return_mode is None:
+        prefer = request.headers.get("prefer", "")
+        preferences = {part.strip().lower() for part in prefer.replace(";", ",").split(",")}
+        return "return=representation" in preferences
+    if return_mode in ("full", "representation"):
+        return True
+    if return_mode in ("minimal", "fields"):
+        return False
+    raise HTTPException(status_code=400, detail=f"Unsupported return mode '{return_mode}'")
+
+
+async def raise_registration_not_found(db: AsyncSession, registration_id: str):
+    suggestions = await registration_resolver.suggest(db, registration_id)
+    detail = f"Registration {registration_id} not found"
+    if suggestions:
+        detail += f". Did you mean: {', '.join(suggestions)}?"
+    raise HTTPException(status_code=404, detail=detail)
+
+
+async def update_single_registration(
+    db: AsyncSession,
+    registration_id: str,
+    changes: Dict[str, Any],
+    event: str,
+    full_document: bool
+) -> Dict[str, Any]:
+    """
+    Write `changes` to one registration with UPDATE ... RETURNING and build the response data:
+    the touched fields plus updatedAt, or the full MongoDB-compatible document when asked for.
+    """
+    logger.debug("Looking for registration with registrationId: %s", registration_id)
+    pk = await registration_resolver.resolve(db, registration_id)
+    if pk is None:
+        await raise_registration_not_found(db, registration_id)
+    updated = await update_registrations(db, [pk], changes, event)
+    row = updated.get(registration_id)
+    if row is None:
+        # The cached pk is stale (the row was deleted, perhaps re-created under a new pk): resolve once more
+        registration_resolver.forget(registration_id)
+        pk = await registration_resolver.resolve(db, registration_id)
+        if pk is not None:
+            updated = await update_registrations(db, [pk], changes, event)
+            row = updated.get(registration_id)
+    if row is None:
+        await raise_registration_not_found(db, registration_id)
+    await db.commit()
+    await registration_cache.invalidate([row.id])
+
+    if full_document:
+        documents = await load_registration_documents(db, "mongo", {row.id: row.updated_at})
+        return documents[row.id]
+
+    data = {"registrationId": row.registration_id, "updatedAt": _isoformat(row.updated_at)}
+    for field in changes:
+        data[field] = getattr(row, UPDATABLE_FIELDS[field])
+    return data
+
+
 @router.patch("/{registration_id:path}/feedback", response_model=Dict[str, Any])
 async def update_registration_feedback(
     registration_id: str,
     feedback_data: FeedbackUpdate,
-    db: Session = Depends(get_db)
+    full_document: bool = Depends(patch_returns_full_document),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update the feedback for a specific registration using registrationId
     """
     try:
-        print(f"Looking for registration with registrationId: {registration_id}")
-        
-        # Find the registration by registration_id field (not database id)
-        registration = db.query(InterviewRegistration).filter(
-            InterviewRegistration.registration_id == registration_id
-        ).first()
+        data = await update_single_registration(
+            db, registration_id, {"feedback": feedback_data.feedback}, "feedback", full_document
+        )
         
-        if not registration:
-            # Debug: Check what registrations exist
-            all_registrations = db.query(InterviewRegistration).all()
-            existing_reg_ids = [r.registration_id for r in all_registrations]
-            print(f"Available registration IDs: {existing_reg_ids}")
-            raise HTTPException(status_code=404, detail=f"Registration not found. Available registration IDs: {existing_reg_ids}")
+        logger.info("Updated feedback for registration %s", registration_id)
         
-        print(f"Found registration: {registration.registration_id}, {registration.name}")
-        
-        # Update the feedback
-        registration.feedback = feedback_data.feedback
-        registration.updated_at = datetime.utcnow()
-        
-        db.commit()
-        db.refresh(registration)
-        
-        print(f"Updated feedback for registration {registration.registration_id}")
-        
-        # Return the updated registration in the expected format
-        formatted_registration = format_registration_for_mongodb_compatibility(registration)
         return {
             "success": True,
             "message": "Feedback updated successfully",
-            "data": formatted_registration
+            "data": data
         }
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        print(f"Error updating feedback: {str(e)}")
+        await db.rollback()
+        logger.exception("Error updating feedback")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -302,53 +666,29 @@ async def update_registration_feedback(
 async def update_registration_role_details(
     registration_id: str,
     role_data: RoleDetailsUpdate,
-    db: Session = Depends(get_db)
+    full_document: bool = Depends(patch_returns_full_document),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update the role details (position type and school type) for a specific registration using registrationId
     """
     try:
-        print(f"Looking for registration with registrationId: {registration_id}")
-        
-        # Find the registration by registration_id field (not database id)
-        registration = db.query(InterviewRegistration).filter(
-            InterviewRegistration.registration_id == registration_id
-        ).first()
-        
-        if not registration:
-            # Debug: Check what registrations exist
-            all_registrations = db.query(InterviewRegistration).all()
-            existing_reg_ids = [r.registration_id for r in all_registrations]
-            print(f"Available registration IDs: {existing_reg_ids}")
-            raise HTTPException(status_code=404, detail=f"Registration not found. Available registration IDs: {existing_reg_ids}")
-        
-        print(f"Found registration: {registration.registration_id}, {registration.name}")
-        
-        # Update the role details
-        if role_data.positionType is not None:
-            registration.position_type = role_data.positionType
-        if role_data.schoolType is not None:
-            registration.school_type = role_data.schoolType
-            
-        registration.updated_at = datetime.utcnow()
+        data = await update_single_registration(
+            db, registration_id, role_data.model_dump(exclude_none=True), "role_details", full_document
+        )
         
-        db.commit()
-        db.refresh(registration)
+        logger.info("Updated role details for registration %s", registration_id)
         
-        print(f"Updated role details for registration {registration.registration_id}")
-        
-        # Return the updated registration in the expected format
-        formatted_registration = format_registration_for_mongodb_compatibility(registration)
         return {
             "success": True,
             "message": "Role details updated successfully",
-            "data": formatted_registration
+            "data": data
         }
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        print(f"Error updating role details: {str(e)}")
+        await db.rollback()
+        logger.exception("Error updating role details")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -356,51 +696,29 @@ async def update_registration_role_details(
 async def update_registration_status(
     registration_id: str,
     status_data: StatusUpdate,
-    db: Session = Depends(get_db)
+    full_document: bool = Depends(patch_returns_full_document),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update the status for a specific registration using registrationId
     """
     try:
-        print(f"Looking for registration with registrationId: {registration_id}")
-        
-        # Find the registration by registration_id field (not database id)
-        registration = db.query(InterviewRegistration).filter(
-            InterviewRegistration.registration_id == registration_id
-        ).first()
-        
-        if not registration:
-            # Debug: Check what registrations exist
-            all_registrations = db.query(InterviewRegistration).all()
-            existing_reg_ids = [r.registration_id for r in all_registrations]
-            print(f"Available registration IDs: {existing_reg_ids}")
-            raise HTTPException(status_code=404, detail=f"Registration not found. Available registration IDs: {existing_reg_ids}")
-        
-        print(f"Found registration: {registration.registration_id}, {registration.name}")
+        data = await update_single_registration(
+            db, registration_id, status_data.model_dump(exclude_none=True), "status", full_document
+        )
         
-        # Update the status
-        if status_data.status is not None:
-            registration.status = status_data.status
-            
-        registration.updated_at = datetime.utcnow()
+        logger.info("Updated status for registration %s", registration_id)
         
-        db.commit()
-        db.refresh(registration)
-        
-        print(f"Updated status for registration {registration.registration_id}")
-        
-        # Return the updated registration in the expected format
-        formatted_registration = format_registration_for_mongodb_compatibility(registration)
         return {
             "success": True,
             "message": "Status updated successfully",
-            "data": formatted_registration
+            "data": data
         }
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        print(f"Error updating status: {str(e)}")
+        await db.rollback()
+        logger.exception("Error updating status")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -408,51 +726,29 @@ async def update_registration_status(
 async def update_registration_hr_review(
     registration_id: str,
     hr_review_data: HrReviewUpdate,
-    db: Session = Depends(get_db)
+    full_document: bool = Depends(patch_returns_full_document),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update the HR review status for a specific registration using registrationId
     """
     try:
-        print(f"Looking for registration with registrationId: {registration_id}")
-        
-        # Find the registration by registration_id field (not database id)
-        registration = db.query(InterviewRegistration).filter(
-            InterviewRegistration.registration_id == registration_id
-        ).first()
-        
-        if not registration:
-            # Debug: Check what registrations exist
-            all_registrations = db.query(InterviewRegistration).all()
-            existing_reg_ids = [r.registration_id for r in all_registrations]
-            print(f"Available registration IDs: {existing_reg_ids}")
-            raise HTTPException(status_code=404, detail=f"Registration not found. Available registration IDs: {existing_reg_ids}")
+        data = await update_single_registration(
+            db, registration_id, hr_review_data.model_dump(exclude_none=True), "hr_review", full_document
+        )
         
-        print(f"Found registration: {registration.registration_id}, {registration.name}")
+        logger.info("Updated HR review status for registration %s", registration_id)
         
-        # Update the HR review status
-        if hr_review_data.hrReview is not None:
-            registration.hr_review = hr_review_data.hrReview
-            
-        registration.updated_at = datetime.utcnow()
-        
-        db.commit()
-        db.refresh(registration)
-        
-        print(f"Updated HR review status for registration {registration.registration_id}")
-        
-        # Return the updated registration in the expected format
-        formatted_registration = format_registration_for_mongodb_compatibility(registration)
         return {
             "success": True,
             "message": "HR review status updated successfully",
-            "data": formatted_registration
+            "data": data
         }
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        print(f"Error updating HR review status: {str(e)}")
+        await db.rollback()
+        logger.exception("Error updating HR review status")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -460,38 +756,25 @@ async def update_registration_hr_review(
 async def update_registration_hr_answer(
     registration_id: str,
     hr_answer_data: HrAnswerUpdate,
-    db: Session = Depends(get_db)
+    full_document: bool = Depends(patch_returns_full_document),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update the HR answer to user question for a specific registration using registrationId
     """
     try:
-        # Find the registration by registration_id field (not database id)
-        registration = db.query(InterviewRegistration).filter(
-            InterviewRegistration.registration_id == registration_id
-        ).first()
-        
-        if not registration:
-            raise HTTPException(status_code=404, detail=f"Registration with ID {registration_id} not found")
-        
-        # Update the HR answer
-        if hr_answer_data.hrAnswerToUser is not None:
-            registration.hr_answer_to_user = hr_answer_data.hrAnswerToUser
-        
-        db.commit()
-        db.refresh(registration)
+        data = await update_single_registration(
+            db, registration_id, hr_answer_data.model_dump(exclude_none=True), "hr_answer", full_document
+        )
         
         return {
             "success": True,
             "message": "HR answer updated successfully",
-            "data": {
-                "registrationId": registration.registration_id,
-                "hrAnswerToUser": registration.hr_answer_to_user
-            }
+            "data": data
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error updating HR answer: {str(e)}")
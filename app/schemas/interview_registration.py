@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class RegistrationFilters(BaseModel):
+    """Server-side filters shared by the registration listing endpoints"""
+    status: Optional[str] = None
+    hr_review: Optional[str] = None
+    position_type: Optional[str] = None
+    school_type: Optional[str] = None
+    upk_eligible: Optional[bool] = None
+    teacher_eligible: Optional[bool] = None
+    substitute_eligible: Optional[bool] = None
+    shift_available: Optional[bool] = None
+    diaper_comfortable: Optional[bool] = None
+
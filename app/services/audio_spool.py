@@ -0,0 +1,174 @@
+"""
+Append-only spool files of interview audio.
+
+Binary frames received on /ws/interview are appended to one file per
+registration (<pk>.audio under INTERVIEW_AUDIO_DIR) with os.write on a
+memoryview of the received buffer, so a chunk is neither copied nor
+accumulated: per-session memory is one frame, bounded by
+INTERVIEW_AUDIO_MAX_FRAME_BYTES, however long the candidate talks. Every disk
+write runs in a worker thread, awaited by the session's handler so frames stay
+in order, and never on the event loop. fsync runs in a worker thread as well,
+once INTERVIEW_AUDIO_FSYNC_BYTES are unsynced or the fsync interval has
+passed, never per frame.
+
+Each contiguous run of audio recorded while one question was current is logged
+to the <pk>.index sidecar as a JSON line {"question": order, "start": s,
+"end": e} (end exclusive) when the question changes or the session ends, so a
+player can range-request exactly the audio of one answer. A run cut off by a
+crash is logged with question null when the spool is next opened. Reconnects
+append to the same files.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+
+
+def spool_paths(registration_pk: int) -> Tuple[str, str]:
+    base = os.path.join(settings.interview_audio_dir, str(registration_pk))
+    return f"{base}.audio", f"{base}.index"
+
+
+def read_index(registration_pk: int) -> List[Dict[str, Any]]:
+    """Recorded segments of a registration, oldest first (blocking; run it in a thread)"""
+    try:
+        with open(spool_paths(registration_pk)[1], "rb") as index:
+            return [orjson.loads(line) for line in index if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def _write_all(fd: int, data) -> None:
+    view = memoryview(data)
+    while view:
+        # Slicing a memoryview does not copy; a short write only advances the view
+        view = view[os.write(fd, view):]
+
+
+class AudioSpool:
+    __slots__ = (
+        "registration_pk", "fd", "index_fd", "size", "question", "segment_start",
+        "unsynced", "synced_at", "sync_task", "write_task", "full"
+    )
+
+    def __init__(self, registration_pk: int, fd: int, index_fd: int, size: int):
+        self.registration_pk = registration_pk
+        self.fd = fd
+        self.index_fd = index_fd
+        self.size = size
+        # question_order of the segment being recorded, None between segments
+        self.question: Optional[int] = None
+        self.segment_start = size
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+        self.sync_task: Optional[asyncio.Task] = None
+        # The chunk being written in a worker thread; close() waits for it
+        self.write_task: Optional[asyncio.Future] = None
+        self.full = False
+
+    @classmethod
+    async def open(cls, registration_pk: int) -> "AudioSpool":
+        return await asyncio.to_thread(cls._open, registration_pk)
+
+    @classmethod
+    def _open(cls, registration_pk: int) -> "AudioSpool":
+        os.makedirs(settings.interview_audio_dir, exist_ok=True)
+        audio_path, index_path = spool_paths(registration_pk)
+        fd = os.open(audio_path, _FLAGS, 0o640)
+        index_fd = os.open(index_path, _FLAGS, 0o640)
+        spool = cls(registration_pk, fd, index_fd, os.fstat(fd).st_size)
+        indexed = max((segment["end"] for segment in read_index(registration_pk)), default=0)
+        if spool.size > indexed:
+            spool._log_segment(None, indexed, spool.size)
+        return spool
+
+    async def write(self, question_order: int, data: bytes) -> bool:
+        """Append one chunk for `question_order`; False once INTERVIEW_AUDIO_MAX_SESSION_BYTES is reached or if the write failed"""
+        if self.size + len(data) > settings.interview_audio_max_session_bytes:
+            if not self.full:
+                self.full = True
+                logger.warning("Audio spool is full; dropping further audio", extra={"registration_pk": self.registration_pk})
+            return False
+        segment = None
+        if question_order != self.question:
+            segment = self._end_segment()
+            self.question = question_order
+        # Counted up front: a cancelled handler does not stop the thread from writing the chunk
+        self.size += len(data)
+        self.write_task = asyncio.ensure_future(asyncio.to_thread(self._append, segment, data))
+        try:
+            await asyncio.shield(self.write_task)
+        except OSError as e:
+            # Whatever part of the chunk reached the file stays; offsets follow the file again
+            self.write_task = None
+            self.size = os.fstat(self.fd).st_size
+            logger.error("Writing audio spool failed: %s", e, extra={"registration_pk": self.registration_pk})
+            return False
+        self.unsynced += len(data)
+        if self.sync_task is None and (
+            self.unsynced >= settings.interview_audio_fsync_bytes
+            or time.monotonic() - self.synced_at >= settings.interview_audio_fsync_interval
+        ):
+            self.sync_task = asyncio.create_task(self._sync())
+        return True
+
+    def _end_segment(self) -> Optional[Tuple[int, int, int]]:
+        """Close the open segment; returns its (question, start, end) to log if it holds audio"""
+        segment = None
+        if self.question is not None and self.size > self.segment_start:
+            segment = (self.question, self.segment_start, self.size)
+        self.question = None
+        self.segment_start = self.size
+        return segment
+
+    def _append(self, segment: Optional[Tuple[int, int, int]], data: bytes) -> None:
+        if segment is not None:
+            self._log_segment(*segment)
+        _write_all(self.fd, data)
+
+    def _log_segment(self, question: Optional[int], start: int, end: int) -> None:
+        _write_all(self.index_fd, orjson.dumps({"question": question, "start": start, "end": end}) + b"\n")
+
+    def _fsync(self) -> None:
+        os.fsync(self.fd)
+        os.fsync(self.index_fd)
+
+    async def _sync(self) -> None:
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+        try:
+            await asyncio.to_thread(self._fsync)
+        except OSError as e:
+            logger.error("Syncing audio spool failed: %s", e, extra={"registration_pk": self.registration_pk})
+        finally:
+            self.sync_task = None
+
+    def _close_files(self, segment: Optional[Tuple[int, int, int]]) -> None:
+        try:
+            if segment is not None:
+                self._log_segment(*segment)
+            self._fsync()
+        finally:
+            os.close(self.fd)
+            os.close(self.index_fd)
+
+    async def close(self) -> None:
+        """Log the open segment, sync and close; shield it from cancellation like the answer flush"""
+        segment = self._end_segment()
+        if self.write_task is not None:
+            try:
+                await self.write_task
+            except OSError as e:
+                logger.error("Writing audio spool failed: %s", e, extra={"registration_pk": self.registration_pk})
+        if self.sync_task is not None:
+            await self.sync_task
+        await asyncio.to_thread(self._close_files, segment)
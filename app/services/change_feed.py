@@ -0,0 +1,162 @@
+"""
+Row-level change feed for admin dashboards over Postgres LISTEN/NOTIFY.
+
+Writers call publish_registration_change() inside their transaction; Postgres
+delivers the NOTIFY only if and when that transaction commits. Each worker
+holds a single LISTEN connection and fans every event out to its subscribers,
+each of which owns a bounded queue: when a slow client falls behind, its
+backlog is discarded and it is told to resync instead of letting memory grow
+without limit.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set
+
+from sqlalchemy import Text, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.interview_registration import InterviewRegistration
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "registration_changes"
+
+# Postgres caps NOTIFY payloads at 8000 bytes, so long text columns are reported by name only
+INLINE_FIELDS = {"status", "hrReview", "positionType", "schoolType"}
+
+
+def _change_payload(registration, event: str, changes: Dict[str, Any]) -> str:
+    return json.dumps({
+        "type": "registration_changed",
+        "event": event,
+        "id": registration.id,
+        "registrationId": registration.registration_id,
+        "updatedAt": registration.updated_at.isoformat() if registration.updated_at else None,
+        "changes": {key: value for key, value in changes.items() if key in INLINE_FIELDS},
+        "fields": sorted(changes),
+    })
+
+
+async def publish_registration_change(
+    db: AsyncSession,
+    registration: InterviewRegistration,
+    event: str,
+    changes: Dict[str, Any]
+) -> None:
+    """Queue a change event on the current transaction; it is delivered on commit"""
+    await db.execute(select(func.pg_notify(CHANNEL, _change_payload(registration, event, changes))))
+
+
+async def publish_registration_changes(
+    db: AsyncSession,
+    registrations: Iterable[Any],
+    event: str,
+    changes: Dict[str, Any]
+) -> None:
+    """
+    Queue the same change for many registrations in a single statement. Accepts ORM objects
+    or rows exposing id, registration_id and updated_at (e.g. UPDATE ... RETURNING rows).
+    """
+    payloads = [_change_payload(registration, event, changes) for registration in registrations]
+    if not payloads:
+        return
+    unnested = func.unnest(bindparam("payloads", payloads, type_=ARRAY(Text))).table_valued("payload").render_derived()
+    await db.execute(select(func.pg_notify(CHANNEL, unnested.c.payload)))
+
+
+class Subscription:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, max_events: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(max_events, 2))
+        self.dropped = 0
+
+    def push(self, event: Dict[str, Any]) -> None:
+        if self.queue.full():
+            # The client fell behind: discard its backlog and have it refetch instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait({"type": "resync", "reason": "client fell behind"})
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+
+class ChangeFeed:
+    def __init__(self, dsn: str, max_events_per_subscriber: int, reconnect_delay: float = 2.0):
+        self.dsn = dsn
+        self.max_events_per_subscriber = max_events_per_subscriber
+        self.reconnect_delay = reconnect_delay
+        self.subscribers: Set[Subscription] = set()
+        self._connection = None
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.max_events_per_subscriber)
+        self.subscribers.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+
+    def broadcast(self, event: Dict[str, Any]) -> None:
+        for subscription in list(self.subscribers):
+            subscription.push(event)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed change event: %r", payload[:200])
+            return
+        self.broadcast(event)
+
+    async def _listen(self) -> None:
+        # Imported lazily: only the listener needs a raw asyncpg connection outside the pool
+        import asyncpg
+
+        while True:
+            try:
+                self._connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                self._connection.add_termination_listener(lambda connection: closed.set())
+                await self._connection.add_listener(CHANNEL, self._on_notify)
+                logger.info("Listening for %s notifications", CHANNEL)
+                await closed.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Change feed listener failed: %s", e)
+            finally:
+                if self._connection is not None and not self._connection.is_closed():
+                    await self._connection.close()
+                self._connection = None
+            # Anything published while we were disconnected is lost, so tell clients to refetch
+            self.broadcast({"type": "resync", "reason": "change feed reconnected", "at": datetime.utcnow().isoformat()})
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+change_feed = ChangeFeed(
+    dsn=(
+        f"postgresql://{settings.database_username}:{settings.database_password}"
+        f"@{settings.database_host}:{settings.database_port}/{settings.database_name}"
+    ),
+    max_events_per_subscriber=settings.change_feed_queue_size,
+)
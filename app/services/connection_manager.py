@@ -0,0 +1,230 @@
+"""
+Registry of open interview WebSockets with bounded outbound queues.
+
+Handlers never write to a socket directly: Connection.send() puts the encoded
+message on the connection's bounded queue and one sender task per connection
+writes it out. When the queue is full the connection's overflow policy either
+drops the oldest queued message or closes the socket, and a write that does not
+finish within WS_SEND_TIMEOUT closes it as stalled, so a browser that stopped
+reading cannot hold buffered data or a coroutine indefinitely.
+
+A single reaper task per worker pings connections that have been quiet for
+WS_HEARTBEAT_INTERVAL (the client answers {"type": "pong"}) and closes those
+silent for WS_HEARTBEAT_TIMEOUT. drain() stops accepting, lets queued messages
+go out and closes every socket with 1012 so clients reconnect and resume
+elsewhere; call it (POST /internal/ws/drain) before stopping a worker, since
+uvicorn drops open sockets itself before the lifespan shutdown runs. A worker
+drained by mistake accepts again after resume() (POST /internal/ws/resume).
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Hashable, Optional, Set, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.core.config import settings
+from app.utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Overflow policies
+DROP_OLDEST = "drop_oldest"
+CLOSE = "close"
+
+CLOSE_NORMAL = 1000
+CLOSE_SERVICE_RESTART = 1012
+CLOSE_HEARTBEAT_TIMEOUT = 4008
+CLOSE_BACKPRESSURE = 4009
+
+_PING = dumps({"type": "ping"}).decode()
+_PONG = '{"type":"pong"}'
+
+
+class Connection:
+    __slots__ = ("manager", "websocket", "key", "overflow", "outbox", "last_seen", "sender", "closing")
+
+    def __init__(self, manager: "ConnectionManager", websocket: WebSocket, key: Optional[Hashable], overflow: str):
+        self.manager = manager
+        self.websocket = websocket
+        self.key = key
+        self.overflow = overflow
+        self.outbox: "asyncio.Queue[str]" = asyncio.Queue(manager.queue_size)
+        self.last_seen = time.monotonic()
+        self.sender: Optional[asyncio.Task] = None
+        self.closing = False
+
+    def send(self, message: Dict[str, Any]) -> bool:
+        """Queue a JSON message without waiting; False if it was dropped or the socket is closing"""
+        if self.closing:
+            return False
+        return self._enqueue(dumps(message).decode())
+
+    def _enqueue(self, text: str) -> bool:
+        try:
+            self.outbox.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            pass
+        if self.overflow == DROP_OLDEST:
+            self.outbox.get_nowait()
+            self.outbox.task_done()
+            self.outbox.put_nowait(text)
+            self.manager.dropped += 1
+            return True
+        self.manager.overflowed += 1
+        self.manager.close_later(self, CLOSE_BACKPRESSURE, "Send queue overflow")
+        return False
+
+    async def receive(self) -> Union[str, bytes]:
+        """Next application message, text or binary; heartbeat replies only refresh last_seen"""
+        while True:
+            if self.closing:
+                raise WebSocketDisconnect(CLOSE_NORMAL)
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", CLOSE_NORMAL), message.get("reason"))
+            self.last_seen = time.monotonic()
+            if message.get("bytes") is not None:
+                return message["bytes"]
+            if message["text"] != _PONG:
+                return message["text"]
+
+    async def _send_loop(self) -> None:
+        while True:
+            text = await self.outbox.get()
+            try:
+                await asyncio.wait_for(self.websocket.send_text(text), self.manager.send_timeout)
+            except asyncio.TimeoutError:
+                self.manager.stalled += 1
+                self.manager.close_later(self, CLOSE_BACKPRESSURE, "Client stopped reading")
+                return
+            except Exception:
+                # The socket is gone; the handler notices on its next receive
+                return
+            finally:
+                self.outbox.task_done()
+
+    async def close(self, code: int = CLOSE_NORMAL, reason: str = "", drain: bool = True) -> None:
+        """Close after the queued messages went out (bounded by WS_SEND_TIMEOUT)"""
+        if self.closing:
+            return
+        self.closing = True
+        await self._close(code, reason, drain)
+
+    async def _close(self, code: int, reason: str, drain: bool) -> None:
+        if drain and self.sender is not None and not self.sender.done():
+            try:
+                await asyncio.wait_for(self.outbox.join(), self.manager.send_timeout)
+            except asyncio.TimeoutError:
+                pass
+        await self._stop_sender()
+        try:
+            # A stalled client may not take the close frame either
+            await asyncio.wait_for(self.websocket.close(code=code, reason=reason), self.manager.send_timeout)
+        except Exception:
+            # Already closed by the client or the server
+            pass
+
+    async def _stop_sender(self) -> None:
+        if self.sender is not None:
+            self.sender.cancel()
+            try:
+                await self.sender
+            except asyncio.CancelledError:
+                pass
+
+
+class ConnectionManager:
+    def __init__(self, queue_size: int, send_timeout: float, heartbeat_interval: float, heartbeat_timeout: float):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.connections: Set[Connection] = set()
+        self.accepting = True
+        self._reaper: Optional[asyncio.Task] = None
+        self._closers: Set[asyncio.Task] = set()
+        self.dropped = 0
+        self.overflowed = 0
+        self.stalled = 0
+        self.reaped = 0
+
+    async def connect(self, websocket: WebSocket, key: Optional[Hashable] = None, overflow: str = CLOSE) -> Optional[Connection]:
+        """Accept and register the socket; None (socket closed with 1012) while draining"""
+        if not self.accepting:
+            await websocket.close(code=CLOSE_SERVICE_RESTART, reason="Server restarting")
+            return None
+        await websocket.accept()
+        connection = Connection(self, websocket, key, overflow)
+        connection.sender = asyncio.create_task(connection._send_loop())
+        self.connections.add(connection)
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap())
+        return connection
+
+    async def disconnect(self, connection: Connection) -> None:
+        """Deregister; called by the handler when it is done with the socket"""
+        self.connections.discard(connection)
+        connection.closing = True
+        await connection._stop_sender()
+
+    def close_later(self, connection: Connection, code: int, reason: str) -> None:
+        if connection.closing:
+            return
+        connection.closing = True
+        logger.info("Closing WebSocket (%s): %s", code, reason, extra={"connection_key": connection.key})
+        task = asyncio.create_task(connection._close(code, reason, drain=False))
+        self._closers.add(task)
+        task.add_done_callback(self._closers.discard)
+
+    async def _reap(self) -> None:
+        while self.connections:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for connection in list(self.connections):
+                idle = now - connection.last_seen
+                if idle >= self.heartbeat_timeout:
+                    self.reaped += 1
+                    self.close_later(connection, CLOSE_HEARTBEAT_TIMEOUT, "Heartbeat timeout")
+                elif idle >= self.heartbeat_interval and connection.outbox.empty() and not connection.closing:
+                    connection._enqueue(_PING)
+
+    async def drain(self, timeout: float) -> None:
+        """Stop accepting, deliver what is queued and close every socket with 1012"""
+        self.accepting = False
+        closers = [
+            asyncio.create_task(connection.close(CLOSE_SERVICE_RESTART, "Server restarting"))
+            for connection in list(self.connections)
+        ]
+        if closers:
+            done, pending = await asyncio.wait(closers, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            logger.info("Drained %d WebSocket connections (%d timed out)", len(done), len(pending))
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+    def resume(self) -> None:
+        """Accept connections again after a drain"""
+        self.accepting = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "accepting": self.accepting,
+            "connections": len(self.connections),
+            "queued": sum(connection.outbox.qsize() for connection in self.connections),
+            "dropped": self.dropped,
+            "overflowed": self.overflowed,
+            "stalled": self.stalled,
+            "reaped": self.reaped,
+        }
+
+
+interview_connections = ConnectionManager(
+    queue_size=settings.ws_send_queue_size,
+    send_timeout=settings.ws_send_timeout,
+    heartbeat_interval=settings.ws_heartbeat_interval,
+    heartbeat_timeout=settings.ws_heartbeat_timeout,
+)
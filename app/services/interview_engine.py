@@ -0,0 +1,419 @@
+"""
+Server-side interview sequencing for /ws/interview.
+
+An InterviewSession walks one registration (found by its session_token) through
+its questions: it sends the question at current_question_index, records the
+answer and advances. Answers and progress are not committed per message; they
+go to the process-wide AnswerBuffer, which writes everything pending in one
+transaction when INTERVIEW_ANSWER_FLUSH_SIZE answers are waiting, when the
+flush interval elapses, and when a session completes or disconnects. Progress
+goes through update_registrations, so updated_at, the counters and the change
+feed stay consistent, and the document cache is invalidated after each flush.
+
+While the candidate speaks, the client streams interim transcripts. Only the
+latest one per question is kept (PartialTranscripts) and written as a draft
+answer_text at most once per INTERVIEW_PARTIAL_WRITE_INTERVAL_MS, so a dropped
+connection resumes with the draft instead of losing the answer. The final
+transcript is the answer: it replaces the draft, sets is_answered and advances
+progress in one transaction, and a draft write can never overwrite it.
+"""
+import asyncio
+import json
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, select, true, update
+from sqlalchemy.orm import load_only, selectinload
+
+from app.core.config import settings
+from app.db.postgres.database import async_session
+from app.db.redis.cache import registration_cache
+from app.models.interview_registration import InterviewRegistration
+from app.models.question_answer import QuestionAnswer
+from app.services.registration_counters import apply_counter_deltas
+from app.services.registration_updates import lock_registrations, update_registrations
+
+logger = logging.getLogger(__name__)
+
+# Screening script for registrations that do not have their own questions yet
+DEFAULT_QUESTIONS = (
+    "Are you interested in moving forward with School Professionals?",
+    "How did you hear about us?",
+    "Are you able to commute & work in NYC?",
+    "Experience with students under age 5?",
+    "Are you comfortable with diaper changes?",
+)
+
+NOT_ATTEMPTED = "not attempted"
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+_answer_update = (
+    update(QuestionAnswer.__table__)
+    .where(
+        QuestionAnswer.registration_id == bindparam("registration_pk"),
+        QuestionAnswer.question_order == bindparam("order")
+    )
+    .values(answer_text=bindparam("text"), is_answered=True, timestamp=bindparam("answered_at"))
+)
+
+# Drafts only touch unanswered rows, whichever of draft and final commits first
+_draft_update = (
+    update(QuestionAnswer.__table__)
+    .where(
+        QuestionAnswer.registration_id == bindparam("registration_pk"),
+        QuestionAnswer.question_order == bindparam("order"),
+        QuestionAnswer.is_answered.isnot(true())
+    )
+    .values(answer_text=bindparam("text"))
+)
+
+
+class AnswerBuffer:
+    """Write-behind buffer of interview answers and progress, shared by every session in the worker"""
+
+    def __init__(self, max_pending: int, flush_interval: float):
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        # (registration pk, question_order) -> (answer text, answered at)
+        self._answers: Dict[Tuple[int, int], Tuple[str, datetime]] = {}
+        # registration pk -> progress changes (update_registrations field names)
+        self._progress: Dict[int, Dict[str, Any]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+
+    def add(
+        self,
+        registration_pk: int,
+        progress: Dict[str, Any],
+        question_order: Optional[int] = None,
+        answer_text: Optional[str] = None
+    ) -> None:
+        if question_order is not None:
+            self._answers[(registration_pk, question_order)] = (answer_text, datetime.utcnow())
+        self._progress.setdefault(registration_pk, {}).update(progress)
+        if len(self._answers) >= self.max_pending:
+            self._full.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
+
+    def pending(self, registration_pk: int) -> bool:
+        return registration_pk in self._progress
+
+    async def flush(self, registration_pk: Optional[int] = None) -> None:
+        """
+        Write everything pending, or only what is pending for one registration; on failure the
+        batch stays buffered for the next attempt
+        """
+        async with self._flush_lock:
+            if registration_pk is None:
+                if not self._answers and not self._progress:
+                    return
+                answers, self._answers = self._answers, {}
+                progress, self._progress = self._progress, {}
+            else:
+                # Every buffered answer has a progress entry, so this is all the registration has pending
+                if registration_pk not in self._progress:
+                    return
+                progress = {registration_pk: self._progress.pop(registration_pk)}
+                answers = {key: self._answers.pop(key) for key in [key for key in self._answers if key[0] == registration_pk]}
+            try:
+                await self._write(answers, progress)
+                self.flushes += 1
+            except BaseException as e:
+                # Anything buffered meanwhile is newer and wins
+                self._answers = {**answers, **self._answers}
+                for pk, changes in progress.items():
+                    self._progress[pk] = {**changes, **self._progress.get(pk, {})}
+                if not isinstance(e, Exception):
+                    raise
+                logger.exception("Flushing %d interview answers failed; will retry", len(answers))
+
+    async def _write(self, answers: Dict[Tuple[int, int], Tuple[str, datetime]], progress: Dict[int, Dict[str, Any]]) -> None:
+        pks = {pk for pk, _ in answers} | set(progress)
+        async with async_session() as db:
+            # Every registration row is locked up front in id order, and the answer rows and counter
+            # rows below in key order, so a flush takes its locks in the same order as other writers
+            await lock_registrations(db, pks)
+            if answers:
+                await db.execute(_answer_update, [
+                    {"registration_pk": pk, "order": order, "text": text, "answered_at": answered_at}
+                    for (pk, order), (text, answered_at) in sorted(answers.items())
+                ])
+            # Every registration with new answers gets a fresh updated_at, with or without progress
+            groups: Dict[Tuple, List[int]] = defaultdict(list)
+            for pk in sorted(pks):
+                groups[tuple(sorted(progress.get(pk, {}).items()))].append(pk)
+            deltas = Counter()
+            for changes, group in groups.items():
+                await update_registrations(db, group, dict(changes), "interview_progress", deltas=deltas)
+            if deltas:
+                await db.run_sync(lambda session: apply_counter_deltas(session.connection(), deltas))
+            await db.commit()
+        await registration_cache.invalidate(pks)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+answer_buffer = AnswerBuffer(
+    max_pending=settings.interview_answer_flush_size,
+    flush_interval=settings.interview_answer_flush_interval,
+)
+
+
+class PartialTranscripts:
+    """Latest interim transcript per question, written as draft answers once per interval"""
+
+    def __init__(self, write_interval: float):
+        self.write_interval = write_interval
+        # registration pk -> question_order -> latest interim text
+        self._latest: Dict[int, Dict[int, str]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.written = 0
+
+    def add(self, registration_pk: int, question_order: int, text: str) -> None:
+        # A newer interim result replaces the unwritten one instead of queueing behind it
+        self._latest.setdefault(registration_pk, {})[question_order] = text
+        self.received += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def discard(self, registration_pk: int, question_order: int) -> None:
+        drafts = self._latest.get(registration_pk)
+        if drafts is not None:
+            drafts.pop(question_order, None)
+            if not drafts:
+                del self._latest[registration_pk]
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.write_interval)
+            await self.flush()
+
+    async def flush(self, registration_pk: Optional[int] = None) -> None:
+        """Write the pending drafts, only those of one registration if given (its connection is going away)"""
+        async with self._flush_lock:
+            if registration_pk is None:
+                pending, self._latest = self._latest, {}
+            elif registration_pk in self._latest:
+                pending = {registration_pk: self._latest.pop(registration_pk)}
+            else:
+                return
+            # In key order, like the answer rows of an answer flush
+            params = [
+                {"registration_pk": pk, "order": order, "text": text}
+                for pk, drafts in sorted(pending.items()) for order, text in sorted(drafts.items())
+            ]
+            if not params:
+                return
+            try:
+                async with async_session() as db:
+                    await db.execute(_draft_update, params)
+                    await db.commit()
+                self.written += len(params)
+            except BaseException as e:
+                # Keep the drafts for the next round unless newer ones arrived meanwhile
+                for pk, drafts in pending.items():
+                    latest = self._latest.setdefault(pk, {})
+                    for order, text in drafts.items():
+                        latest.setdefault(order, text)
+                if not isinstance(e, Exception):
+                    raise
+                logger.exception("Writing %d draft answers failed; will retry", len(params))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def pending(self, registration_pk: int) -> Dict[int, str]:
+        return dict(self._latest.get(registration_pk, {}))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "partial_transcripts_received": self.received,
+            "partial_transcripts_pending": sum(len(drafts) for drafts in self._latest.values()),
+            "draft_answers_written": self.written,
+        }
+
+
+partial_transcripts = PartialTranscripts(write_interval=settings.interview_partial_write_interval_ms / 1000)
+
+
+def parse_message(message: str) -> Tuple[Optional[int], str, bool]:
+    """
+    (question_order, text, final) of a client message. Speech recognition results arrive as
+    {"type": "transcript", "questionOrder": n, "text": "...", "final": false|true}; {"answer": "..."}
+    and plain text are final answers to the current question (question_order None).
+    """
+    try:
+        payload = json.loads(message)
+    except ValueError:
+        return None, message.strip(), True
+    if not isinstance(payload, dict):
+        return None, message.strip(), True
+    if payload.get("type") == "transcript":
+        order = payload.get("questionOrder")
+        return (
+            order if isinstance(order, int) else None,
+            str(payload.get("text") or "").strip(),
+            bool(payload.get("final"))
+        )
+    return None, str(payload.get("answer") or "").strip(), True
+
+
+class InterviewSession:
+    __slots__ = ("registration_pk", "registration_id", "questions", "index", "status", "completed", "drafts")
+
+    def __init__(
+        self,
+        registration_pk: int,
+        registration_id: str,
+        questions: List[str],
+        index: int,
+        status: str,
+        completed: bool,
+        drafts: Optional[Dict[int, str]] = None
+    ):
+        self.registration_pk = registration_pk
+        self.registration_id = registration_id
+        self.questions = questions
+        self.index = index
+        self.status = status
+        self.completed = completed
+        # question_order -> draft answer saved from interim transcripts of an earlier connection
+        self.drafts = drafts or {}
+
+    @classmethod
+    async def open(cls, session_token: str) -> Optional["InterviewSession"]:
+        """Load (or start) the interview of the registration holding `session_token`"""
+        async with async_session() as db:
+            registration = await cls._load(db, session_token)
+            if registration is None:
+                return None
+            if answer_buffer.pending(registration.id):
+                # A previous connection of this candidate still has answers buffered
+                await answer_buffer.flush(registration.id)
+                registration = await cls._load(db, session_token)
+
+            question_answers = sorted(registration.question_answers, key=lambda qa: qa.question_order)
+            questions = [qa.question_text for qa in question_answers]
+            drafts = {qa.question_order: qa.answer_text for qa in question_answers if not qa.is_answered and qa.answer_text}
+            # Drafts of a previous connection on this worker that are not written yet
+            drafts.update(partial_transcripts.pending(registration.id))
+            session = cls(
+                registration.id, registration.registration_id, questions, registration.current_question_index or 0,
+                registration.status, bool(registration.is_completed), drafts
+            )
+            if registration.current_question_index is None or registration.current_question_index < 0 or not questions:
+                await session._start(db)
+            elif session.index >= len(questions):
+                session.completed = True
+        return session
+
+    @staticmethod
+    async def _load(db, session_token: str) -> Optional[InterviewRegistration]:
+        result = await db.execute(
+            select(InterviewRegistration)
+            .options(
+                load_only(
+                    InterviewRegistration.id, InterviewRegistration.registration_id, InterviewRegistration.status,
+                    InterviewRegistration.current_question_index, InterviewRegistration.is_completed,
+                    raiseload=True
+                ),
+                selectinload(InterviewRegistration.question_answers)
+            )
+            .where(InterviewRegistration.session_token == session_token)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    async def _start(self, db) -> None:
+        # Starting happens once per interview, so it is written straight away
+        if not self.questions:
+            self.questions = list(DEFAULT_QUESTIONS)
+            db.add_all([
+                QuestionAnswer(
+                    registration_id=self.registration_pk, question_text=text,
+                    answer_text="", is_answered=False, question_order=order
+                )
+                for order, text in enumerate(self.questions, start=1)
+            ])
+        changes = {"currentQuestionIndex": 0, "startedAt": datetime.utcnow()}
+        if self.status in (None, NOT_ATTEMPTED):
+            changes["status"] = self.status = IN_PROGRESS
+        self.index = 0
+        await update_registrations(db, [self.registration_pk], changes, "interview_started")
+        await db.commit()
+        await registration_cache.invalidate([self.registration_pk])
+
+    def question_message(self) -> Dict[str, Any]:
+        message = {
+            "type": "interview_data",
+            "content": self.questions[self.index],
+            "questionIndex": self.index,
+            "totalQuestions": len(self.questions),
+            "timestamp": datetime.now().isoformat()
+        }
+        draft = self.drafts.pop(self.index + 1, None)
+        if draft:
+            message["draft"] = draft
+        return message
+
+    def transcript(self, question_order: Optional[int], text: str, final: bool) -> Optional[bool]:
+        """
+        Apply a transcript event. Interim text is kept as the current question's draft; a final one
+        answers it (see answer()). Events for other questions, e.g. late ones from before a reconnect,
+        are ignored. Returns answer()'s result for a final event, None otherwise.
+        """
+        order = self.index + 1
+        if self.completed or not text or question_order not in (None, order):
+            return None
+        if not final:
+            partial_transcripts.add(self.registration_pk, order, text)
+            return None
+        return self.answer(text)
+
+    def answer(self, text: str) -> bool:
+        """Record the answer to the current question; returns False once the interview is complete"""
+        order = self.index + 1
+        # The final text supersedes any draft that has not been written yet
+        partial_transcripts.discard(self.registration_pk, order)
+        if order >= len(self.questions):
+            self.completed = True
+            progress = {"isCompleted": True, "completedAt": datetime.utcnow()}
+            if self.status in (None, NOT_ATTEMPTED, IN_PROGRESS):
+                progress["status"] = self.status = COMPLETED
+        else:
+            self.index = order
+            progress = {"currentQuestionIndex": self.index}
+        answer_buffer.add(self.registration_pk, progress, order, text)
+        return not self.completed
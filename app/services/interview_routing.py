@@ -0,0 +1,194 @@
+"""
+Routing of interview sessions and their events between workers.
+
+The worker a candidate's socket lands on claims the session_token in the
+broker before loading the interview. If an earlier connection held the claim
+(typically a half-open socket of the same candidate, on this or any other
+worker), its worker is asked on its own channel to close that socket with 4010
+and wait until its handler has stored the buffered answers and closed the
+audio spool, and the new connection waits for the reply, so it resumes from
+the last answer the candidate gave and appends to a consistent spool. A worker that
+does not reply within INTERVIEW_TAKEOVER_TIMEOUT is presumed gone.
+
+Interview presence (connected, completed, disconnected) is published on the
+admin channel, which every worker relays to its /ws/admin/changes subscribers.
+"""
+import asyncio
+import itertools
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+from app.db.redis.broker import WORKER_ID, broker
+from app.services.change_feed import change_feed
+from app.services.connection_manager import Connection
+from app.services.interview_engine import InterviewSession, answer_buffer, partial_transcripts
+
+logger = logging.getLogger(__name__)
+
+ADMIN_CHANNEL = "admin_events"
+CLOSE_SESSION_TAKEN_OVER = 4010
+
+
+def _worker_channel(worker_id: str) -> str:
+    return f"interview:{worker_id}"
+
+
+def _claim_key(session_token: str) -> str:
+    return f"interview_session:{session_token}"
+
+
+class SessionClaim:
+    __slots__ = ("session_token", "claim_id", "connection", "displaced", "finished")
+
+    def __init__(self, session_token: str, claim_id: str):
+        self.session_token = session_token
+        self.claim_id = claim_id
+        self.connection: Optional[Connection] = None
+        self.displaced = False
+        # Set once the handler has stored its answers and closed its audio spool
+        self.finished = asyncio.Event()
+
+
+class InterviewRouter:
+    def __init__(self, broker, worker_id: str, takeover_timeout: float, claim_ttl: int):
+        self.broker = broker
+        self.worker_id = worker_id
+        self.takeover_timeout = takeover_timeout
+        self.claim_ttl = claim_ttl
+        self.channel = _worker_channel(worker_id)
+        # claim id -> claims held by connections on this worker
+        self._claims: Dict[str, SessionClaim] = {}
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._ids = itertools.count(1)
+        self.takeovers = 0
+        self.takeover_timeouts = 0
+
+    async def start(self) -> None:
+        await self.broker.subscribe(self.channel, self._on_worker_message)
+        await self.broker.subscribe(ADMIN_CHANNEL, change_feed.broadcast)
+
+    async def stop(self) -> None:
+        await self.broker.unsubscribe(self.channel, self._on_worker_message)
+        await self.broker.unsubscribe(ADMIN_CHANNEL, change_feed.broadcast)
+
+    async def claim(self, session_token: str) -> SessionClaim:
+        """Take the session over from whichever connection held it, waiting until it let go"""
+        claim = SessionClaim(session_token, f"{self.worker_id}/{next(self._ids)}")
+        self._claims[claim.claim_id] = claim
+        try:
+            previous = await self.broker.claim(_claim_key(session_token), claim.claim_id, self.claim_ttl)
+        except Exception as e:
+            # Without the broker the interview still works, it just cannot displace other workers
+            logger.warning("Claiming interview session failed: %s", e)
+            previous = None
+        if previous is not None:
+            self.takeovers += 1
+            worker_id = previous.rsplit("/", 1)[0]
+            if worker_id == self.worker_id:
+                await self._release_local(previous)
+            else:
+                await self._request_release(worker_id, previous)
+        return claim
+
+    def attach(self, claim: SessionClaim, connection: Connection) -> bool:
+        """Bind the accepted socket to the claim; False if a newer connection took over meanwhile"""
+        if claim.displaced:
+            return False
+        claim.connection = connection
+        return True
+
+    async def release(self, claim: SessionClaim) -> None:
+        claim.finished.set()
+        self._claims.pop(claim.claim_id, None)
+        try:
+            await self.broker.release(_claim_key(claim.session_token), claim.claim_id)
+        except Exception as e:
+            logger.warning("Releasing interview session failed: %s", e)
+
+    async def publish_presence(self, session: InterviewSession, state: str) -> None:
+        try:
+            await self.broker.publish(ADMIN_CHANNEL, {
+                "type": "interview_presence",
+                "state": state,
+                "id": session.registration_pk,
+                "registrationId": session.registration_id,
+                "questionIndex": session.index,
+                "worker": self.worker_id,
+                "at": datetime.utcnow().isoformat(),
+            })
+        except Exception as e:
+            logger.warning("Publishing interview presence failed: %s", e)
+
+    async def _request_release(self, worker_id: str, claim_id: str) -> None:
+        request_id = uuid.uuid4().hex
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[request_id] = waiter
+        try:
+            await self.broker.publish(_worker_channel(worker_id), {
+                "type": "takeover", "claimId": claim_id, "requestId": request_id, "replyTo": self.channel
+            })
+            await asyncio.wait_for(waiter, self.takeover_timeout)
+        except asyncio.TimeoutError:
+            self.takeover_timeouts += 1
+            logger.warning("Worker %s did not release interview session in time", worker_id)
+        except Exception as e:
+            logger.warning("Interview session takeover request failed: %s", e)
+        finally:
+            self._waiters.pop(request_id, None)
+
+    async def _release_local(self, claim_id: str) -> None:
+        claim = self._claims.pop(claim_id, None)
+        if claim is None:
+            return
+        claim.displaced = True
+        if claim.connection is None:
+            # Not attached yet: attach() fails and the handler returns without recording anything
+            return
+        await claim.connection.close(CLOSE_SESSION_TAKEN_OVER, "Session resumed elsewhere", drain=False)
+        # The displaced handler's last drafts, answers and audio must be stored before the new
+        # connection loads progress or reopens the spool
+        try:
+            # Half the timeout, so a remote requester still gets the reply within its own
+            await asyncio.wait_for(claim.finished.wait(), self.takeover_timeout / 2)
+        except asyncio.TimeoutError:
+            logger.warning("Displaced interview handler did not finish in time")
+            # Connections are keyed by registration pk
+            await partial_transcripts.flush(claim.connection.key)
+            await answer_buffer.flush(claim.connection.key)
+
+    async def _handle_takeover(self, message: Dict[str, Any]) -> None:
+        await self._release_local(message["claimId"])
+        try:
+            await self.broker.publish(message["replyTo"], {"type": "released", "requestId": message["requestId"]})
+        except Exception as e:
+            logger.warning("Replying to interview session takeover failed: %s", e)
+
+    def _on_worker_message(self, message: Dict[str, Any]) -> None:
+        if message.get("type") == "takeover":
+            task = asyncio.create_task(self._handle_takeover(message))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif message.get("type") == "released":
+            waiter = self._waiters.get(message.get("requestId"))
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker": self.worker_id,
+            "claims": len(self._claims),
+            "takeovers": self.takeovers,
+            "takeover_timeouts": self.takeover_timeouts,
+        }
+
+
+interview_router = InterviewRouter(
+    broker,
+    worker_id=WORKER_ID,
+    takeover_timeout=settings.interview_takeover_timeout,
+    claim_ttl=settings.interview_claim_ttl,
+)
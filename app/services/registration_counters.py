@@ -0,0 +1,161 @@
+"""
+Incrementally maintained registration_counters rollup.
+
+Every ORM flush that inserts, deletes or changes a counted column of an
+InterviewRegistration applies the matching +1/-1 deltas inside the same
+transaction, so dashboard statistics are a read of a handful of counter rows
+instead of a scan of interview_registrations. Writers that bypass the unit of
+work (Core UPDATE statements) must call apply_counter_deltas themselves.
+"""
+from collections import Counter
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.interview_registration import InterviewRegistration
+from app.models.registration_counter import RegistrationCounter
+
+TOTAL_DIMENSION = "total"
+ELIGIBILITY_FLAGS = ("upk_eligible", "teacher_eligible", "substitute_eligible", "shift_available", "diaper_comfortable")
+COUNTED_FIELDS = ("status", "hr_review", "position_type", "school_type") + ELIGIBILITY_FLAGS
+
+CounterKey = Tuple[str, str]
+
+
+def counter_value(field: str, value: Any) -> str:
+    """Normalise a column value into the string stored in registration_counters.value"""
+    if field in ELIGIBILITY_FLAGS:
+        return "true" if value else "false"
+    return "" if value is None else str(value)
+
+
+def counter_keys(values: Mapping[str, Any]) -> Iterable[CounterKey]:
+    """All counter buckets one registration with the given column values belongs to"""
+    yield TOTAL_DIMENSION, ""
+    for field in COUNTED_FIELDS:
+        yield field, counter_value(field, values.get(field))
+
+
+def counter_deltas(old: Optional[Mapping[str, Any]], new: Optional[Mapping[str, Any]]) -> Counter:
+    """Deltas for a registration moving from `old` to `new` values (None for insert / delete)"""
+    deltas = Counter()
+    if old is not None:
+        for key in counter_keys(old):
+            deltas[key] -= 1
+    if new is not None:
+        for key in counter_keys(new):
+            deltas[key] += 1
+    return deltas
+
+
+def apply_counter_deltas(connection, deltas: Mapping[CounterKey, int]) -> None:
+    """Upsert non-zero deltas, in key order so concurrent writers lock counter rows consistently"""
+    rows = [
+        {"dimension": dimension, "value": value, "count": delta}
+        for (dimension, value), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    stmt = insert(RegistrationCounter).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RegistrationCounter.dimension, RegistrationCounter.value],
+        set_={"count": RegistrationCounter.count + stmt.excluded.count}
+    )
+    connection.execute(stmt)
+
+
+def _values(registration: InterviewRegistration) -> Dict[str, Any]:
+    return {field: getattr(registration, field) for field in COUNTED_FIELDS}
+
+
+def _changed_field_deltas(registration: InterviewRegistration) -> Counter:
+    """Deltas for the counted columns this flush changed on an already persisted registration"""
+    deltas = Counter()
+    state = inspect(registration)
+    for field in COUNTED_FIELDS:
+        history = state.attrs[field].history
+        if not history.has_changes():
+            continue
+        old = history.deleted[0] if history.deleted else None
+        new = history.added[0] if history.added else None
+        deltas[(field, counter_value(field, old))] -= 1
+        deltas[(field, counter_value(field, new))] += 1
+    return deltas
+
+
+def _load_old_value_on_set(target, value, oldvalue, initiator):
+    pass
+
+
+# Make the ORM fetch the previous value of a counted column before it is overwritten,
+# even when it was not loaded (e.g. load_only), so the decrement hits the right bucket.
+for _field in COUNTED_FIELDS:
+    event.listen(getattr(InterviewRegistration, _field), "set", _load_old_value_on_set, active_history=True)
+
+
+@event.listens_for(Session, "after_flush")
+def maintain_registration_counters(session: Session, flush_context) -> None:
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, InterviewRegistration):
+            deltas.update(counter_deltas(None, _values(obj)))
+    for obj in session.deleted:
+        if isinstance(obj, InterviewRegistration):
+            deltas.update(counter_deltas(_values(obj), None))
+    for obj in session.dirty:
+        if isinstance(obj, InterviewRegistration):
+            deltas.update(_changed_field_deltas(obj))
+    if deltas:
+        apply_counter_deltas(session.connection(), deltas)
+
+
+def read_counters(db: Session) -> Dict[str, Dict[str, int]]:
+    """All counters as {dimension: {value: count}}"""
+    counters: Dict[str, Dict[str, int]] = {}
+    for dimension, value, count in db.execute(
+        select(RegistrationCounter.dimension, RegistrationCounter.value, RegistrationCounter.count)
+    ):
+        counters.setdefault(dimension, {})[value] = count
+    return counters
+
+
+def read_total(db: Session) -> int:
+    total = db.get(RegistrationCounter, (TOTAL_DIMENSION, ""))
+    return total.count if total else 0
+
+
+def rebuild_registration_counters(db: Session) -> int:
+    """
+    Recompute every counter from interview_registrations in one GROUPING SETS pass.
+    Writers are blocked (SHARE lock) for the duration so no delta is lost; commits and returns the total.
+    """
+    db.execute(text("LOCK TABLE interview_registrations IN SHARE MODE"))
+    db.execute(RegistrationCounter.__table__.delete())
+
+    columns = [getattr(InterviewRegistration, field) for field in COUNTED_FIELDS]
+    query = select(
+        func.grouping(*columns).label("grouping"),
+        *columns,
+        func.count().label("total")
+    ).group_by(func.grouping_sets(*[tuple_(column) for column in columns], tuple_()))
+
+    # Several raw values can collapse into one bucket (NULL and '', NULL and false), so accumulate
+    counts = Counter()
+    total = 0
+    all_rolled_up = (1 << len(COUNTED_FIELDS)) - 1
+    for row in db.execute(query):
+        if row.grouping == all_rolled_up:
+            total = row.total
+            counts[(TOTAL_DIMENSION, "")] += row.total
+            continue
+        # Exactly one bit is clear: the field this grouping set was grouped by
+        index = next(i for i in range(len(COUNTED_FIELDS)) if not row.grouping & (1 << (len(COUNTED_FIELDS) - 1 - i)))
+        field = COUNTED_FIELDS[index]
+        counts[(field, counter_value(field, row[index + 1]))] += row.total
+
+    apply_counter_deltas(db.connection(), counts)
+    db.commit()
+    return total
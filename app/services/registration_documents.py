@@ -0,0 +1,173 @@
+"""
+The two JSON shapes registrations are served in, declared once.
+
+LIST_SHAPE is the flat listing shape of GET /api/interview-registrations and
+MONGO_SHAPE the MongoDB-compatible shape the admin frontend reads from the
+overview and detail endpoints. Both compile to per-fieldset serializers (see
+app.utils.serialization); ?fields= / ?include= pick the keys.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import load_only, selectinload
+
+from app.models.interview_registration import InterviewRegistration
+from app.utils.serialization import Attr, Computed, DocumentShape, JsonKey
+
+INCLUDABLE_RELATIONS = ("question_answers",)
+
+
+def _list_question_answers(registration: InterviewRegistration, include_relations: bool) -> List[Dict[str, Any]]:
+    return [
+        {
+            "question_text": qa.question_text,
+            "answer_text": qa.answer_text if qa.is_answered else "",
+            "question_order": qa.question_order,
+            "timestamp": qa.timestamp
+        }
+        for qa in registration.question_answers
+    ]
+
+
+LIST_SHAPE = DocumentShape(InterviewRegistration, {
+    "id": Attr("id"),
+    "candidate_name": Attr("name"),
+    "email": Attr("email"),
+    "registration_id": Attr("registration_id"),
+    "status": Attr("status"),
+    "submitted_at": Attr("submitted_at"),
+    "resume_summary": Attr("resume_summary"),
+    "work_experience_summary": Attr("work_experience_summary"),
+    "position_type": Attr("position_type"),
+    "school_type": Attr("school_type"),
+    "upk_eligible": Attr("upk_eligible"),
+    "teacher_eligible": Attr("teacher_eligible"),
+    "substitute_eligible": Attr("substitute_eligible"),
+    "shift_available": Attr("shift_available"),
+    "diaper_comfortable": Attr("diaper_comfortable"),
+    "interview_started_at": Attr("started_at"),
+    "interview_completed_at": Attr("completed_at"),
+    "interview_completed": Attr("is_completed"),
+    "similarity_score": JsonKey("resume_comparison", "similarity_score", 0),
+    "overall_assessment": JsonKey("resume_comparison", "overall_assessment", ""),
+    "matching_points": JsonKey("resume_comparison", "matching_points", []),
+    "discrepancies": JsonKey("resume_comparison", "discrepancies", []),
+    "recommendation": JsonKey("resume_comparison", "recommendation", "pending"),
+    "confidence_score": JsonKey("resume_comparison", "confidence", 0.0),
+    # Backed by the relationship instead of columns
+    "question_answers": Computed(_list_question_answers, relation="question_answers"),
+    "questionByUserToHr": Attr("question_by_user_to_hr"),
+    "hrAnswerToUser": Attr("hr_answer_to_user"),
+})
+
+
+def _format_resume_comparison(registration: InterviewRegistration, include_relations: bool) -> Dict[str, Any]:
+    resume_comparison = registration.resume_comparison or {}
+    return {
+        "similarityScore": resume_comparison.get("similarity_score", 0),
+        "overallAssessment": resume_comparison.get("overall_assessment", ""),
+        "matchingPoints": resume_comparison.get("matching_points", []),
+        "discrepancies": resume_comparison.get("discrepancies", []),
+        "recommendation": resume_comparison.get("recommendation", "pending"),
+        "confidence": resume_comparison.get("confidence", 0.0),
+        "analyzedAt": resume_comparison.get("analyzed_at")
+    }
+
+
+def _format_interview_data(registration: InterviewRegistration, include_relations: bool) -> Dict[str, Any]:
+    interview_data = {}
+    if include_relations:
+        # Build questions array from question_answers relationship
+        interview_data["questions"] = [
+            {
+                "question": qa.question_text,
+                "answer": qa.answer_text if qa.is_answered else "",
+                "isAnswered": qa.is_answered,
+                "timestamp": qa.timestamp
+            }
+            for qa in registration.question_answers
+        ]
+    interview_data.update({
+        "currentQuestionIndex": registration.current_question_index,
+        "isCompleted": registration.is_completed,
+        "upkEligible": registration.upk_eligible,
+        "teacherEligible": registration.teacher_eligible,
+        "substituteEligible": registration.substitute_eligible,
+        "shiftAvailable": registration.shift_available,
+        "diaperComfortable": registration.diaper_comfortable,
+        "startedAt": registration.started_at,
+        "completedAt": registration.completed_at
+    })
+    return interview_data
+
+
+MONGO_SHAPE = DocumentShape(InterviewRegistration, {
+    "_id": Computed(lambda r, include: str(r.id), ("id",)),
+    "name": Attr("name"),
+    "email": Attr("email"),
+    "registrationId": Attr("registration_id"),
+    "status": Attr("status"),
+    "feedback": Attr("feedback"),
+    "submittedAt": Attr("submitted_at"),
+    "resumeData": Computed(lambda r, include: {"summary": r.resume_summary}, ("resume_summary",)),
+    "workExperienceSummary": Attr("work_experience_summary"),
+    "positionType": Attr("position_type"),
+    "schoolType": Attr("school_type"),
+    "hrReview": Attr("hr_review"),
+    "questionByUserToHr": Attr("question_by_user_to_hr"),
+    "hrAnswerToUser": Attr("hr_answer_to_user"),
+    # Questions come from the relationship and are only embedded when answers are included
+    "interviewData": Computed(_format_interview_data, (
+        "current_question_index", "is_completed", "upk_eligible", "teacher_eligible",
+        "substitute_eligible", "shift_available", "diaper_comfortable", "started_at", "completed_at",
+    )),
+    "resumeComparison": Computed(_format_resume_comparison, ("resume_comparison",)),
+})
+
+
+def parse_fieldset(fields: Optional[str], include: Optional[str], shape: DocumentShape) -> Tuple[List[str], bool]:
+    """
+    Resolve ?fields= / ?include= into (requested keys, whether answers are needed).
+    With neither parameter every key and the answers are returned, as before.
+    """
+    requested = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(shape)
+    unknown = [f for f in requested if f not in shape]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {unknown}. Allowed fields: {list(shape)}")
+
+    relations = [i.strip() for i in include.split(",") if i.strip()] if include else []
+    unknown = [i for i in relations if i not in INCLUDABLE_RELATIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {unknown}. Allowed values: {list(INCLUDABLE_RELATIONS)}")
+
+    if include is not None:
+        include_answers = "question_answers" in relations
+    else:
+        include_answers = fields is None or "question_answers" in requested
+    return requested, include_answers
+
+
+def registration_load_options(columns, include_answers: bool):
+    """Push a projection down to SQL: load only the given columns and join answers only when needed"""
+    options = [load_only(*set(columns), raiseload=True)]
+    if include_answers:
+        options.append(selectinload(InterviewRegistration.question_answers))
+    return options
+
+
+def format_registration_for_list(
+    registration: InterviewRegistration,
+    keys: Optional[List[str]] = None,
+    include_answers: bool = True
+) -> Dict[str, Any]:
+    """Format a registration in the flat listing shape, touching only the requested keys"""
+    return LIST_SHAPE.serializer(keys, include_answers)(registration)
+
+
+def format_registration_for_mongodb_compatibility(
+    registration: InterviewRegistration,
+    keys: Optional[List[str]] = None,
+    include_answers: bool = True
+) -> Dict[str, Any]:
+    """Format PostgreSQL data to match MongoDB structure expected by frontend"""
+    return MONGO_SHAPE.serializer(keys, include_answers)(registration)
@@ -0,0 +1,170 @@
+"""
+Streaming spreadsheet export of interview registrations.
+
+Rows are read through a server-side cursor in batches of EXPORT_BATCH_SIZE and
+written out batch by batch, so memory stays flat regardless of how many
+registrations match. question_answers and resume_comparison are flattened into
+columns; answers land in question_<n>/answer_<n> by question_order.
+"""
+import asyncio
+import csv
+import io
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, AsyncIterator, List
+
+import orjson
+from sqlalchemy import Select
+
+from app.db.postgres.database import async_session
+from app.models.interview_registration import InterviewRegistration
+
+EXPORT_BATCH_SIZE = 500
+XLSX_CHUNK_SIZE = 64 * 1024
+
+# A CSV cell starting with one of these is evaluated as a formula by spreadsheet apps
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+SCALAR_COLUMNS = [
+    ("id", "id"),
+    ("registration_id", "registration_id"),
+    ("candidate_name", "name"),
+    ("email", "email"),
+    ("status", "status"),
+    ("hr_review", "hr_review"),
+    ("position_type", "position_type"),
+    ("school_type", "school_type"),
+    ("upk_eligible", "upk_eligible"),
+    ("teacher_eligible", "teacher_eligible"),
+    ("substitute_eligible", "substitute_eligible"),
+    ("shift_available", "shift_available"),
+    ("diaper_comfortable", "diaper_comfortable"),
+    ("interview_completed", "is_completed"),
+    ("submitted_at", "submitted_at"),
+    ("interview_started_at", "started_at"),
+    ("interview_completed_at", "completed_at"),
+    ("feedback", "feedback"),
+    ("question_by_user_to_hr", "question_by_user_to_hr"),
+    ("hr_answer_to_user", "hr_answer_to_user"),
+    ("resume_summary", "resume_summary"),
+    ("work_experience_summary", "work_experience_summary"),
+]
+
+RESUME_COMPARISON_COLUMNS = [
+    ("similarity_score", "similarity_score", 0),
+    ("overall_assessment", "overall_assessment", ""),
+    ("matching_points", "matching_points", []),
+    ("discrepancies", "discrepancies", []),
+    ("recommendation", "recommendation", "pending"),
+    ("confidence_score", "confidence", 0.0),
+    ("analyzed_at", "analyzed_at", None),
+]
+
+
+def export_header(question_count: int) -> List[str]:
+    header = [name for name, _ in SCALAR_COLUMNS] + [name for name, _, _ in RESUME_COMPARISON_COLUMNS]
+    for order in range(1, question_count + 1):
+        header += [f"question_{order}", f"answer_{order}"]
+    return header
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return orjson.dumps(value).decode()
+    if isinstance(value, list):
+        return "; ".join(orjson.dumps(item).decode() if isinstance(item, dict) else str(item) for item in value)
+    return value
+
+
+def escape_formula(value: Any) -> Any:
+    """Quote candidate-controlled text that a spreadsheet would otherwise run as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def export_row(registration: InterviewRegistration, question_count: int) -> List[Any]:
+    row = [_cell(getattr(registration, attribute)) for _, attribute in SCALAR_COLUMNS]
+
+    resume_comparison = registration.resume_comparison or {}
+    row += [_cell(resume_comparison.get(key, default)) for _, key, default in RESUME_COMPARISON_COLUMNS]
+
+    questions = [""] * (question_count * 2)
+    for qa in registration.question_answers:
+        if 1 <= qa.question_order <= question_count:
+            position = (qa.question_order - 1) * 2
+            questions[position] = qa.question_text
+            questions[position + 1] = qa.answer_text if qa.is_answered else ""
+    return row + questions
+
+
+async def _registration_batches(query: Select) -> AsyncIterator[List[InterviewRegistration]]:
+    # The request's session is closed once the handler returns, so the stream owns its own
+    async with async_session() as session:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for batch in result.scalars().partitions():
+            yield batch
+            session.expunge_all()
+
+
+async def stream_csv(query: Select, question_count: int) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so Excel opens the UTF-8 file with the right encoding
+    buffer.write("\ufeff")
+    writer.writerow(export_header(question_count))
+    async for batch in _registration_batches(query):
+        writer.writerows(
+            [escape_formula(value) for value in export_row(registration, question_count)]
+            for registration in batch
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def stream_xlsx(query: Select, question_count: int) -> AsyncIterator[bytes]:
+    """
+    XLSX is a zip archive and cannot be emitted incrementally, so rows are written to a
+    temporary file in xlsxwriter's constant_memory mode (one row held at a time) and the
+    finished file is then streamed in chunks.
+    """
+    # Imported lazily: XlsxWriter is only needed for this export format
+    import xlsxwriter
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        # Strings are written as text cells, never as formulas or links
+        workbook = xlsxwriter.Workbook(
+            path, {"constant_memory": True, "strings_to_urls": False, "strings_to_formulas": False}
+        )
+        worksheet = workbook.add_worksheet("Registrations")
+        worksheet.write_row(0, 0, export_header(question_count))
+        row_index = 1
+
+        def write_batch(rows: List[List[Any]], first_row: int) -> None:
+            for offset, row in enumerate(rows):
+                worksheet.write_row(first_row + offset, 0, row)
+
+        async for batch in _registration_batches(query):
+            rows = [export_row(registration, question_count) for registration in batch]
+            # Cell encoding and disk writes happen off the event loop
+            await asyncio.to_thread(write_batch, rows, row_index)
+            row_index += len(rows)
+
+        await asyncio.to_thread(workbook.close)
+
+        with open(path, "rb") as handle:
+            while True:
+                chunk = await asyncio.to_thread(handle.read, XLSX_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.unlink(path)
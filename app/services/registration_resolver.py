@@ -0,0 +1,93 @@
+"""
+Cached registration_id -> primary key resolution.
+
+registration_id never changes for a row, so resolved ids are kept in a bounded
+LRU for as long as they fit. Unknown ids are cached too (negative caching) for
+a short TTL, so a client retrying a mistyped id hits memory instead of the
+database. "Did you mean" suggestions come from a bounded prefix lookup and are
+skipped outright when too many are already in flight.
+"""
+import asyncio
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.interview_registration import InterviewRegistration
+from app.utils.lru import TTLCache
+
+SUGGESTION_LIMIT = 5
+MAX_CONCURRENT_SUGGESTIONS = 4
+
+# Negative-cache value until suggestions have been looked up
+_NO_SUGGESTIONS_YET = None
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class RegistrationResolver:
+    def __init__(self, max_entries: int, negative_ttl: float):
+        self._pks = TTLCache(max_entries)
+        self._missing = TTLCache(max_entries, ttl=negative_ttl)
+        self._suggestion_slots = asyncio.Semaphore(MAX_CONCURRENT_SUGGESTIONS)
+
+    async def resolve_many(self, db: AsyncSession, registration_ids: Iterable[str]) -> Dict[str, int]:
+        """{registration_id: pk} for the ids that exist; at most one indexed query for the uncached ones"""
+        resolved: Dict[str, int] = {}
+        lookup: List[str] = []
+        for registration_id in dict.fromkeys(registration_ids):
+            pk = self._pks.get(registration_id)
+            if pk is not None:
+                resolved[registration_id] = pk
+            elif registration_id not in self._missing:
+                lookup.append(registration_id)
+
+        if lookup:
+            result = await db.execute(
+                select(InterviewRegistration.registration_id, InterviewRegistration.id)
+                .where(InterviewRegistration.registration_id.in_(lookup))
+            )
+            for registration_id, pk in result:
+                self._pks.set(registration_id, pk)
+                resolved[registration_id] = pk
+            for registration_id in lookup:
+                if registration_id not in resolved:
+                    self._missing.set(registration_id, _NO_SUGGESTIONS_YET)
+        return resolved
+
+    async def resolve(self, db: AsyncSession, registration_id: str) -> Optional[int]:
+        return (await self.resolve_many(db, [registration_id])).get(registration_id)
+
+    def forget(self, registration_id: str) -> None:
+        """Drop a mapping whose row turned out to be gone"""
+        self._pks.delete(registration_id)
+
+    async def suggest(self, db: AsyncSession, registration_id: str) -> List[str]:
+        """Up to SUGGESTION_LIMIT existing ids sharing a prefix with an unknown one (cached with the miss)"""
+        suggestions = self._missing.get(registration_id)
+        if suggestions is not None:
+            return suggestions
+        if self._suggestion_slots.locked():
+            # Under a burst of bad ids suggestions are a luxury, not worth queueing for
+            return []
+
+        prefix = registration_id[:max(3, len(registration_id) - 2)]
+        async with self._suggestion_slots:
+            result = await db.execute(
+                select(InterviewRegistration.registration_id)
+                .where(InterviewRegistration.registration_id.like(_escape_like(prefix) + "%", escape="\\"))
+                .order_by(InterviewRegistration.registration_id)
+                .limit(SUGGESTION_LIMIT)
+            )
+            suggestions = list(result.scalars())
+        self._missing.set(registration_id, suggestions)
+        return suggestions
+
+
+registration_resolver = RegistrationResolver(
+    max_entries=settings.registration_resolver_max_entries,
+    negative_ttl=settings.registration_resolver_negative_ttl,
+)
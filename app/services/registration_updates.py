@@ -0,0 +1,111 @@
+"""
+Set-based updates of interview registrations.
+
+A batch of registrations is changed with one locking SELECT of the previous
+values and one UPDATE ... RETURNING, instead of a load / flush / refresh per
+row. Because this bypasses the unit of work, the registration_counters deltas
+and change-feed events are emitted here explicitly. Callers commit and then
+invalidate the document cache for the returned ids.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Any, Collection, Dict, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.interview_registration import InterviewRegistration
+from app.services.change_feed import publish_registration_changes
+from app.services.registration_counters import COUNTED_FIELDS, apply_counter_deltas, counter_deltas
+
+# API field name -> InterviewRegistration column that PATCH endpoints may set
+UPDATABLE_FIELDS = {
+    "feedback": "feedback",
+    "status": "status",
+    "hrReview": "hr_review",
+    "positionType": "position_type",
+    "schoolType": "school_type",
+    "hrAnswerToUser": "hr_answer_to_user",
+}
+
+# Interview progress, written by the interview engine only
+INTERVIEW_FIELDS = {
+    "currentQuestionIndex": "current_question_index",
+    "isCompleted": "is_completed",
+    "startedAt": "started_at",
+    "completedAt": "completed_at",
+}
+
+WRITABLE_FIELDS = {**UPDATABLE_FIELDS, **INTERVIEW_FIELDS}
+
+
+async def lock_registrations(db: AsyncSession, pks: Collection[int]) -> None:
+    """
+    Lock the registrations in id order for the rest of the transaction. Callers applying several
+    update_registrations to overlapping or interleaved pks take all row locks with this first.
+    """
+    if pks:
+        await db.execute(
+            select(InterviewRegistration.id)
+            .where(InterviewRegistration.id.in_(set(pks)))
+            .order_by(InterviewRegistration.id)
+            .with_for_update()
+        )
+
+
+async def update_registrations(
+    db: AsyncSession,
+    pks: Collection[int],
+    changes: Dict[str, Any],
+    event: str,
+    deltas: Optional[Counter] = None,
+) -> Dict[str, Any]:
+    """
+    Apply `changes` (API field names, see WRITABLE_FIELDS) to the registrations with the given
+    primary keys within the current transaction. Returns {registration_id: RETURNING row} for the
+    rows that exist; the row carries id, registration_id, updated_at and every touched column.
+    With `deltas`, registration_counters deltas are added to it instead of applied, so a caller
+    making several calls in one transaction upserts the counters once, in key order.
+    """
+    if not pks:
+        return {}
+    values = {WRITABLE_FIELDS[field]: value for field, value in changes.items()}
+    columns = [getattr(InterviewRegistration, column) for column in values]
+    counted = [field for field in COUNTED_FIELDS if field in values]
+
+    # Lock the rows in id order (same order as every other writer) and capture the counted
+    # columns before the UPDATE overwrites them
+    result = await db.execute(
+        select(
+            InterviewRegistration.id,
+            *[getattr(InterviewRegistration, field) for field in COUNTED_FIELDS]
+        )
+        .where(InterviewRegistration.id.in_(set(pks)))
+        .order_by(InterviewRegistration.id)
+        .with_for_update()
+    )
+    previous = {row.id: row._mapping for row in result}
+    if not previous:
+        return {}
+
+    values["updated_at"] = datetime.utcnow()
+    result = await db.execute(
+        update(InterviewRegistration)
+        .where(InterviewRegistration.id.in_(previous))
+        .values(**values)
+        .returning(InterviewRegistration.id, InterviewRegistration.registration_id, InterviewRegistration.updated_at, *columns)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+
+    if counted:
+        changed = Counter()
+        for old in previous.values():
+            changed.update(counter_deltas(old, {**old, **values}))
+        if deltas is not None:
+            deltas.update(changed)
+        else:
+            await db.run_sync(lambda session: apply_counter_deltas(session.connection(), changed))
+
+    await publish_registration_changes(db, rows, event, changes)
+    return {row.registration_id: row for row in rows}
@@ -0,0 +1,46 @@
+import bisect
+from typing import Dict, Sequence
+
+# Seconds; spans a pooled checkout (sub-millisecond) up to a pool timeout
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. observe() is a bisect and two increments with no lock: under the
+    GIL a concurrent observation can at worst be lost, which is fine for telemetry.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count", "max")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self) -> Dict[str, int]:
+        """{upper bound: observations <= bound}, ending with "+Inf" (Prometheus `le` semantics)"""
+        result, running = {}, 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            result[repr(bound)] = running
+        result["+Inf"] = running + self.counts[-1]
+        return result
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": self.cumulative(),
+        }
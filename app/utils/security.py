@@ -1,9 +1,29 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
 from passlib.context import CryptContext
 from app.core.config import settings
 from jose import jwt
 from datetime import datetime, timedelta
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Users seeded before bcrypt was adopted carry unsalted hex SHA-256 hashes; they still verify
+# but are deprecated, so verify_and_update hands back a bcrypt replacement on the next login
+pwd_context = CryptContext(
+    schemes=["bcrypt", "hex_sha256"],
+    deprecated=["hex_sha256"],
+    bcrypt__rounds=settings.bcrypt_rounds,
+)
+
+# bcrypt is deliberately slow and releases the GIL, so it runs on its own small pool: the event
+# loop never waits on it, and a burst of logins queues here instead of in the default executor
+# that sync routes share. Work beyond workers + queue size is refused rather than left to pile up.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="password-hash")
+_hash_slots = asyncio.Semaphore(settings.password_hash_workers + settings.password_hash_queue_size)
+
+
+class PasswordHashingBusy(Exception):
+    """The hashing pool's queue is full"""
 
 
 def hash_password(password: str) -> str:
@@ -14,6 +34,38 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    (valid, replacement hash). The replacement is set when the stored hash uses a deprecated
+    scheme. Without a stored hash (unknown user) a dummy verify runs so timing stays the same.
+    """
+    if hashed_password is None:
+        pwd_context.dummy_verify()
+        return False, None
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except ValueError:
+        # Not a hash any configured scheme recognises
+        return False, None
+
+
+async def run_password_hashing(func, *args):
+    """Run a hashing function on the dedicated pool"""
+    if _hash_slots.locked():
+        raise PasswordHashingBusy()
+    async with _hash_slots:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+
+
+async def check_password(plain_password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+    return await run_password_hashing(verify_and_update_password, plain_password, hashed_password)
+
+
+def decode_token(token: str) -> dict:
+    """Verify the signature and expiry; raises jose.JWTError subclasses"""
+    return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+
+
 def create_access_token(
     data: dict, expires_delta: int = settings.access_token_expiry_time
 ):
@@ -0,0 +1,142 @@
+"""
+Declarative document shapes compiled into fast row serializers.
+
+A DocumentShape maps output keys to field specs (a column attribute, a key
+inside a JSON column, or a computed value). For each requested fieldset it
+builds, once, a serializer that reads every column the fieldset needs with a
+single operator.attrgetter call (so each JSON column is read once) and fills
+the dict through a precomputed getter per key, with no per-key dispatch per
+row. Datetimes are left as datetime objects and encoded by orjson, which
+writes the same ISO-8601 text as .isoformat().
+"""
+import copy
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+
+class Attr:
+    """The value of a mapped attribute, as is"""
+    __slots__ = ("attribute",)
+
+    def __init__(self, attribute: str):
+        self.attribute = attribute
+
+
+class JsonKey:
+    """A key of a JSON column with a default (lists and dicts are copied per row); the column is read once per row"""
+    __slots__ = ("attribute", "key", "default")
+
+    def __init__(self, attribute: str, key: str, default: Any = None):
+        self.attribute = attribute
+        self.key = key
+        self.default = default
+
+
+class Computed:
+    """
+    build(obj, include_relations) for anything else. `attributes` are the columns it reads;
+    with `relation` set the key is only emitted when relations are included.
+    """
+    __slots__ = ("build", "attributes", "relation")
+
+    def __init__(self, build: Callable[[Any, bool], Any], attributes: Sequence[str] = (), relation: Optional[str] = None):
+        self.build = build
+        self.attributes = tuple(attributes)
+        self.relation = relation
+
+
+def _json_value(position: int, key: str, default: Any) -> Callable[[tuple], Any]:
+    if isinstance(default, (list, dict)):
+        # Mutable defaults are fresh per row
+        def value(row):
+            column = row[position] or {}
+            return column[key] if key in column else copy.deepcopy(default)
+        return value
+    return lambda row: (row[position] or {}).get(key, default)
+
+
+def _computed_value(build: Callable[[Any, bool], Any], include_relations: bool) -> Callable[[tuple], Any]:
+    return lambda row: build(row[0], include_relations)
+
+
+class DocumentShape:
+    def __init__(self, model, fields: Dict[str, Any]):
+        self.model = model
+        self.fields = fields
+        self._compiled: Dict[Tuple[Tuple[str, ...], bool], Callable[[Any], Dict[str, Any]]] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.fields
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def attributes(self, key: str) -> Tuple[str, ...]:
+        spec = self.fields[key]
+        return spec.attributes if isinstance(spec, Computed) else (spec.attribute,)
+
+    def columns(self, keys: Iterable[str]) -> List[Any]:
+        """Mapped columns the given keys read, for load_only()"""
+        return [getattr(self.model, attribute) for key in keys for attribute in self.attributes(key)]
+
+    def serializer(self, keys: Optional[Sequence[str]] = None, include_relations: bool = True) -> Callable[[Any], Dict[str, Any]]:
+        cache_key = (tuple(self.fields if keys is None else keys), include_relations)
+        serialize = self._compiled.get(cache_key)
+        if serialize is None:
+            serialize = self._compiled[cache_key] = self._compile(*cache_key)
+        return serialize
+
+    def serialize(self, obj, keys: Optional[Sequence[str]] = None, include_relations: bool = True) -> Dict[str, Any]:
+        return self.serializer(keys, include_relations)(obj)
+
+    def _compile(self, keys: Tuple[str, ...], include_relations: bool) -> Callable[[Any], Dict[str, Any]]:
+        # Position of each attribute in the row tuple: (obj, *attrgetter(...)(obj))
+        attributes: Dict[str, int] = {}
+        names: List[str] = []
+        values: List[Callable[[tuple], Any]] = []
+        for key in keys:
+            spec = self.fields[key]
+            if isinstance(spec, Attr):
+                value = itemgetter(attributes.setdefault(spec.attribute, len(attributes) + 1))
+            elif isinstance(spec, JsonKey):
+                value = _json_value(attributes.setdefault(spec.attribute, len(attributes) + 1), spec.key, spec.default)
+            elif isinstance(spec, Computed):
+                if spec.relation and not include_relations:
+                    continue
+                value = _computed_value(spec.build, include_relations)
+            else:
+                raise TypeError(f"Unknown field spec for {key!r}: {spec!r}")
+            names.append(key)
+            values.append(value)
+
+        if not attributes:
+            read = lambda obj: ()
+        elif len(attributes) == 1:
+            # attrgetter of a single name returns the value itself, not a tuple
+            read = lambda obj, get=attrgetter(*attributes): (get(obj),)
+        else:
+            read = attrgetter(*attributes)
+
+        def serialize(obj):
+            row = (obj, *read(obj))
+            return dict(zip(names, [value(row) for value in values]))
+        return serialize
+
+
+def json_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> ORJSONResponse:
+    """
+    Encode `content` straight to bytes with orjson, skipping FastAPI's jsonable_encoder pass.
+    Headers already set on the injected `response` (ETag, Cache-Control) are carried over.
+    """
+    headers = None
+    if response is not None:
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,258 @@
+"""
+Query-plan and latency benchmark for the query-path indexes (migration d8365a128baa).
+
+Seeds a synthetic dataset, then runs EXPLAIN (ANALYZE, BUFFERS) for every query the
+registration routers issue, once with the migration's indexes temporarily dropped
+(inside a transaction that is rolled back) and once with them in place, and prints the
+median execution time and plan shape of each.
+
+Run it against a scratch database with the migrations applied, never production:
+dropping an index inside a transaction holds an ACCESS EXCLUSIVE lock on the table.
+
+    python benchmarks/index_benchmark.py seed --rows 100000 --answers 8
+    python benchmarks/index_benchmark.py run --repeat 5
+    python benchmarks/index_benchmark.py cleanup
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import sys
+from datetime import timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, desc, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.db.postgres.database import SYNC_DATABASE_URL
+from app.models.interview_registration import InterviewRegistration as R
+from app.models.question_answer import QuestionAnswer as QA
+from app.routers.interview_registrations_db import (
+    DELTA_SYNC_SAFETY_WINDOW, apply_changes_cursor, apply_registration_cursor, apply_registration_filters
+)
+from app.schemas.interview_registration import RegistrationFilters
+from app.services.registration_counters import rebuild_registration_counters
+from app.utils.pagination import encode_cursor
+
+BENCH_PREFIX = "BENCH-"
+PAGE = 50
+
+engine = create_engine(SYNC_DATABASE_URL)
+Session = sessionmaker(bind=engine)
+
+
+def load_migration_indexes():
+    path = os.path.join(os.path.dirname(__file__), '..', 'alembic', 'versions', 'd8365a128baa_query_path_indexes.py')
+    spec = importlib.util.spec_from_file_location("query_path_indexes", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return [name for name, _, _ in module.INDEXES]
+
+
+def seed(rows: int, answers: int) -> None:
+    with engine.begin() as conn:
+        existing = conn.execute(
+            text("SELECT count(*) FROM interview_registrations WHERE registration_id LIKE :prefix"),
+            {"prefix": BENCH_PREFIX + "%"}
+        ).scalar()
+        if existing:
+            sys.exit(f"{existing} benchmark rows already present; run cleanup first")
+
+        print(f"Inserting {rows} registrations...")
+        conn.execute(text("""
+            INSERT INTO interview_registrations (
+                name, email, registration_id, resume_extracted_text, resume_summary,
+                status, current_question_index, is_completed,
+                upk_eligible, teacher_eligible, substitute_eligible, shift_available, diaper_comfortable,
+                started_at, completed_at, submitted_at,
+                work_experience_summary, position_type, school_type, hr_review,
+                resume_comparison, created_at, updated_at
+            )
+            SELECT
+                'Bench Candidate ' || g,
+                'bench' || g || '@example.com',
+                :prefix || lpad(g::text, 7, '0'),
+                'Extracted resume text of candidate ' || g,
+                'Resume summary of candidate ' || g,
+                (ARRAY['not attempted', 'in progress', 'completed'])[1 + g % 3],
+                CASE WHEN g % 3 = 2 THEN :answers - 1 ELSE -1 END,
+                g % 3 = 2,
+                g % 2 = 0, g % 3 = 0, g % 5 = 0, g % 7 = 0, g % 11 = 0,
+                ts - interval '30 minutes', CASE WHEN g % 3 = 2 THEN ts END,
+                -- a few rows without submitted_at exercise the NULLS LAST branch of the cursor
+                CASE WHEN g % 97 = 0 THEN NULL ELSE ts END,
+                'Work experience of candidate ' || g,
+                (ARRAY['', 'teacher', 'assistant teacher', 'substitute'])[1 + g % 4],
+                (ARRAY['', 'UPK', 'daycare'])[1 + g % 3],
+                -- a selective HR review state, like a shortlist
+                CASE WHEN g % 100 = 0 THEN 'shortlisted' WHEN g % 10 = 0 THEN 'rejected' ELSE 'pending' END,
+                json_build_object('similarity_score', g % 100, 'recommendation', 'pending'),
+                ts, ts + (g % 1000) * interval '1 second'
+            FROM generate_series(1, :rows) AS g,
+                 LATERAL (SELECT timestamp '2024-01-01' + g * interval '5 minutes' AS ts) AS t
+        """), {"prefix": BENCH_PREFIX, "rows": rows, "answers": answers})
+
+        print(f"Inserting {rows * answers} question answers...")
+        conn.execute(text("""
+            INSERT INTO question_answers (registration_id, question_text, answer_text, is_answered, question_order, timestamp)
+            SELECT r.id, 'Question ' || q, 'Answer ' || q || ' of ' || r.registration_id, true, q, r.submitted_at
+            FROM interview_registrations AS r, generate_series(1, :answers) AS q
+            WHERE r.registration_id LIKE :prefix
+        """), {"prefix": BENCH_PREFIX + "%", "answers": answers})
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE interview_registrations"))
+        conn.execute(text("VACUUM ANALYZE question_answers"))
+
+    # Raw INSERTs bypass the ORM hook, so recompute the rollup
+    db = Session()
+    try:
+        print(f"Counters rebuilt, total registrations: {rebuild_registration_counters(db)}")
+    finally:
+        db.close()
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        deleted = conn.execute(
+            text("DELETE FROM interview_registrations WHERE registration_id LIKE :prefix"),
+            {"prefix": BENCH_PREFIX + "%"}
+        ).rowcount
+        conn.execute(
+            text("DELETE FROM registration_tombstones WHERE registration_id LIKE :prefix"),
+            {"prefix": BENCH_PREFIX + "%"}
+        )
+    db = Session()
+    try:
+        rebuild_registration_counters(db)
+    finally:
+        db.close()
+    print(f"Deleted {deleted} benchmark registrations")
+
+
+def router_queries(conn):
+    """The statements the registration routers issue, with realistic parameters taken from the data"""
+    order = (desc(R.submitted_at).nulls_last(), desc(R.id))
+    page_keys = select(R.id, R.submitted_at, R.updated_at)
+
+    total = conn.execute(select(func.count()).select_from(R)).scalar()
+    middle = conn.execute(
+        select(R.submitted_at, R.id).order_by(*order).offset(total // 2).limit(1)
+    ).one()
+    page_ids = conn.execute(select(R.id).order_by(*order).limit(PAGE)).scalars().all()
+    newest = conn.execute(select(func.max(R.updated_at))).scalar()
+    changed_since = newest - timedelta(hours=6)
+    sample = conn.execute(
+        select(R.registration_id, R.email).order_by(R.id).offset(total // 3).limit(1)
+    ).one()
+
+    newest_subquery = select(func.max(R.updated_at)).scalar_subquery()
+    return {
+        "list: first page": page_keys.order_by(*order).limit(PAGE + 1),
+        "list: page from mid-table cursor": apply_registration_cursor(
+            page_keys, encode_cursor(middle.submitted_at, middle.id)
+        ).order_by(*order).limit(PAGE + 1),
+        "list: status filter": apply_registration_filters(
+            page_keys, RegistrationFilters(status="completed")
+        ).order_by(*order).limit(PAGE + 1),
+        "list: hr_review filter": apply_registration_filters(
+            page_keys, RegistrationFilters(hr_review="shortlisted")
+        ).order_by(*order).limit(PAGE + 1),
+        "list: answers for a page (selectinload)": select(QA).where(QA.registration_id.in_(page_ids)),
+        "list: changed_since delta page": apply_changes_cursor(
+            select(R.id, R.updated_at).where(R.updated_at > changed_since), None
+        ).order_by(R.updated_at, R.id).limit(PAGE + 1),
+        "overview: version fingerprint": select(R.id, R.updated_at).where(
+            R.updated_at >= newest_subquery - DELTA_SYNC_SAFETY_WINDOW
+        ).order_by(R.id),
+        "patch: resolve registration_id": select(R.registration_id, R.id).where(
+            R.registration_id.in_([sample.registration_id])
+        ),
+        "patch: 404 suggestions (prefix)": select(R.registration_id).where(
+            R.registration_id.like(sample.registration_id[:-2] + "%")
+        ).order_by(R.registration_id).limit(5),
+        "export: question count (hr_review filter)": apply_registration_filters(
+            select(func.max(QA.question_order)).join(R, QA.registration_id == R.id),
+            RegistrationFilters(hr_review="shortlisted")
+        ),
+        "lookup by email": select(R.id).where(R.email == sample.email),
+    }
+
+
+def compile_sql(statement) -> str:
+    # "named" paramstyle keeps literal % signs unescaped; text() escapes them again for the driver
+    return str(statement.compile(dialect=postgresql.dialect(paramstyle="named"), compile_kwargs={"literal_binds": True}))
+
+
+def plan_shape(node) -> str:
+    label = node["Node Type"]
+    if "Index Name" in node:
+        label += f" using {node['Index Name']}"
+    elif "Relation Name" in node:
+        label += f" on {node['Relation Name']}"
+    children = [plan_shape(child) for child in node.get("Plans", [])]
+    return label + (f" ({'; '.join(children)})" if children else "")
+
+
+def explain(conn, sql: str, repeat: int):
+    conn.execute(text(sql)).fetchall()  # warm the buffer cache
+    times, plan = [], None
+    for _ in range(repeat):
+        result = conn.execute(text("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql)).scalar()
+        report = result[0] if isinstance(result, list) else json.loads(result)[0]
+        times.append(report["Execution Time"])
+        plan = report["Plan"]
+    return statistics.median(times), plan_shape(plan)
+
+
+def run(repeat: int) -> None:
+    indexes = load_migration_indexes()
+    with engine.connect() as conn:
+        statements = {name: compile_sql(query) for name, query in router_queries(conn).items()}
+        conn.rollback()
+
+        before = {}
+        with conn.begin() as transaction:
+            for index in indexes:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+            for name, sql in statements.items():
+                before[name] = explain(conn, sql, repeat)
+            transaction.rollback()
+
+        after = {name: explain(conn, sql, repeat) for name, sql in statements.items()}
+        conn.rollback()
+
+    for name in statements:
+        (before_ms, before_plan), (after_ms, after_plan) = before[name], after[name]
+        speedup = before_ms / after_ms if after_ms else float("inf")
+        print(f"\n{name}")
+        print(f"  before: {before_ms:9.3f} ms  {before_plan}")
+        print(f"  after:  {after_ms:9.3f} ms  {after_plan}")
+        print(f"  speedup: {speedup:.1f}x")
+    print(f"\n{len(statements)} queries, median of {repeat} runs each")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed_parser = commands.add_parser("seed", help="insert the synthetic dataset")
+    seed_parser.add_argument("--rows", type=int, default=100_000)
+    seed_parser.add_argument("--answers", type=int, default=8, help="question answers per registration")
+    run_parser = commands.add_parser("run", help="EXPLAIN ANALYZE every router query without and with the indexes")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    commands.add_parser("cleanup", help="delete the synthetic dataset")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        seed(args.rows, args.answers)
+    elif args.command == "run":
+        run(args.repeat)
+    else:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
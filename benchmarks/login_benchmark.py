@@ -0,0 +1,92 @@
+"""
+Login throughput and tail latency under concurrent logins.
+
+Fires --requests logins at a running server for each --concurrency level while a probe
+requests a cheap endpoint every --probe-interval seconds. bcrypt runs on the dedicated
+hashing pool (PASSWORD_HASH_WORKERS), so login throughput plateaus at roughly
+workers / hash time and extra logins queue; the probe's p99 shows whether the event loop
+stays responsive meanwhile -- it should stay flat across concurrency levels. Logins turned
+away because the hashing queue is full (503) are counted separately.
+
+    python benchmarks/login_benchmark.py --url http://127.0.0.1:8000 \\
+        --username john.doe@email.com --password user123 --concurrency 1 8 32 64
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_level(client: httpx.AsyncClient, args, concurrency: int) -> None:
+    latencies: List[float] = []
+    probe_latencies: List[float] = []
+    statuses = {}
+    remaining = args.requests
+    payload = {"username": args.username, "password": args.password}
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.post("/api/auth/login", json=payload)
+            elapsed = time.perf_counter() - started
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 200:
+                latencies.append(elapsed)
+
+    async def probe():
+        while True:
+            started = time.perf_counter()
+            await client.get(args.probe_path)
+            probe_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(args.probe_interval)
+
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    probe_task.cancel()
+
+    print(
+        f"  c={concurrency:<4} {len(latencies) / wall:7.1f} logins/s   "
+        f"login p50 {percentile(latencies, 50) * 1000:7.1f} ms  p99 {percentile(latencies, 99) * 1000:7.1f} ms   "
+        f"probe p50 {percentile(probe_latencies, 50) * 1000:6.1f} ms  p99 {percentile(probe_latencies, 99) * 1000:6.1f} ms   "
+        f"status {dict(sorted(statuses.items()))}"
+    )
+
+
+async def run(args) -> None:
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 1)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        # Warm up: upgrades a legacy hash to bcrypt and opens connections
+        response = await client.post("/api/auth/login", json={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        print(f"{args.requests} logins per level against {args.url}, probing {args.probe_path}")
+        for concurrency in args.concurrency:
+            await run_level(client, args, concurrency)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=200, help="logins per concurrency level")
+    parser.add_argument("--probe-path", default="/api/interview-registrations/stats/cache")
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
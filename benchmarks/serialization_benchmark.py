@@ -0,0 +1,120 @@
+"""
+Per-row cost of serializing registration documents, before and after the compiled serializers.
+
+Builds N in-memory registrations (no database needed) and times, for both document
+shapes, the previous path -- a per-key builder lookup for every field of every row,
+datetimes formatted with .isoformat(), then FastAPI's jsonable_encoder + json.dumps --
+against the compiled DocumentShape serializer followed by orjson.dumps, as returned by
+the routers now. Reports the best of --repeat runs in microseconds per row.
+
+    python benchmarks/serialization_benchmark.py --sizes 1000 10000 100000 --answers 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.interview_registration import InterviewRegistration
+from app.models.question_answer import QuestionAnswer
+from app.services.registration_documents import LIST_SHAPE, MONGO_SHAPE
+from app.utils.serialization import Attr, DocumentShape, JsonKey, dumps
+
+
+def build_registrations(rows: int, answers: int):
+    base = datetime(2025, 1, 1, 9, 30, 15, 123456)
+    registrations = []
+    for i in range(rows):
+        registration = InterviewRegistration(
+            id=i + 1, name=f"Candidate {i}", email=f"candidate{i}@example.com", registration_id=f"REG-{i:08d}",
+            status="completed" if i % 3 else "pending", feedback="Strong communication" if i % 2 else None,
+            submitted_at=base + timedelta(minutes=i), resume_summary="Five years of early childhood teaching. " * 3,
+            work_experience_summary="Lead teacher, assistant teacher", position_type="teacher", school_type="upk",
+            hr_review=None, upk_eligible=True, teacher_eligible=bool(i % 2), substitute_eligible=False,
+            shift_available=True, diaper_comfortable=bool(i % 5), current_question_index=answers, is_completed=True,
+            started_at=base + timedelta(minutes=i, seconds=5), completed_at=base + timedelta(minutes=i + 20),
+            resume_comparison={
+                "similarity_score": 0.82, "overall_assessment": "Consistent", "matching_points": ["degree", "upk"],
+                "discrepancies": [], "recommendation": "proceed", "confidence": 0.9, "analyzed_at": base.isoformat()
+            },
+        )
+        registration.question_answers = [
+            QuestionAnswer(
+                question_text=f"Question {order}?", answer_text=f"Answer {order} from candidate {i}",
+                is_answered=True, question_order=order, timestamp=base + timedelta(minutes=i, seconds=order)
+            )
+            for order in range(1, answers + 1)
+        ]
+        registrations.append(registration)
+    return registrations
+
+
+def _isoformat(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def interpreted(shape: DocumentShape, include_relations: bool = True):
+    """The previous approach: look every key's builder up per row and format datetimes eagerly"""
+    def serialize(obj):
+        document = {}
+        for key, spec in shape.fields.items():
+            if isinstance(spec, Attr):
+                document[key] = _isoformat(getattr(obj, spec.attribute))
+            elif isinstance(spec, JsonKey):
+                document[key] = (getattr(obj, spec.attribute) or {}).get(spec.key, spec.default)
+            elif not spec.relation or include_relations:
+                document[key] = spec.build(obj, include_relations)
+        return document
+    return serialize
+
+
+def best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(sizes, answers: int, repeat: int) -> None:
+    for rows in sizes:
+        registrations = build_registrations(rows, answers)
+        print(f"\n{rows} rows, {answers} answers each")
+        for name, shape in (("list", LIST_SHAPE), ("mongo", MONGO_SHAPE)):
+            before = interpreted(shape)
+            after = shape.serializer()
+
+            def previous():
+                return json.dumps(
+                    jsonable_encoder({"success": True, "data": [before(r) for r in registrations]}),
+                    ensure_ascii=False, separators=(",", ":")
+                ).encode("utf-8")
+
+            def compiled():
+                return dumps({"success": True, "data": [after(r) for r in registrations]})
+
+            assert json.loads(previous()) == json.loads(compiled()), f"{name} shape output differs"
+            before_s, after_s = best_of(repeat, previous), best_of(repeat, compiled)
+            print(
+                f"  {name:5}  previous {before_s / rows * 1e6:7.2f} us/row   "
+                f"compiled+orjson {after_s / rows * 1e6:7.2f} us/row   speedup {before_s / after_s:.1f}x"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--answers", type=int, default=8, help="question answers per registration")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.answers, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Partial-transcript ingestion benchmark for /ws/interview.
+
+Opens --concurrency simulated speakers at once on the load-test registrations of
+ws_load_benchmark.py. For every question a speaker streams interim transcripts of a
+growing answer at --rate events per second for --speak-time seconds, like browser
+speech recognition does, then sends the final transcript and times how long the next
+question takes to arrive. Per level it prints transcript events per second, the
+next-question p50/p99 and, from the worker's /internal/ws counters, how many draft
+rows were written for the interim events received: with the default
+INTERVIEW_PARTIAL_WRITE_INTERVAL_MS that is about one write per question per second,
+however fast candidates talk.
+
+Run it against a single uvicorn worker on a scratch database, never production:
+
+    uvicorn app.main:app --workers 1
+    python benchmarks/ws_load_benchmark.py seed --sessions 500
+    python benchmarks/transcript_benchmark.py --url ws://127.0.0.1:8000/ws/interview \\
+        --stats-url http://127.0.0.1:8000/internal/ws --admin-id 1 --concurrency 100 300 500
+    python benchmarks/ws_load_benchmark.py cleanup
+
+/internal/ws is admin only, so --admin-id names an admin user (users.userid) whose
+token the counters are read with.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import urllib.request
+from collections import Counter
+from typing import Dict, List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import websockets
+from sqlalchemy import text
+
+from app.utils.security import create_access_token
+from ws_load_benchmark import LOAD_PREFIX, engine, percentile, reset
+
+WORDS = "the candidate explains their approach to the problem step by step with examples".split()
+
+
+def worker_stats(args, token: str) -> Dict[str, int]:
+    request = urllib.request.Request(args.stats_url, headers={"Authorization": f"Bearer {token}"})
+    with urllib.request.urlopen(request, timeout=args.timeout) as response:
+        return json.loads(response.read())["data"]
+
+
+async def speaker(args, token: str, number: int, answer_latencies: List[float], sent: Counter, outcomes: Counter) -> None:
+    await asyncio.sleep(random.uniform(0, args.ramp))
+    url = f"{args.url}?token={token}&session_token=load-session-{number}"
+    try:
+        async with websockets.connect(url, open_timeout=args.timeout, ping_interval=None) as ws:
+            pending_since = None
+            while True:
+                message = json.loads(await asyncio.wait_for(ws.recv(), args.timeout))
+                if message.get("type") == "ping":
+                    await ws.send('{"type":"pong"}')
+                    continue
+                if pending_since is not None:
+                    answer_latencies.append(time.perf_counter() - pending_since)
+                order = message["questionIndex"] + 1
+                words: List[str] = []
+                for _ in range(max(1, int(args.speak_time * args.rate))):
+                    await asyncio.sleep(random.expovariate(args.rate))
+                    words.append(random.choice(WORDS))
+                    await ws.send(json.dumps({"type": "transcript", "questionOrder": order, "text": " ".join(words), "final": False}))
+                    sent["interim"] += 1
+                pending_since = time.perf_counter()
+                await ws.send(json.dumps({"type": "transcript", "questionOrder": order, "text": " ".join(words), "final": True}))
+                sent["final"] += 1
+    except websockets.ConnectionClosed as e:
+        outcomes[e.rcvd.code if e.rcvd else "abnormal"] += 1
+    except (asyncio.TimeoutError, OSError) as e:
+        outcomes[type(e).__name__] += 1
+
+
+async def run_level(args, token: str, stats_token: str, concurrency: int) -> None:
+    answer_latencies: List[float] = []
+    sent: Counter = Counter()
+    outcomes: Counter = Counter()
+    before = await asyncio.to_thread(worker_stats, args, stats_token)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        speaker(args, token, number, answer_latencies, sent, outcomes)
+        for number in range(1, concurrency + 1)
+    ))
+    wall = time.perf_counter() - started
+    after = await asyncio.to_thread(worker_stats, args, stats_token)
+    received = after["partial_transcripts_received"] - before["partial_transcripts_received"]
+    written = after["draft_answers_written"] - before["draft_answers_written"]
+    print(
+        f"  c={concurrency:<5} {(sent['interim'] + sent['final']) / wall:8.1f} events/s   "
+        f"next question p50 {percentile(answer_latencies, 50) * 1000:7.1f} ms  "
+        f"p99 {percentile(answer_latencies, 99) * 1000:7.1f} ms   "
+        f"interim {received} -> {written} draft writes ({written / received if received else 0:.1%})   "
+        f"closes {dict(outcomes)}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/ws/interview")
+    parser.add_argument("--stats-url", default="http://127.0.0.1:8000/internal/ws")
+    parser.add_argument("--token", help="access token to connect with (default: minted with SECRET_KEY)")
+    parser.add_argument("--admin-id", type=int, required=True, help="userid of an admin, for reading /internal/ws")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[100, 300, 500])
+    parser.add_argument("--rate", type=float, default=10.0, help="interim transcripts per second per speaker")
+    parser.add_argument("--speak-time", type=float, default=5.0, help="seconds a speaker talks per answer")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which the connections are opened")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        available = conn.execute(
+            text("SELECT count(*) FROM interview_registrations WHERE registration_id LIKE :prefix"),
+            {"prefix": LOAD_PREFIX + "%"}
+        ).scalar()
+    if max(args.concurrency) > available:
+        sys.exit(f"Only {available} load-test registrations; run ws_load_benchmark.py seed --sessions {max(args.concurrency)}")
+
+    token = args.token or create_access_token({"sub": "load-test"})
+    stats_token = create_access_token({"sub": str(args.admin_id)})
+    print(f"Speakers against {args.url}, {args.rate} interim/s for {args.speak_time}s per answer (1000 = completed)")
+    for concurrency in args.concurrency:
+        reset()
+        asyncio.run(run_level(args, token, stats_token, concurrency))
+
+
+if __name__ == "__main__":
+    main()
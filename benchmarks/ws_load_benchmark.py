@@ -0,0 +1,211 @@
+"""
+Concurrent interview load generator for /ws/interview.
+
+Seeds --sessions synthetic registrations, then for each --concurrency level resets them
+and opens that many interviews at once against a running worker. Every simulated
+candidate waits --think-time seconds per question, answers it and times how long the
+next question takes to arrive; heartbeat pings are answered like the browser does.
+Per level it prints connect and answer-to-next-question p50/p99, answers per second
+and how the connections ended, so the level where latency bends (or 1012/4009 closes
+appear) is what one worker sustains.
+
+Run it against a single uvicorn worker on a scratch database, never production:
+
+    uvicorn app.main:app --workers 1
+    python benchmarks/ws_load_benchmark.py seed --sessions 1000
+    python benchmarks/ws_load_benchmark.py run --url ws://127.0.0.1:8000/ws/interview \\
+        --concurrency 100 250 500 1000 --think-time 1.0
+    python benchmarks/ws_load_benchmark.py cleanup
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import websockets
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.postgres.database import SYNC_DATABASE_URL
+from app.services.registration_counters import rebuild_registration_counters
+from app.utils.security import create_access_token
+
+LOAD_PREFIX = "LOAD-"
+
+engine = create_engine(SYNC_DATABASE_URL)
+Session = sessionmaker(bind=engine)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def rebuild_counters() -> None:
+    db = Session()
+    try:
+        rebuild_registration_counters(db)
+    finally:
+        db.close()
+
+
+def seed(sessions: int) -> None:
+    with engine.begin() as conn:
+        existing = conn.execute(
+            text("SELECT count(*) FROM interview_registrations WHERE registration_id LIKE :prefix"),
+            {"prefix": LOAD_PREFIX + "%"}
+        ).scalar()
+        if existing:
+            sys.exit(f"{existing} load-test rows already present; run cleanup first")
+
+        # No question answers: opening the interview inserts the default questions
+        conn.execute(text("""
+            INSERT INTO interview_registrations (
+                name, email, registration_id, session_token, resume_extracted_text, resume_summary,
+                status, current_question_index, is_completed, submitted_at, hr_review,
+                resume_comparison, created_at, updated_at
+            )
+            SELECT
+                'Load Candidate ' || g, 'load' || g || '@example.com',
+                :prefix || lpad(g::text, 7, '0'), 'load-session-' || g,
+                'Extracted resume text', 'Resume summary',
+                'not attempted', -1, false, now(), 'pending', '{}'::json, now(), now()
+            FROM generate_series(1, :sessions) AS g
+        """), {"prefix": LOAD_PREFIX, "sessions": sessions})
+    rebuild_counters()
+    print(f"Inserted {sessions} load-test registrations")
+
+
+def reset() -> None:
+    """Put every load-test interview back to its first question"""
+    with engine.begin() as conn:
+        conn.execute(
+            text("""
+                DELETE FROM question_answers WHERE registration_id IN (
+                    SELECT id FROM interview_registrations WHERE registration_id LIKE :prefix
+                )
+            """),
+            {"prefix": LOAD_PREFIX + "%"}
+        )
+        conn.execute(
+            text("""
+                UPDATE interview_registrations
+                SET status = 'not attempted', current_question_index = -1, is_completed = false,
+                    started_at = NULL, completed_at = NULL
+                WHERE registration_id LIKE :prefix
+            """),
+            {"prefix": LOAD_PREFIX + "%"}
+        )
+    rebuild_counters()
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        deleted = conn.execute(
+            text("DELETE FROM interview_registrations WHERE registration_id LIKE :prefix"),
+            {"prefix": LOAD_PREFIX + "%"}
+        ).rowcount
+        conn.execute(
+            text("DELETE FROM registration_tombstones WHERE registration_id LIKE :prefix"),
+            {"prefix": LOAD_PREFIX + "%"}
+        )
+    rebuild_counters()
+    print(f"Deleted {deleted} load-test registrations")
+
+
+async def candidate(args, token: str, number: int, connect_latencies: List[float], answer_latencies: List[float], outcomes: Counter) -> None:
+    # Spread the handshakes over the ramp so the level measures steady state, not a SYN burst
+    await asyncio.sleep(random.uniform(0, args.ramp))
+    url = f"{args.url}?token={token}&session_token=load-session-{number}"
+    started = time.perf_counter()
+    try:
+        async with websockets.connect(url, open_timeout=args.timeout, ping_interval=None) as ws:
+            pending_since = None
+            while True:
+                message = json.loads(await asyncio.wait_for(ws.recv(), args.timeout))
+                if message.get("type") == "ping":
+                    await ws.send('{"type":"pong"}')
+                    continue
+                now = time.perf_counter()
+                if pending_since is None:
+                    connect_latencies.append(now - started)
+                else:
+                    answer_latencies.append(now - pending_since)
+                await asyncio.sleep(random.expovariate(1 / args.think_time) if args.think_time else 0)
+                pending_since = time.perf_counter()
+                await ws.send(json.dumps({"answer": f"Load answer to question {message['questionIndex'] + 1}"}))
+    except websockets.ConnectionClosed as e:
+        outcomes[e.rcvd.code if e.rcvd else "abnormal"] += 1
+    except (asyncio.TimeoutError, OSError) as e:
+        outcomes[type(e).__name__] += 1
+
+
+async def run_level(args, token: str, concurrency: int) -> None:
+    connect_latencies: List[float] = []
+    answer_latencies: List[float] = []
+    outcomes: Counter = Counter()
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        candidate(args, token, number, connect_latencies, answer_latencies, outcomes)
+        for number in range(1, concurrency + 1)
+    ))
+    wall = time.perf_counter() - started
+    print(
+        f"  c={concurrency:<5} connect p50 {percentile(connect_latencies, 50) * 1000:7.1f} ms  "
+        f"p99 {percentile(connect_latencies, 99) * 1000:7.1f} ms   "
+        f"next question p50 {percentile(answer_latencies, 50) * 1000:7.1f} ms  "
+        f"p99 {percentile(answer_latencies, 99) * 1000:7.1f} ms   "
+        f"{len(answer_latencies) / wall:7.1f} answers/s   closes {dict(outcomes)}"
+    )
+
+
+def run(args) -> None:
+    with engine.connect() as conn:
+        available = conn.execute(
+            text("SELECT count(*) FROM interview_registrations WHERE registration_id LIKE :prefix"),
+            {"prefix": LOAD_PREFIX + "%"}
+        ).scalar()
+    if max(args.concurrency) > available:
+        sys.exit(f"Only {available} load-test registrations; seed at least {max(args.concurrency)}")
+
+    token = args.token or create_access_token({"sub": "load-test"})
+    print(f"Interviews against {args.url}, think time {args.think_time}s, ramp {args.ramp}s (1000 = completed)")
+    for concurrency in args.concurrency:
+        reset()
+        asyncio.run(run_level(args, token, concurrency))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed_parser = commands.add_parser("seed", help="insert the load-test registrations")
+    seed_parser.add_argument("--sessions", type=int, default=1000)
+    run_parser = commands.add_parser("run", help="run the interviews at each concurrency level")
+    run_parser.add_argument("--url", default="ws://127.0.0.1:8000/ws/interview")
+    run_parser.add_argument("--token", help="access token to connect with (default: minted with SECRET_KEY)")
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[100, 250, 500, 1000])
+    run_parser.add_argument("--think-time", type=float, default=1.0, help="mean seconds a candidate takes per answer")
+    run_parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which the connections are opened")
+    run_parser.add_argument("--timeout", type=float, default=30.0)
+    commands.add_parser("cleanup", help="delete the load-test registrations")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        seed(args.sessions)
+    elif args.command == "run":
+        run(args)
+    else:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
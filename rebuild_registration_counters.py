@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Repair the registration_counters rollup by recomputing it from interview_registrations.
+Run after bulk imports or manual SQL that bypassed the ORM (e.g. seed_sample_registrations.py).
+"""
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.postgres.database import sync_session
+from app.services.registration_counters import rebuild_registration_counters
+
+def main():
+    db = sync_session()
+    try:
+        print("Rebuilding registration counters...")
+        total = rebuild_registration_counters(db)
+        print(f"Registration counters rebuilt ({total} registrations)")
+    except Exception as e:
+        db.rollback()
+        print(f"Error rebuilding registration counters: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
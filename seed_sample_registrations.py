@@ -14,6 +14,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 from app.models.interview_registration import InterviewRegistration
 from app.models.question_answer import QuestionAnswer
 from app.core.config import settings
+from app.services.registration_counters import rebuild_registration_counters
 
 # Create database connection
 DATABASE_URL = (
@@ -269,6 +270,9 @@ def seed_sample_data():
         
         db.commit()
         print(f"Successfully seeded {len(sample_registrations)} interview registrations with their question answers!")
+
+        # The bulk delete above bypasses the ORM, so recompute the dashboard counters from scratch
+        rebuild_registration_counters(db)
         
     except Exception as e:
         db.rollback()
@@ -2,7 +2,6 @@ import sys
 import os
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-import hashlib
 
 # Ensure project root is on path so app.* imports work
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,10 +11,7 @@ if PROJECT_ROOT not in sys.path:
 
 from app.models.user import User
 from app.db.postgres.database import sync_session
-
-def hash_password(password):
-    """Simple password hashing for demo purposes"""
-    return hashlib.sha256(password.encode()).hexdigest()
+from app.utils.security import hash_password
 
 def main():
     try:
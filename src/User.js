@@ -38,6 +38,7 @@ const SpeechInterviewApp = ({ onLogout, currentUser }) => {
   const audioContextRef = useRef(null);
   const analyserRef = useRef(null);
   const streamRef = useRef(null);
+  const mediaRecorderRef = useRef(null);
   const timeoutRef = useRef(null);
   const silenceTimerRef = useRef(null);
   const restartAttemptRef = useRef(0);
@@ -46,6 +47,10 @@ const SpeechInterviewApp = ({ onLogout, currentUser }) => {
   const recognitionActiveRef = useRef(false);
   const accumulatedTranscriptRef = useRef('');
   const finalTranscriptTimeoutRef = useRef(null);
+  // Read by the recognition callbacks, which are set up once and would see a stale state value
+  const currentQuestionIndexRef = useRef(-1);
+  // questionIndex -> draft answer saved by the server from an earlier connection's interim transcripts
+  const draftAnswersRef = useRef({});
 
   const [storedMessages, setStoredMessages] = useState([]);
   const [isAndroid, setIsAndroid] = useState(false);
@@ -125,6 +130,7 @@ const SpeechInterviewApp = ({ onLogout, currentUser }) => {
         // Show interim results immediately
         if (interimTranscript.trim()) {
           setCurrentTranscript(accumulatedTranscriptRef.current + ' ' + interimTranscript.trim());
+          sendTranscript((accumulatedTranscriptRef.current + ' ' + interimTranscript.trim()).trim(), false);
           resetSilenceTimer();
         }
         
@@ -139,6 +145,7 @@ const SpeechInterviewApp = ({ onLogout, currentUser }) => {
             : trimmedFinal;
           
           setCurrentTranscript(accumulatedTranscriptRef.current);
+          sendTranscript(accumulatedTranscriptRef.current, false);
           
           // Clear any existing timeout
           if (finalTranscriptTimeoutRef.current) {
@@ -309,7 +316,12 @@ const SpeechInterviewApp = ({ onLogout, currentUser }) => {
       isManualStopRef.current = false;
       restartAttemptRef.current = 0;
       lastFinalTranscriptRef.current = '';
-      accumulatedTranscriptRef.current = '';
+      // Continue from the draft if the connection dropped while the candidate was answering
+      accumulatedTranscriptRef.current = draftAnswersRef.current[currentQuestionIndexRef.current] || '';
+      delete draftAnswersRef.current[currentQuestionIndexRef.current];
+      if (accumulatedTranscriptRef.current) {
+        setCurrentTranscript(accumulatedTranscriptRef.current);
+      }
       recognitionRef.current.start();
     } catch (err) {
       console.error("Failed to start recognition:", err);
@@ -331,12 +343,46 @@ const SpeechInterviewApp = ({ onLogout, currentUser }) => {
   // WebSocket connection
   useEffect(() => {
     const token = localStorage.getItem("jwtToken");
+    // The registration being interviewed: from the candidate's invitation link, else from their profile
+    const sessionToken = new URLSearchParams(window.location.search).get("session_token")
+      || currentUser?.session_token
+      || currentUser?.sessionToken;
+    if (!sessionToken) {
+      setErrorMessage("This interview link is incomplete. Please open the link from your invitation email.");
+      setHasError(true);
+      return;
+    }
 
     websocketService.connect(
       token,
+      sessionToken,
       (msg) => {
         console.log("📩 WebSocket message received:", msg);
         
+        if (typeof msg === 'string') {
+          try {
+            msg = JSON.parse(msg);
+          } catch {
+            // plain text message
+          }
+        }
+
+        // The server numbers its questions; a question re-sent after a reconnect lands in the same slot
+        if (msg.type === 'interview_data' && typeof msg.questionIndex === 'number' && msg.content) {
+          if (msg.draft) {
+            draftAnswersRef.current[msg.questionIndex] = msg.draft;
+          }
+          setStoredMessages(prev => {
+            if (prev[msg.questionIndex] === msg.content) {
+              return prev;
+            }
+            const newMessages = prev.slice(0, msg.questionIndex);
+            newMessages[msg.questionIndex] = msg.content;
+            return newMessages;
+          });
+          return;
+        }
+
         let content = null;
         if (msg.type === 'interview_data' && msg.content) {
           content = msg.content;
@@ -395,6 +441,7 @@ const SpeechInterviewApp = ({ onLogout, currentUser }) => {
         console.log(`🎯 New question received from server (${lastIndex + 1}):`, storedMessages[lastIndex].substring(0, 100) + '...');
         console.log(`📊 Total questions received so far: ${storedMessages.length}`);
         setCurrentQuestionIndex(lastIndex);
+        currentQuestionIndexRef.current = lastIndex;
         playQuestion(storedMessages[lastIndex]);
       }
     }
@@ -438,15 +485,21 @@ const SpeechInterviewApp = ({ onLogout, currentUser }) => {
     });
   }, [speechRecognitionReady]);
 
+  // Interim transcripts let the server keep a draft of the answer; the final one answers the question
+  const sendTranscript = (text, final) => {
+    websocketService.send(JSON.stringify({
+      type: 'transcript',
+      questionOrder: currentQuestionIndexRef.current + 1,
+      text,
+      final,
+    }));
+  };
+
   const sendUserResponse = useCallback((userResponse) => {
-    const responseData = {
-      answer: userResponse,
-    };
-    
-    console.log("📤 Sending user response to server:", responseData);
+    console.log("📤 Sending user response to server:", userResponse);
     console.log("⏳ Server will process and send next question...");
     
-    websocketService.send(JSON.stringify(responseData));
+    sendTranscript(userResponse, true);
     
     // Reset state for next question
     accumulatedTranscriptRef.current = '';
@@ -470,6 +523,9 @@ const SpeechInterviewApp = ({ onLogout, currentUser }) => {
       if (finalTranscriptTimeoutRef.current) {
         clearTimeout(finalTranscriptTimeoutRef.current);
       }
+      if (mediaRecorderRef.current && mediaRecorderRef.current.state !== 'inactive') {
+        mediaRecorderRef.current.stop();
+      }
       if (streamRef.current) {
         streamRef.current.getTracks().forEach(track => track.stop());
       }
@@ -617,6 +673,16 @@ const SpeechInterviewApp = ({ onLogout, currentUser }) => {
       };
       updateAudioLevel();
 
+      // Raw audio for HR review, streamed to the server as binary frames every second
+      if (window.MediaRecorder && MediaRecorder.isTypeSupported('audio/webm')) {
+        const recorder = new MediaRecorder(stream, { mimeType: 'audio/webm' });
+        recorder.ondataavailable = (event) => {
+          if (event.data.size > 0) websocketService.send(event.data);
+        };
+        recorder.start(1000);
+        mediaRecorderRef.current = recorder;
+      }
+
       const recognitionSuccess = setupSpeechRecognition();
       
       if (recognitionSuccess) {
@@ -2,13 +2,19 @@ class WebSocketService {
   constructor() {
     this.socket = null;
     this.isConnecting = false; // flag to track connection in progress
+    this.closedByClient = false;
+    this.reconnectAttempts = 0;
   }
 
-  connect(token, onMessage, onOpen, onClose, onError) {
+  connect(token, sessionToken, onMessage, onOpen, onClose, onError) {
     if (!token) {
       console.error("JWT token is required for WebSocket connection");
       return;
     }
+    if (!sessionToken) {
+      console.error("Interview session token is required for WebSocket connection");
+      return;
+    }
 
     // Prevent reconnect if already connected or connecting
     if (this.socket && (this.socket.readyState === WebSocket.OPEN || this.isConnecting)) {
@@ -17,13 +23,15 @@ class WebSocketService {
     }
 
     this.isConnecting = true;
+    this.closedByClient = false;
 
     // Initialize WebSocket
-    this.socket = new WebSocket(`wss://futuregenautomation.com/api/ws/interview?token=${token}`);
+    this.socket = new WebSocket(`wss://futuregenautomation.com/api/ws/interview?token=${encodeURIComponent(token)}&session_token=${encodeURIComponent(sessionToken)}`);
 
     this.socket.onopen = () => {
       console.log("✅ WebSocket connected");
       this.isConnecting = false;
+      this.reconnectAttempts = 0;
       if (onOpen) onOpen();
     };
 
@@ -37,6 +45,12 @@ class WebSocketService {
     // keep as plain text
   }
 
+  // Heartbeat from the server: answer it and keep it away from the UI
+  if (data?.type === "ping") {
+    this.send(JSON.stringify({ type: "pong" }));
+    return;
+  }
+
   // 🚨 Handle authorization failed
   if (
     (typeof data === "string" && data.toLowerCase().includes("authentication failed")) ||
@@ -66,10 +80,19 @@ class WebSocketService {
       if (onMessage) onMessage(event.data);
     };
 
-    this.socket.onclose = () => {
-      console.log("❌ WebSocket closed");
+    this.socket.onclose = (event) => {
+      console.log("❌ WebSocket closed", event.code);
       this.socket = null;
       this.isConnecting = false;
+
+      // Server restarting (1012) or connection lost (1006): reconnect, possibly to another
+      // server, which resumes the interview at the current question
+      if (!this.closedByClient && (event.code === 1012 || event.code === 1006) && this.reconnectAttempts < 5) {
+        const delay = Math.min(1000 * 2 ** this.reconnectAttempts, 10000);
+        this.reconnectAttempts += 1;
+        setTimeout(() => this.connect(token, sessionToken, onMessage, onOpen, onClose, onError), delay);
+        return;
+      }
       if (onClose) onClose();
     };
 
@@ -88,6 +111,7 @@ class WebSocketService {
   }
 
   close() {
+    this.closedByClient = true;
     if (this.socket) {
       this.socket.close();
       this.socket = null;
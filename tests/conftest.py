@@ -0,0 +1,12 @@
+import os
+
+# Settings are read at import time; the tests never reach a real database
+os.environ.setdefault("DATABASE_NAME", "test")
+os.environ.setdefault("DATABASE_USERNAME", "test")
+os.environ.setdefault("DATABASE_PASSWORD", "test")
+os.environ.setdefault("DATABASE_HOST", "localhost")
+os.environ.setdefault("DATABASE_PORT", "5432")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+# Debug makes the blocking-call guards raise instead of log
+os.environ["DEBUG"] = "true"
@@ -0,0 +1,129 @@
+"""
+AnswerBuffer and PartialTranscripts batch interview writes per worker. These tests
+check what reaches the database: buffered answers coalesce into one write, a
+registration's flush writes only its own rows, and a draft never overwrites the
+final answer. Drafts are written to an SQLite copy of question_answers.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.models.question_answer import QuestionAnswer
+from app.services import interview_engine
+from app.services.interview_engine import AnswerBuffer, PartialTranscripts, _answer_update
+
+
+@pytest.fixture
+def answer_writes(monkeypatch):
+    """The batches AnswerBuffer hands to the database, one (answers, progress) per write"""
+    writes = []
+
+    async def write(self, answers, progress):
+        writes.append((answers, progress))
+
+    monkeypatch.setattr(AnswerBuffer, "_write", write)
+    return writes
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """question_answers in SQLite, with the interview engine's sessions pointed at it"""
+    pytest.importorskip("aiosqlite")
+    url = f"sqlite:///{tmp_path / 'interview.db'}"
+    engine = create_engine(url)
+    QuestionAnswer.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(QuestionAnswer.__table__.insert(), [
+            {"registration_id": pk, "question_text": f"Question {order}", "answer_text": "", "is_answered": False, "question_order": order}
+            for pk in (1, 2) for order in (1, 2)
+        ])
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    monkeypatch.setattr(interview_engine, "async_session", async_sessionmaker(async_engine, class_=AsyncSession))
+    yield engine
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+def answers(engine):
+    """(registration pk, question_order) -> (answer_text, is_answered)"""
+    with engine.connect() as conn:
+        rows = conn.execute(select(
+            QuestionAnswer.registration_id, QuestionAnswer.question_order, QuestionAnswer.answer_text, QuestionAnswer.is_answered
+        ))
+        return {(row.registration_id, row.question_order): (row.answer_text, row.is_answered) for row in rows}
+
+
+def test_answers_to_one_registration_coalesce_into_one_write(answer_writes):
+    async def interview():
+        buffer = AnswerBuffer(max_pending=100, flush_interval=60)
+        buffer.add(1, {"startedAt": "t0", "currentQuestionIndex": 1}, 1, "first")
+        buffer.add(1, {"currentQuestionIndex": 2}, 2, "second")
+        buffer.add(1, {"currentQuestionIndex": 2}, 2, "second, corrected")
+        await buffer.stop()
+
+    asyncio.run(interview())
+    assert len(answer_writes) == 1
+    written, progress = answer_writes[0]
+    assert {key: text for key, (text, _) in written.items()} == {(1, 1): "first", (1, 2): "second, corrected"}
+    assert progress == {1: {"startedAt": "t0", "currentQuestionIndex": 2}}
+
+
+def test_answer_flush_of_one_registration_leaves_the_others_buffered(answer_writes):
+    async def interview():
+        buffer = AnswerBuffer(max_pending=100, flush_interval=60)
+        buffer.add(1, {"currentQuestionIndex": 1}, 1, "one")
+        buffer.add(2, {"currentQuestionIndex": 1}, 1, "two")
+        await buffer.flush(1)
+        assert not buffer.pending(1)
+        assert buffer.pending(2)
+        await buffer.stop()
+
+    asyncio.run(interview())
+    assert [set(progress) for _, progress in answer_writes] == [{1}, {2}]
+    assert [set(written) for written, _ in answer_writes] == [{(1, 1)}, {(2, 1)}]
+
+
+def test_drafts_keep_only_the_latest_interim_transcript(database):
+    async def interview():
+        drafts = PartialTranscripts(write_interval=60)
+        for text in ("I", "I have", "I have taught"):
+            drafts.add(1, 1, text)
+        await drafts.stop()
+        return drafts
+
+    drafts = asyncio.run(interview())
+    assert answers(database)[(1, 1)] == ("I have taught", False)
+    assert drafts.stats()["draft_answers_written"] == 1
+
+
+def test_draft_flushed_after_the_final_answer_does_not_overwrite_it(database):
+    async def interview():
+        drafts = PartialTranscripts(write_interval=60)
+        drafts.add(1, 1, "I have tau")
+        # The final answer commits before the pending draft is written
+        async with interview_engine.async_session() as db:
+            await db.execute(_answer_update, [{"registration_pk": 1, "order": 1, "text": "I have taught", "answered_at": None}])
+            await db.commit()
+        await drafts.stop()
+
+    asyncio.run(interview())
+    assert answers(database)[(1, 1)] == ("I have taught", True)
+
+
+def test_draft_flush_of_one_registration_writes_only_its_rows(database):
+    async def interview():
+        drafts = PartialTranscripts(write_interval=60)
+        drafts.add(1, 1, "one")
+        drafts.add(2, 1, "two")
+        await drafts.flush(1)
+        written = answers(database)
+        assert drafts.pending(2) == {1: "two"}
+        await drafts.stop()
+        return written
+
+    written = asyncio.run(interview())
+    assert written[(1, 1)] == ("one", False)
+    assert written[(2, 1)] == ("", False)
+    assert answers(database)[(2, 1)] == ("two", False)
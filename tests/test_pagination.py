@@ -0,0 +1,103 @@
+"""
+Keyset pagination: the opaque cursor codec and the seek predicates the registration
+list (submitted_at DESC NULLS LAST, id DESC) and its delta sync (updated_at ASC,
+id ASC) build from it. Walking every page must return each row exactly once, also
+when many rows share a sort value; the predicates run against SQLite here.
+"""
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, desc, select
+
+from app.models.interview_registration import InterviewRegistration
+from app.routers.interview_registrations_db import apply_changes_cursor, apply_registration_cursor
+from app.utils.pagination import decode_cursor, encode_cursor
+
+T0 = datetime(2025, 9, 1, 12, 0, 0)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    """Registrations 1-12: runs of equal timestamps, two without submitted_at"""
+    engine = create_engine("sqlite://")
+    InterviewRegistration.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(InterviewRegistration.__table__.insert(), [
+            {
+                "id": pk,
+                "name": f"Candidate {pk}",
+                "email": f"candidate{pk}@example.com",
+                "registration_id": f"REG-{pk}",
+                "resume_extracted_text": "",
+                "resume_summary": "",
+                "submitted_at": None if pk in (5, 11) else T0 + timedelta(minutes=pk // 4),
+                "updated_at": T0 + timedelta(minutes=pk % 3),
+            }
+            for pk in range(1, 13)
+        ])
+    yield engine
+    engine.dispose()
+
+
+def walk(engine, apply_cursor, order_by, cursor_of, limit):
+    """Page ids in order, following the cursor like a client does"""
+    pages, cursor = [], None
+    with engine.connect() as conn:
+        while True:
+            query = apply_cursor(select(InterviewRegistration.__table__), cursor)
+            rows = conn.execute(query.order_by(*order_by).limit(limit + 1)).all()
+            pages.append([row.id for row in rows[:limit]])
+            if len(rows) <= limit:
+                return pages
+            cursor = cursor_of(rows[limit - 1])
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(T0, 42)
+    assert decode_cursor(cursor) == (T0, 42)
+    assert "=" not in cursor
+
+
+def test_cursor_round_trip_without_sort_value():
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b'{"submitted_at": 1}').decode(),
+    base64.urlsafe_b64encode(b'["yesterday", 1]').decode(),
+    base64.urlsafe_b64encode(b'["2025-09-01T12:00:00", "one"]').decode(),
+    base64.urlsafe_b64encode(b'["2025-09-01T12:00:00", 1, 2]').decode(),
+])
+def test_malformed_cursor_is_rejected_with_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5])
+def test_descending_pages_break_ties_by_id(engine, limit):
+    submitted_at = InterviewRegistration.submitted_at
+    pages = walk(
+        engine,
+        apply_registration_cursor,
+        [desc(submitted_at).nulls_last(), desc(InterviewRegistration.id)],
+        lambda row: encode_cursor(row.submitted_at, row.id),
+        limit,
+    )
+    assert [pk for page in pages for pk in page] == [12, 10, 9, 8, 7, 6, 4, 3, 2, 1, 11, 5]
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5])
+def test_ascending_pages_break_ties_by_id(engine, limit):
+    pages = walk(
+        engine,
+        apply_changes_cursor,
+        [InterviewRegistration.updated_at, InterviewRegistration.id],
+        lambda row: encode_cursor(row.updated_at, row.id),
+        limit,
+    )
+    assert [pk for page in pages for pk in page] == [3, 6, 9, 12, 1, 4, 7, 10, 2, 5, 8, 11]
@@ -0,0 +1,85 @@
+"""
+RegistrationCache serves a document only while the caller's updated_at matches the
+cached one. Lookups run against the in-process backend and, when fakeredis is
+installed, the Redis backend; eviction and expiry are those of the in-process LRU.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db.redis.cache import InMemoryCacheBackend, RedisCacheBackend, RegistrationCache
+from app.utils import lru
+
+UPDATED_AT = datetime(2025, 9, 1, 12, 0, 0)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    if request.param == "memory":
+        return RegistrationCache(InMemoryCacheBackend(max_entries=100), ttl=60)
+    fakeredis = pytest.importorskip("fakeredis")
+    return RegistrationCache(RedisCacheBackend(fakeredis.FakeAsyncRedis()), ttl=60)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time.monotonic of the in-process LRU; advance it with clock[0] += seconds"""
+    now = [1000.0]
+    monkeypatch.setattr(lru.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_hit_when_updated_at_matches(cache):
+    async def lookup():
+        await cache.set("mongo", 1, UPDATED_AT, {"id": "REG-1"})
+        return await cache.get("mongo", 1, UPDATED_AT)
+
+    assert asyncio.run(lookup()) == {"id": "REG-1"}
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_miss_when_the_row_was_updated_since(cache):
+    async def lookup():
+        await cache.set("mongo", 1, UPDATED_AT, {"id": "REG-1"})
+        return await cache.get("mongo", 1, UPDATED_AT + timedelta(seconds=1))
+
+    assert asyncio.run(lookup()) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_invalidate_drops_every_shape(cache):
+    async def lookup():
+        await cache.set("mongo", 1, UPDATED_AT, {"id": "REG-1"})
+        await cache.set("list", 1, UPDATED_AT, {"id": "REG-1"})
+        await cache.invalidate([1])
+        return await cache.get_many("mongo", {1: UPDATED_AT}), await cache.get_many("list", {1: UPDATED_AT})
+
+    assert asyncio.run(lookup()) == ({}, {})
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = RegistrationCache(InMemoryCacheBackend(max_entries=2), ttl=60)
+
+    async def lookup():
+        await cache.set("mongo", 1, UPDATED_AT, {"id": "REG-1"})
+        await cache.set("mongo", 2, UPDATED_AT, {"id": "REG-2"})
+        # Reading 1 makes 2 the least recently used
+        await cache.get("mongo", 1, UPDATED_AT)
+        await cache.set("mongo", 3, UPDATED_AT, {"id": "REG-3"})
+        return await cache.get_many("mongo", {1: UPDATED_AT, 2: UPDATED_AT, 3: UPDATED_AT})
+
+    assert set(asyncio.run(lookup())) == {1, 3}
+
+
+def test_entry_expires_after_the_ttl(clock):
+    cache = RegistrationCache(InMemoryCacheBackend(max_entries=100), ttl=60)
+
+    async def lookup():
+        await cache.set("mongo", 1, UPDATED_AT, {"id": "REG-1"})
+        clock[0] += 59
+        fresh = await cache.get("mongo", 1, UPDATED_AT)
+        clock[0] += 1
+        return fresh, await cache.get("mongo", 1, UPDATED_AT)
+
+    assert asyncio.run(lookup()) == ({"id": "REG-1"}, None)
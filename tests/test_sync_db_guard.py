@@ -0,0 +1,60 @@
+"""
+The sync engine must never execute on the event loop thread: a psycopg2 call there
+blocks every request the worker is serving. forbid_sync_execute_on_event_loop is the
+check; these tests run it on an in-memory engine, since it only looks at the thread.
+"""
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.core.config import settings
+from app.db.postgres.database import forbid_sync_execute_on_event_loop, sync_engine
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "before_cursor_execute", forbid_sync_execute_on_event_loop)
+    yield engine
+    engine.dispose()
+
+
+def select_one(engine):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT 1")).scalar()
+
+
+def test_guard_is_installed_on_the_sync_engine():
+    assert event.contains(sync_engine, "before_cursor_execute", forbid_sync_execute_on_event_loop)
+
+
+def test_sync_call_outside_an_event_loop_passes(engine):
+    assert select_one(engine) == 1
+
+
+def test_sync_call_on_the_event_loop_fails(engine):
+    async def handler():
+        return select_one(engine)
+
+    assert settings.debug
+    with pytest.raises(RuntimeError, match="Blocking sync DB call on the event loop"):
+        asyncio.run(handler())
+
+
+def test_sync_call_in_the_threadpool_passes(engine):
+    async def handler():
+        return await asyncio.to_thread(select_one, engine)
+
+    assert asyncio.run(handler()) == 1
+
+
+def test_sync_call_on_the_event_loop_warns_outside_debug(engine, monkeypatch, caplog):
+    async def handler():
+        return select_one(engine)
+
+    monkeypatch.setattr(settings, "debug", False)
+    with caplog.at_level(logging.WARNING, logger="app.db.postgres.database"):
+        assert asyncio.run(handler()) == 1
+    assert "Blocking sync DB call on the event loop" in caplog.text